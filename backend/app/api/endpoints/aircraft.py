@@ -1,25 +1,50 @@
 """
 Aircraft API endpoints
 """
-from typing import List, Optional
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import DateTime, select, func, literal, or_, tuple_
 from sqlalchemy.orm import selectinload
-from geoalchemy2.functions import ST_X, ST_Y
 import structlog
 
-from app.core.database import get_async_session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_session
 from app.models.aircraft import Aircraft as AircraftModel
 from app.models.tenant import Tenant as TenantModel
-from app.schemas.aircraft import Aircraft, AircraftCreate, AircraftUpdate, AircraftResponse
-from app.services.aircraft_service import AircraftService
+from app.schemas.aircraft import AircraftCreate, AircraftProjection, AircraftResponse, AircraftUpdate
+from app.services.aircraft_service import AircraftService, resolve_response_fields, response_columns
+from app.services.aircraft_stream_service import RESYNC, aircraft_stream
+from app.services.data_generation import data_generations
+from app.services.fleet_cache_service import FleetSnapshot, aircraft_matcher, fleet_cache
+from app.services.scheduler_service import scheduler
+from app.services.tile_service import TileService
+from app.services.track_service import TrackService
+from app.utils.compression import negotiate_encoding
+from app.utils.geometry import parse_bbox
+from app.utils.http_cache import cache_headers, etag_matches, make_etag, not_modified, seconds_until
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import json_response
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Upper bound on aircraft per multi-track request
+MAX_TRACK_AIRCRAFT = 50
+
+# Unfiltered aircraft count per tenant as (data generation, count)
+_total_cache: Dict[str, Tuple[int, int]] = {}
+
+# Default tenant id, resolved on first request
+_default_tenant_id: Optional[UUID] = None
+
 
 async def get_default_tenant(session: AsyncSession) -> TenantModel:
     """Get default tenant for demo purposes"""
@@ -32,270 +57,526 @@ async def get_default_tenant(session: AsyncSession) -> TenantModel:
     return tenant
 
 
+async def get_default_tenant_id(session: AsyncSession) -> UUID:
+    """Get the default tenant's id, looked up once per process"""
+    global _default_tenant_id
+    if _default_tenant_id is None:
+        tenant = await get_default_tenant(session)
+        _default_tenant_id = tenant.id
+    return _default_tenant_id
+
+
+async def _refresh_fleet_snapshot(session: AsyncSession, tenant_id: UUID) -> None:
+    """Rebuild the tenant's fleet snapshot after a write through the API"""
+    if fleet_cache.get(tenant_id) is not None:
+        await fleet_cache.rebuild(session, tenant_id)
+
+
+def _live_cache_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """Cache headers for live data, fresh until the next scheduled ingest"""
+    max_age = seconds_until(scheduler.next_ingest_run())
+    if max_age is not None:
+        max_age = min(max_age, settings.HTTP_MAX_AGE_CAP_SECONDS)
+    return cache_headers(etag, last_modified, max_age)
+
+
+def _geojson_etag(tenant_id: UUID, generation: int, variant: Tuple, weak: bool = False) -> str:
+    """ETag for an aircraft GeoJSON representation at a data generation"""
+    return make_etag("aircraft-geojson", data_generations.epoch, tenant_id, generation, *variant, weak=weak)
+
+
+def _project(row: Mapping[str, Any], response_fields: List[str]) -> Dict[str, Any]:
+    """Select response fields from a fleet snapshot row"""
+    return {field: row[field] for field in response_fields}
+
+
+def _resolve_fields_param(fields: Optional[str], include_raw: bool) -> List[str]:
+    """Resolve the fields/include_raw query parameters, rejecting unknown fields with 400"""
+    try:
+        return resolve_response_fields(fields, include_raw)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _fetch_aircraft_row(
+    session: AsyncSession,
+    tenant_id: UUID,
+    aircraft_id: UUID,
+    response_fields: List[str]
+):
+    """Fetch one aircraft as a tuple of the projected response fields"""
+    result = await session.execute(
+        select(*response_columns(response_fields)).where(
+            AircraftModel.id == aircraft_id,
+            AircraftModel.tenant_id == tenant_id
+        )
+    )
+    return result.fetchone()
+
+
+def _parse_bbox_param(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """Parse the bbox query parameter, rejecting malformed boxes with 400"""
+    if not bbox:
+        return None
+    try:
+        return parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+
+
+def _bbox_filter(bbox: Tuple[float, float, float, float]):
+    """Envelope filter on aircraft position (served by idx_aircraft_position)"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if min_lon > max_lon:
+        # Viewport crosses the antimeridian
+        return or_(
+            AircraftModel.position.op("&&")(func.ST_MakeEnvelope(min_lon, min_lat, 180, max_lat, 4326)),
+            AircraftModel.position.op("&&")(func.ST_MakeEnvelope(-180, min_lat, max_lon, max_lat, 4326)),
+        )
+    return AircraftModel.position.op("&&")(func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326))
+
+
+async def _cached_total(session: AsyncSession, tenant_id: UUID) -> int:
+    """Unfiltered aircraft count for a tenant, recounted once per data generation"""
+    key = str(tenant_id)
+    generation = data_generations.get(tenant_id)
+    cached = _total_cache.get(key)
+    if cached and cached[0] == generation:
+        return cached[1]
+    
+    result = await session.execute(
+        select(func.count(AircraftModel.id)).where(AircraftModel.tenant_id == tenant_id)
+    )
+    total = result.scalar()
+    _total_cache[key] = (generation, total)
+    return total
+
+
 @router.get("/", response_model=AircraftResponse)
 async def get_aircraft(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored when cursor is set)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(False, description="Run an exact count of matching aircraft"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all but raw_data)"),
+    include_raw: bool = Query(False, description="Include the raw feed record (raw_data)"),
     hex_filter: Optional[str] = Query(None, alias="hex", description="Filter by aircraft hex code"),
     flight_filter: Optional[str] = Query(None, alias="flight", description="Filter by flight number"),
+    bbox: Optional[str] = Query(None, description="Viewport as minLon,minLat,maxLon,maxLat"),
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Get aircraft data with pagination and filtering"""
-    tenant = await get_default_tenant(session)
+    """
+    Get aircraft data with keyset pagination and filtering.
+    
+    Pages are ordered by (last_updated, id) descending; pass ``next_cursor``
+    back as ``cursor`` to get the following page at constant cost. The exact
+    total is only counted with ``include_total``; otherwise unfiltered lists
+    report the tenant's count cached for the current data generation.
+    Served from the live fleet snapshot when available (exact totals are
+    then free); otherwise rows are serialized straight from the selected
+    columns.
+    """
+    viewport = _parse_bbox_param(bbox)
+    response_fields = _resolve_fields_param(fields, include_raw)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    query = select(AircraftModel).where(AircraftModel.tenant_id == tenant.id)
+    tenant_id = await get_default_tenant_id(session)
+    
+    snapshot = None if "raw_data" in response_fields else await fleet_cache.get_or_build(session, tenant_id)
+    if snapshot is not None:
+        matcher = aircraft_matcher(hex_filter, flight_filter, viewport)
+        return json_response(_page_from_snapshot(snapshot, response_fields, matcher, after, skip, limit, include_total))
     
     # Apply filters
+    filters = [AircraftModel.tenant_id == tenant_id]
     if hex_filter:
-        query = query.where(AircraftModel.hex.ilike(f"%{hex_filter}%"))
+        filters.append(AircraftModel.hex.ilike(f"%{hex_filter}%"))
     if flight_filter:
-        query = query.where(AircraftModel.flight.ilike(f"%{flight_filter}%"))
+        filters.append(AircraftModel.flight.ilike(f"%{flight_filter}%"))
+    if viewport:
+        filters.append(_bbox_filter(viewport))
     
-    # Get total count
-    count_query = select(func.count(AircraftModel.id)).where(AircraftModel.tenant_id == tenant.id)
-    if hex_filter:
-        count_query = count_query.where(AircraftModel.hex.ilike(f"%{hex_filter}%"))
-    if flight_filter:
-        count_query = count_query.where(AircraftModel.flight.ilike(f"%{flight_filter}%"))
+    total = None
+    total_estimated = False
+    if include_total:
+        total_result = await session.execute(select(func.count(AircraftModel.id)).where(*filters))
+        total = total_result.scalar()
+    elif len(filters) == 1:
+        total = await _cached_total(session, tenant_id)
+        total_estimated = True
     
-    total_result = await session.execute(count_query)
-    total = total_result.scalar()
+    # The sort key is selected after the projected fields to build the cursor
+    query = select(
+        *response_columns(response_fields),
+        AircraftModel.last_updated,
+        AircraftModel.id
+    ).where(*filters)
+    if after:
+        after_updated, after_id = after
+        query = query.where(
+            tuple_(AircraftModel.last_updated, AircraftModel.id)
+            < tuple_(literal(after_updated, DateTime(timezone=True)), literal(after_id, AircraftModel.id.type))
+        )
+    else:
+        query = query.offset(skip)
     
-    # Apply pagination and execute with coordinate extraction
-    query = query.add_columns(
-        ST_X(AircraftModel.position).label('longitude'),
-        ST_Y(AircraftModel.position).label('latitude')
-    ).offset(skip).limit(limit).order_by(AircraftModel.last_updated.desc())
+    # Fetch one extra row to know whether another page follows
+    query = query.limit(limit + 1).order_by(AircraftModel.last_updated.desc(), AircraftModel.id.desc())
     result = await session.execute(query)
     aircraft_rows = result.fetchall()
     
-    # Convert to response format
-    aircraft_list = []
-    for row in aircraft_rows:
-        aircraft_model = row[0]  # First item is the aircraft model
-        longitude = row[1] if len(row) > 1 else None  # Second item is longitude
-        latitude = row[2] if len(row) > 2 else None   # Third item is latitude
-        
-        # If PostGIS extraction failed, try to get coordinates from raw_data
-        if latitude is None and longitude is None and aircraft_model.raw_data:
-            raw_data = aircraft_model.raw_data
-            if isinstance(raw_data, dict):
-                # Try direct latitude/longitude in raw_data
-                if raw_data.get('latitude') and raw_data.get('longitude'):
-                    latitude = raw_data['latitude']
-                    longitude = raw_data['longitude']
-                # Try lastPosition in raw_data
-                elif raw_data.get('lastPosition'):
-                    last_pos = raw_data['lastPosition']
-                    if last_pos.get('lat') and last_pos.get('lon'):
-                        latitude = last_pos['lat']
-                        longitude = last_pos['lon']
-                # Try nested raw_data.lastPosition
-                elif raw_data.get('raw_data', {}).get('lastPosition'):
-                    last_pos = raw_data['raw_data']['lastPosition']
-                    if last_pos.get('lat') and last_pos.get('lon'):
-                        latitude = last_pos['lat']
-                        longitude = last_pos['lon']
-        
-        aircraft_dict = {
-            "id": aircraft_model.id,
-            "created_at": aircraft_model.created_at,
-            "updated_at": aircraft_model.last_updated,
-            "tenant_id": aircraft_model.tenant_id,
-            "hex": aircraft_model.hex,
-            "type": aircraft_model.type,
-            "flight": aircraft_model.flight,
-            "registration": aircraft_model.registration,
-            "aircraft_type_code": aircraft_model.aircraft_type_code,
-            "db_flags": aircraft_model.db_flags,
-            "squawk": aircraft_model.squawk,
-            "emergency": aircraft_model.emergency,
-            "category": aircraft_model.category,
-            "altitude_baro": aircraft_model.altitude_baro,
-            "altitude_geom": aircraft_model.altitude_geom,
-            "ground_speed": aircraft_model.ground_speed,
-            "track": aircraft_model.track,
-            "true_heading": aircraft_model.true_heading,
-            "vertical_rate": aircraft_model.vertical_rate,
-            "nic": aircraft_model.nic,
-            "nac_p": aircraft_model.nac_p,
-            "nac_v": aircraft_model.nac_v,
-            "sil": aircraft_model.sil,
-            "sil_type": aircraft_model.sil_type,
-            "sda": aircraft_model.sda,
-            "messages": aircraft_model.messages,
-            "seen": aircraft_model.seen,
-            "seen_pos": aircraft_model.seen_pos,
-            "rssi": aircraft_model.rssi,
-            "gps_ok_before": aircraft_model.gps_ok_before,
-            "gps_ok_lat": aircraft_model.gps_ok_lat,
-            "gps_ok_lon": aircraft_model.gps_ok_lon,
-            "raw_data": aircraft_model.raw_data,
-            "latitude": float(latitude) if latitude is not None else None,
-            "longitude": float(longitude) if longitude is not None else None,
-        }
-        
-        aircraft_list.append(Aircraft(**aircraft_dict))
-    
-    return AircraftResponse(
-        aircraft=aircraft_list,
-        total=total,
-        page=skip // limit + 1,
-        size=len(aircraft_list)
+    next_cursor = None
+    if len(aircraft_rows) > limit:
+        aircraft_rows = aircraft_rows[:limit]
+        next_cursor = encode_cursor(aircraft_rows[-1][-2], aircraft_rows[-1][-1])
+    
+    width = len(response_fields)
+    return json_response({
+        "aircraft": [dict(zip(response_fields, row[:width])) for row in aircraft_rows],
+        "total": total,
+        "total_estimated": total_estimated,
+        "page": 1 if after else skip // limit + 1,
+        "size": len(aircraft_rows),
+        "next_cursor": next_cursor
+    })
+
+
+def _page_from_snapshot(
+    snapshot: FleetSnapshot,
+    response_fields: List[str],
+    matcher,
+    after: Optional[Tuple[datetime, UUID]],
+    skip: int,
+    limit: int,
+    include_total: bool
+) -> Dict[str, Any]:
+    """Build a list page from the fleet snapshot"""
+    rows = snapshot.iter_matching(matcher, snapshot.index_after(after) if after else 0)
+    if not after:
+        rows = islice(rows, skip, None)
+    
+    page = list(islice(rows, limit + 1))
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]["updated_at"], page[-1]["id"])
+    
+    total = None
+    if matcher is None:
+        total = len(snapshot)
+    elif include_total:
+        total = sum(1 for _ in snapshot.iter_matching(matcher))
+    
+    return {
+        "aircraft": [_project(row, response_fields) for row in page],
+        "total": total,
+        "total_estimated": False,
+        "page": 1 if after else skip // limit + 1,
+        "size": len(page),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/search")
+async def search_aircraft(
+    q: str = Query(..., min_length=1, max_length=32, description="Hex code, flight, registration or type code"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all but raw_data)"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Search aircraft, ranking exact over prefix over substring matches"""
+    response_fields = _resolve_fields_param(fields, False)
+    tenant_id = await get_default_tenant_id(session)
+    
+    snapshot = await fleet_cache.get_or_build(session, tenant_id)
+    if snapshot is not None:
+        results = snapshot.search(q, limit)
+        return json_response({
+            "query": q,
+            "results": [{**_project(row, response_fields), "score": score} for row, score in results],
+            "size": len(results)
+        })
+    
+    service = AircraftService(session)
+    rows = await service.search_aircraft(tenant_id, q, response_fields, limit)
+    
+    return json_response({
+        "query": q,
+        "results": [{**dict(zip(response_fields, row)), "score": row[-1]} for row in rows],
+        "size": len(rows)
+    })
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    generation = data.get("generation")
+    event_id = f"id: {generation}\n" if generation is not None else ""
+    return f"{event_id}event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+@router.get("/stream")
+async def stream_aircraft(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Only push aircraft inside minLon,minLat,maxLon,maxLat"),
+):
+    """
+    Push live aircraft as Server-Sent Events.
+    
+    Sends a ``snapshot`` FeatureCollection on connect, then a ``delta``
+    event (added features, moved features, removed hex codes) after each
+    committed ingest.
+    """
+    viewport = _parse_bbox_param(bbox)
+    if not AsyncSessionLocal:
+        raise HTTPException(status_code=503, detail="Database not available")
+    
+    # The initial snapshot uses a short-lived session so an open stream
+    # does not hold a database connection
+    async with AsyncSessionLocal() as session:
+        tenant = await get_default_tenant(session)
+        subscriber = aircraft_stream.subscribe(tenant.id, viewport)
+        try:
+            snapshot = await aircraft_stream.snapshot(session, subscriber)
+        except Exception:
+            aircraft_stream.unsubscribe(subscriber)
+            raise
+    
+    async def events():
+        try:
+            yield _sse_event("snapshot", snapshot)
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if message is RESYNC:
+                    yield _sse_event("snapshot", aircraft_stream.current_snapshot(subscriber))
+                else:
+                    yield _sse_event("delta", message)
+        finally:
+            aircraft_stream.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
-@router.get("/{aircraft_id}", response_model=Aircraft)
+def _resolve_track_window(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Default the track window to the last 24 hours; naive times are UTC"""
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(hours=24)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+@router.get("/tracks")
+async def get_aircraft_tracks(
+    hex_codes: str = Query(..., alias="hex", description="Comma-separated ICAO hex codes"),
+    start: Optional[datetime] = Query(None, description="Start time (default: 24 hours before end)"),
+    end: Optional[datetime] = Query(None, description="End time (default: now)"),
+    track_format: str = Query("linestring", alias="format", pattern="^(linestring|coordinates)$",
+                              description="GeoJSON LineString features or compact coordinate arrays"),
+    max_points: int = Query(2000, ge=2, le=10000, description="Maximum points per aircraft"),
+    tolerance_m: Optional[float] = Query(None, gt=0, description="Douglas-Peucker simplification tolerance in metres"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get historical tracks for several aircraft from the archive"""
+    codes = [code.strip() for code in hex_codes.split(",") if code.strip()]
+    if not codes:
+        raise HTTPException(status_code=400, detail="At least one hex code is required")
+    if len(codes) > MAX_TRACK_AIRCRAFT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TRACK_AIRCRAFT} hex codes per request")
+    
+    start, end = _resolve_track_window(start, end)
+    tenant = await get_default_tenant(session)
+    
+    service = TrackService(session)
+    tracks = await service.get_tracks(tenant.id, codes, start, end, max_points, tolerance_m)
+    formatted = [service.format_track(code, points, track_format) for code, points in tracks.items()]
+    
+    if track_format == "coordinates":
+        return {"tracks": formatted}
+    
+    return {
+        "type": "FeatureCollection",
+        "features": formatted
+    }
+
+
+@router.get("/{hex_code}/track")
+async def get_aircraft_track(
+    hex_code: str,
+    start: Optional[datetime] = Query(None, description="Start time (default: 24 hours before end)"),
+    end: Optional[datetime] = Query(None, description="End time (default: now)"),
+    track_format: str = Query("linestring", alias="format", pattern="^(linestring|coordinates)$",
+                              description="GeoJSON LineString feature or compact coordinate arrays"),
+    max_points: int = Query(2000, ge=2, le=10000, description="Maximum points in the track"),
+    tolerance_m: Optional[float] = Query(None, gt=0, description="Douglas-Peucker simplification tolerance in metres"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get the historical track of one aircraft from the archive"""
+    start, end = _resolve_track_window(start, end)
+    tenant = await get_default_tenant(session)
+    
+    service = TrackService(session)
+    tracks = await service.get_tracks(tenant.id, [hex_code], start, end, max_points, tolerance_m)
+    points = tracks.get(hex_code.lower())
+    if not points:
+        raise HTTPException(status_code=404, detail="No track data found")
+    
+    return service.format_track(hex_code.lower(), points, track_format)
+
+
+@router.get("/{aircraft_id}", response_model=AircraftProjection)
 async def get_aircraft_by_id(
     aircraft_id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all but raw_data)"),
+    include_raw: bool = Query(False, description="Include the raw feed record (raw_data)"),
     session: AsyncSession = Depends(get_async_session),
 ):
     """Get specific aircraft by ID"""
-    tenant = await get_default_tenant(session)
+    response_fields = _resolve_fields_param(fields, include_raw)
+    tenant_id = await get_default_tenant_id(session)
     
-    result = await session.execute(
-        select(AircraftModel, 
-               ST_X(AircraftModel.position).label('longitude'),
-               ST_Y(AircraftModel.position).label('latitude')).where(
-            AircraftModel.id == aircraft_id,
-            AircraftModel.tenant_id == tenant.id
-        )
-    )
-    row = result.fetchone()
+    if "raw_data" not in response_fields:
+        snapshot = await fleet_cache.get_or_build(session, tenant_id)
+        cached = snapshot.by_id.get(aircraft_id) if snapshot is not None else None
+        if cached is not None:
+            return json_response(_project(cached, response_fields))
     
+    # Not in the snapshot (or raw_data requested): read through to the database
+    row = await _fetch_aircraft_row(session, tenant_id, aircraft_id, response_fields)
     if not row:
         raise HTTPException(status_code=404, detail="Aircraft not found")
     
-    aircraft_model = row[0]
-    longitude = row[1] if len(row) > 1 else None
-    latitude = row[2] if len(row) > 2 else None
-    
-    # If PostGIS extraction failed, try to get coordinates from raw_data
-    if latitude is None and longitude is None and aircraft_model.raw_data:
-        raw_data = aircraft_model.raw_data
-        if isinstance(raw_data, dict):
-            # Try direct latitude/longitude in raw_data
-            if raw_data.get('latitude') and raw_data.get('longitude'):
-                latitude = raw_data['latitude']
-                longitude = raw_data['longitude']
-            # Try lastPosition in raw_data
-            elif raw_data.get('lastPosition'):
-                last_pos = raw_data['lastPosition']
-                if last_pos.get('lat') and last_pos.get('lon'):
-                    latitude = last_pos['lat']
-                    longitude = last_pos['lon']
-            # Try nested raw_data.lastPosition
-            elif raw_data.get('raw_data', {}).get('lastPosition'):
-                last_pos = raw_data['raw_data']['lastPosition']
-                if last_pos.get('lat') and last_pos.get('lon'):
-                    latitude = last_pos['lat']
-                    longitude = last_pos['lon']
-    
-    aircraft_dict = {
-        "id": aircraft_model.id,
-        "created_at": aircraft_model.created_at,
-        "updated_at": aircraft_model.last_updated,
-        "tenant_id": aircraft_model.tenant_id,
-        "hex": aircraft_model.hex,
-        "type": aircraft_model.type,
-        "flight": aircraft_model.flight,
-        "registration": aircraft_model.registration,
-        "aircraft_type_code": aircraft_model.aircraft_type_code,
-        "db_flags": aircraft_model.db_flags,
-        "squawk": aircraft_model.squawk,
-        "emergency": aircraft_model.emergency,
-        "category": aircraft_model.category,
-        "altitude_baro": aircraft_model.altitude_baro,
-        "altitude_geom": aircraft_model.altitude_geom,
-        "ground_speed": aircraft_model.ground_speed,
-        "track": aircraft_model.track,
-        "true_heading": aircraft_model.true_heading,
-        "vertical_rate": aircraft_model.vertical_rate,
-        "nic": aircraft_model.nic,
-        "nac_p": aircraft_model.nac_p,
-        "nac_v": aircraft_model.nac_v,
-        "sil": aircraft_model.sil,
-        "sil_type": aircraft_model.sil_type,
-        "sda": aircraft_model.sda,
-        "messages": aircraft_model.messages,
-        "seen": aircraft_model.seen,
-        "seen_pos": aircraft_model.seen_pos,
-        "rssi": aircraft_model.rssi,
-        "gps_ok_before": aircraft_model.gps_ok_before,
-        "gps_ok_lat": aircraft_model.gps_ok_lat,
-        "gps_ok_lon": aircraft_model.gps_ok_lon,
-        "raw_data": aircraft_model.raw_data,
-        "latitude": float(latitude) if latitude is not None else None,
-        "longitude": float(longitude) if longitude is not None else None,
-    }
-    
-    return Aircraft(**aircraft_dict)
+    return json_response(dict(zip(response_fields, row)))
 
 
-@router.post("/", response_model=Aircraft)
+@router.post("/", response_model=AircraftProjection)
 async def create_aircraft(
     aircraft: AircraftCreate,
+    include_raw: bool = Query(False, description="Include the raw feed record (raw_data)"),
     session: AsyncSession = Depends(get_async_session),
 ):
     """Create new aircraft"""
+    response_fields = _resolve_fields_param(None, include_raw)
     tenant = await get_default_tenant(session)
     
     service = AircraftService(session)
     aircraft_model = await service.create_aircraft(tenant.id, aircraft)
+    data_generations.bump(tenant.id)
+    await _refresh_fleet_snapshot(session, tenant.id)
     
-    # Convert to response format
-    aircraft_dict = {
-        "id": aircraft_model.id,
-        "created_at": aircraft_model.created_at,
-        "updated_at": aircraft_model.updated_at,
-        "tenant_id": aircraft_model.tenant_id,
-        "hex": aircraft_model.hex,
-        "type": aircraft_model.type,
-        "flight": aircraft_model.flight,
-        "registration": aircraft_model.registration,
-        "aircraft_type_code": aircraft_model.aircraft_type_code,
-        "db_flags": aircraft_model.db_flags,
-        "squawk": aircraft_model.squawk,
-        "emergency": aircraft_model.emergency,
-        "category": aircraft_model.category,
-        "altitude_baro": aircraft_model.altitude_baro,
-        "altitude_geom": aircraft_model.altitude_geom,
-        "ground_speed": aircraft_model.ground_speed,
-        "track": aircraft_model.track,
-        "true_heading": aircraft_model.true_heading,
-        "vertical_rate": aircraft_model.vertical_rate,
-        "nic": aircraft_model.nic,
-        "nac_p": aircraft_model.nac_p,
-        "nac_v": aircraft_model.nac_v,
-        "sil": aircraft_model.sil,
-        "sil_type": aircraft_model.sil_type,
-        "sda": aircraft_model.sda,
-        "messages": aircraft_model.messages,
-        "seen": aircraft_model.seen,
-        "seen_pos": aircraft_model.seen_pos,
-        "rssi": aircraft_model.rssi,
-        "gps_ok_before": aircraft_model.gps_ok_before,
-        "gps_ok_lat": aircraft_model.gps_ok_lat,
-        "gps_ok_lon": aircraft_model.gps_ok_lon,
-        "raw_data": aircraft_model.raw_data,
-        "latitude": aircraft.latitude,
-        "longitude": aircraft.longitude,
-    }
-    
-    return Aircraft(**aircraft_dict)
+    row = await _fetch_aircraft_row(session, tenant.id, aircraft_model.id, response_fields)
+    return json_response(dict(zip(response_fields, row)))
 
 
 @router.get("/geojson/all")
 async def get_aircraft_geojson(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport as minLon,minLat,maxLon,maxLat"),
+    zoom: Optional[int] = Query(None, ge=0, le=24, description="Map zoom; low zooms return one aircraft per grid cell"),
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Get all aircraft as GeoJSON FeatureCollection"""
-    tenant = await get_default_tenant(session)
+    """
+    Get all aircraft as GeoJSON FeatureCollection.
+    
+    Served from the live fleet snapshot (pre-serialized for the full fleet)
+    unless the zoom asks for clustering, which is streamed from PostGIS.
+    
+    Responses carry an ETag for the data generation they were built from
+    (strong per coding for the precompressed full fleet, weak otherwise); a matching If-None-Match is answered with 304 before any data is
+    read, and max-age runs until the next scheduled ingest. The full fleet
+    is sent precompressed (zstd/br/gzip) from bytes built once per generation.
+    """
+    viewport = _parse_bbox_param(bbox)
+    tenant_id = await get_default_tenant_id(session)
+    clustered = zoom is not None and zoom <= settings.GEOJSON_CLUSTER_MAX_ZOOM
+    
+    # The snapshot knows which generation it holds, which may trail the
+    # tracker while an ingest is rebuilding it
+    snapshot = None if clustered else fleet_cache.get(tenant_id)
+    if snapshot is not None:
+        generation, last_modified = snapshot.generation, snapshot.built_at
+    else:
+        generation, last_modified = data_generations.get(tenant_id), data_generations.changed_at(tenant_id)
+    
+    # Each content coding of the precompressed full fleet is its own representation
+    # with a strong ETag. Other bodies may be gzipped by CompressionMiddleware
+    # after the ETag is set, so theirs is weak
+    full_fleet = not clustered and viewport is None
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if full_fleet else None
+    variant = (viewport, zoom if clustered else None, encoding)
+    weak = not full_fleet
+    headers = _live_cache_headers(_geojson_etag(tenant_id, generation, variant, weak), last_modified)
+    headers["Vary"] = "Accept-Encoding"
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return not_modified(headers)
+    
+    if not clustered and snapshot is None:
+        snapshot = await fleet_cache.get_or_build(session, tenant_id)
+        if snapshot is not None and snapshot.generation != generation:
+            headers = _live_cache_headers(
+                _geojson_etag(tenant_id, snapshot.generation, variant, weak),
+                snapshot.built_at
+            )
+            headers["Vary"] = "Accept-Encoding"
+    
+    if snapshot is not None:
+        if viewport is None:
+            return await snapshot.geojson.response(encoding, "application/geo+json", headers)
+        return json_response(
+            {"type": "FeatureCollection", "features": snapshot.features_in(viewport)},
+            media_type="application/geo+json",
+            headers=headers
+        )
     
     service = AircraftService(session)
-    geojson = await service.get_aircraft_geojson(tenant.id)
+    return StreamingResponse(
+        service.stream_aircraft_geojson(tenant_id, bbox=viewport, zoom=zoom),
+        media_type="application/geo+json",
+        headers=headers
+    )
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_aircraft_tile(
+    z: int,
+    x: int,
+    y: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get live aircraft as a Mapbox Vector Tile (layer "aircraft")"""
+    tenant = await get_default_tenant(session)
+    
+    service = TileService(session)
+    try:
+        tile, generation = await service.get_aircraft_tile(tenant.id, z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return geojson
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"X-Data-Generation": str(generation)}
+    )
 
 
 @router.post("/bulk")
@@ -308,6 +589,8 @@ async def create_bulk_aircraft(
     
     service = AircraftService(session)
     result = await service.process_bulk_aircraft_data(tenant.id, aircraft_list)
+    data_generations.bump(tenant.id)
+    await _refresh_fleet_snapshot(session, tenant.id)
     
     return {
         "processed": len(aircraft_list),
@@ -1,11 +1,24 @@
 """
 Airspace API endpoints
 """
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from app.services.airspace_service import airspace_service
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.api.endpoints.aircraft import get_default_tenant_id
+from app.services.airspace_cache_service import airspace_cache
+from app.services.airspace_store_service import AirspaceStore
+from app.services.incursion_service import IncursionService
+from app.services.scheduler_service import scheduler
+from app.utils.compression import negotiate_encoding
+from app.utils.geometry import parse_bbox
+from app.utils.http_cache import cache_headers, etag_matches, make_etag, not_modified, seconds_until
+from app.utils.serialization import json_response
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -13,7 +26,13 @@ router = APIRouter()
 
 @router.get("/geojson", response_model=Dict[str, Any])
 async def get_airspace_geojson(
-    limit: int = Query(default=3000, ge=1, le=5000, description="Maximum number of airspace records to fetch")
+    request: Request,
+    limit: int = Query(default=3000, ge=1, le=5000, description="Maximum number of airspace records to fetch"),
+    bbox: Optional[str] = Query(None, description="Viewport as minLon,minLat,maxLon,maxLat"),
+    active_at: Optional[datetime] = Query(None, description="Only airspace scheduled to be active at this time"),
+    min_alt: Optional[int] = Query(None, ge=0, description="Only airspace reaching at or above this altitude (ft)"),
+    max_alt: Optional[int] = Query(None, ge=0, description="Only airspace starting at or below this altitude (ft)"),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Get restricted airspace data as GeoJSON
@@ -25,20 +44,35 @@ async def get_airspace_geojson(
     - Warning areas (W)
     - Prohibited areas (P)
     - Temporary Flight Restrictions (TFR)
+    
+    Served from the airspace cache, which a scheduler job refreshes; stale
+    entries are served while a background refresh runs, and the last good
+    copy is kept when the FAA fails. Responses carry an ETag over the
+    features, so clients polling with If-None-Match get 304 while the FAA
+    schedule is unchanged.
+    
+    With bbox, active_at or altitude filters the persisted airspace table is
+    queried in PostGIS instead, so clients only receive matching polygons.
     """
+    if bbox or active_at is not None or min_alt is not None or max_alt is not None:
+        return await _query_airspace(request, session, limit, bbox, active_at, min_alt, max_alt)
+    
     try:
-        logger.info("Fetching airspace data", limit=limit)
+        entry = await airspace_cache.get_or_fetch(limit)
         
-        airspace_data = await airspace_service.fetch_airspace_data(limit=limit)
+        if entry is None:
+            # Never fetched successfully: answer empty and uncacheable
+            logger.warning("Airspace data unavailable", limit=limit)
+            return json_response({'type': 'FeatureCollection', 'features': []}, headers={"Cache-Control": "no-store"})
         
-        logger.info(
-            "Successfully retrieved airspace data",
-            features_count=len(airspace_data.get('features', [])),
-            total=airspace_data.get('total', 0)
-        )
-        
-        return airspace_data
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        headers = cache_headers(make_etag("airspace", entry.features_etag, encoding), entry.modified_at, _max_age())
+        headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return not_modified(headers)
         
+        return await entry.payload.response(encoding, "application/json", headers)
+    
     except Exception as e:
         logger.error("Failed to fetch airspace data", error=str(e))
         raise HTTPException(
@@ -47,6 +81,84 @@ async def get_airspace_geojson(
         )
 
 
+def _max_age() -> Optional[int]:
+    """Seconds until the next scheduled airspace refresh, capped"""
+    max_age = seconds_until(scheduler.next_run("airspace-refresh"))
+    if max_age is not None:
+        max_age = min(max_age, settings.HTTP_MAX_AGE_CAP_SECONDS)
+    return max_age
+
+
+async def _query_airspace(
+    request: Request,
+    session: AsyncSession,
+    limit: int,
+    bbox: Optional[str],
+    active_at: Optional[datetime],
+    min_alt: Optional[int],
+    max_alt: Optional[int]
+) -> Response:
+    """Answer a filtered airspace request from the airspace table"""
+    try:
+        viewport = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    if min_alt is not None and max_alt is not None and min_alt > max_alt:
+        raise HTTPException(status_code=400, detail="min_alt must not exceed max_alt")
+    if active_at is not None and active_at.tzinfo is None:
+        active_at = active_at.replace(tzinfo=timezone.utc)
+    
+    # The table only changes when the refresh job persists a new collection.
+    # CompressionMiddleware may gzip the body after the ETag is set, so it is weak
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if airspace_cache.persisted_etag:
+        headers = cache_headers(
+            make_etag("airspace-query", airspace_cache.persisted_etag, limit, viewport,
+                      active_at.isoformat() if active_at else None, min_alt, max_alt, weak=True),
+            max_age=_max_age()
+        )
+        headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return not_modified(headers)
+    
+    try:
+        body = await AirspaceStore(session).query_geojson(limit, viewport, active_at, min_alt, max_alt)
+    except Exception as e:
+        logger.error("Failed to query airspace", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to query airspace: {str(e)}")
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/incursions")
+async def get_airspace_incursions(
+    active: bool = Query(default=True, description="Only aircraft currently inside airspace"),
+    hex: Optional[str] = Query(None, description="Only incursions by this ICAO hex"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get aircraft detected inside active airspace
+    
+    Incursions are evaluated after every aircraft ingest: an aircraft inside
+    an airspace polygon, within its altitude band and during its scheduled
+    activation. An incursion stays open while later ingests still find the
+    aircraft inside and is ended by the first one that does not.
+    """
+    tenant_id = await get_default_tenant_id(session)
+    
+    try:
+        incursions = await IncursionService(session).list_incursions(tenant_id, active, hex, limit)
+    except Exception as e:
+        logger.error("Failed to list airspace incursions", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to list airspace incursions: {str(e)}")
+    
+    return json_response({
+        "incursions": incursions,
+        "total": len(incursions)
+    })
+
+
 @router.get("/types")
 async def get_airspace_types():
     """
@@ -1,21 +1,154 @@
 """
 Base client class for data collection
 """
+import hashlib
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, BinaryIO, Dict, List, Any, Optional, Sequence, Tuple, Type
 from uuid import UUID
+import httpx
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.clients.http_client import http_clients
+from app.core.config import settings
+from app.utils.record_batch import RecordBatch
+from app.utils.record_spec import RecordSpec
+
 logger = structlog.get_logger()
 
+# Storage modes for fetch_and_store_data
+STORAGE_MODE_UPSERT = "upsert"                    # Insert or update every record
+STORAGE_MODE_ARCHIVE_REFRESH = "archive_refresh"  # Archive everything, then replace
+STORAGE_MODE_INCREMENTAL = "incremental"          # Write and archive only what changed
+STORAGE_MODES = (STORAGE_MODE_UPSERT, STORAGE_MODE_ARCHIVE_REFRESH, STORAGE_MODE_INCREMENTAL)
+
+
+class FetchState:
+    """Validators and body hash of the last response a source had stored"""
+    
+    __slots__ = ("etag", "last_modified", "body_hash")
+    
+    def __init__(self, etag: Optional[str] = None, last_modified: Optional[str] = None, body_hash: Optional[str] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
+
+
+# Clients are created per scheduled run, so fetch state is kept here, per
+# (tenant, job, source URL): consumers polling the same feed never share validators
+FetchStateKey = Tuple[str, str, str]
+fetch_states: Dict[FetchStateKey, FetchState] = {}
+
 
 class BaseDataClient(ABC):
     """Base class for all data collection clients"""
     
+    # Compiled mapping/validation applied to each raw record in place of transform_data + validate_data
+    record_spec: Optional[RecordSpec] = None
+    # Columnar batch type built from chunks of raw records in place of per-record processing
+    batch_class: Optional[Type[RecordBatch]] = None
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.logger = logger.bind(client=self.__class__.__name__)
+        
+        # Set by conditional_get when the source has not changed since the last stored run
+        self.unchanged = False
+        self._pending_fetch_state: Optional[Tuple[FetchStateKey, FetchState]] = None
+        # Tenant being collected for, set by fetch_and_store_data
+        self.tenant_id: Optional[UUID] = None
+        # State of the last response this client fetched in full
+        self.last_fetch_state: Optional[FetchState] = None
+    
+    def http_client(self, url: str, verify: bool = True) -> httpx.AsyncClient:
+        """Shared pooled HTTP client for a URL's origin (closed on application shutdown)"""
+        return http_clients.get(url, verify)
+    
+    def fetch_state_key(self, url: str) -> FetchStateKey:
+        """Key of the fetch state for a URL: the tenant, the job (or client class) and the URL"""
+        return str(self.tenant_id), str(self.config.get("job_id") or type(self).__name__), url
+    
+    async def conditional_get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        verify: bool = True
+    ) -> Optional[BinaryIO]:
+        """
+        GET a feed unless it is unchanged since the last stored run.
+        
+        Sends the stored ETag / Last-Modified as If-None-Match /
+        If-Modified-Since, and hashes the body while spooling it to a
+        temporary file (in memory up to INGEST_SPOOL_MAX_BYTES). A 304 or a
+        body hash equal to the stored one sets ``unchanged`` and returns
+        None, so the caller skips parsing entirely. The new state is only
+        saved once ``fetch_and_store_data`` has stored the data.
+        
+        The whole body is downloaded before the caller decodes any of it,
+        so decoding does not overlap the download. The spool only bounds the
+        raw body in memory: upsert mode then holds one processed batch at a
+        time, but incremental and archive modes still build the whole feed
+        with ``collect_batch``.
+        
+        Returns:
+            The body, positioned at the start (caller closes it), or None
+        
+        Raises:
+            httpx.HTTPStatusError: For error responses (with the body read)
+        """
+        conditional = self.config.get("conditional_fetch", True)
+        key = self.fetch_state_key(url)
+        previous = fetch_states.get(key) if conditional else None
+        request_headers = dict(headers or {})
+        if previous is not None:
+            if previous.etag:
+                request_headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                request_headers["If-Modified-Since"] = previous.last_modified
+        
+        client = self.http_client(url, verify)
+        async with client.stream("GET", url, headers=request_headers, timeout=timeout) as response:
+            if response.status_code == 304 and previous is not None:
+                self.unchanged = True
+                self.logger.info("Source not modified", url=url)
+                return None
+            if response.is_error:
+                # Read the (small) error body so it can be logged
+                await response.aread()
+            response.raise_for_status()
+            
+            body = tempfile.SpooledTemporaryFile(max_size=settings.INGEST_SPOOL_MAX_BYTES)
+            digest = hashlib.blake2b(digest_size=16)
+            try:
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+                    body.write(chunk)
+            except BaseException:
+                body.close()
+                raise
+            
+            state = FetchState(response.headers.get("etag"), response.headers.get("last-modified"), digest.hexdigest())
+            self.last_fetch_state = state
+        
+        if previous is not None and previous.body_hash == state.body_hash:
+            body.close()
+            self.unchanged = True
+            self.logger.info("Source body unchanged", url=url, bytes=response.num_bytes_downloaded)
+            return None
+        
+        if conditional:
+            self._pending_fetch_state = (key, state)
+        body.seek(0)
+        return body
+    
+    def _commit_fetch_state(self) -> None:
+        """Remember the fetched response once its data has been stored"""
+        if self._pending_fetch_state is not None:
+            key, state = self._pending_fetch_state
+            fetch_states[key] = state
+            self._pending_fetch_state = None
     
     @abstractmethod
     async def fetch_data(self) -> List[Dict[str, Any]]:
@@ -37,23 +170,57 @@ class BaseDataClient(ABC):
         """Store processed data in database. Returns stats dict with counts."""
         pass
     
-    async def process_data(self) -> List[Dict[str, Any]]:
-        """Process and validate fetched data"""
-        try:
-            raw_data = await self.fetch_data()
-            transformed_data = self.transform_data(raw_data)
-            validated_data = []
-            
-            for record in transformed_data:
+    async def stream_data(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield raw records one at a time.
+        
+        Defaults to ``fetch_data``; clients reading large responses override
+        this to decode records as the body arrives.
+        """
+        for record in await self.fetch_data():
+            yield record
+    
+    async def iter_processed(self, stats: Optional[Dict[str, int]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield transformed and validated records as they are fetched.
+        
+        Clients declaring a ``record_spec`` map and validate each raw record
+        in one pass with it; others run ``transform_data`` and
+        ``validate_data`` per record. Either way no intermediate list of the
+        whole feed is built. ``stats`` (if given) is filled with
+        total/transformed/validated counts.
+        """
+        stats = stats if stats is not None else {}
+        stats.update(total=0, transformed=0, validated=0)
+        
+        if self.record_spec is not None:
+            apply = self.record_spec.apply
+            async for raw_record in self.stream_data():
+                stats["total"] += 1
+                record = apply(raw_record)
+                if record is not None:
+                    stats["transformed"] += 1
+                    stats["validated"] += 1
+                    yield record
+            return
+        
+        async for raw_record in self.stream_data():
+            stats["total"] += 1
+            for record in self.transform_data([raw_record]):
+                stats["transformed"] += 1
                 if self.validate_data(record):
-                    validated_data.append(record)
+                    stats["validated"] += 1
+                    yield record
                 else:
                     self.logger.warning("Invalid data record", record=record)
+    
+    async def process_data(self) -> List[Dict[str, Any]]:
+        """Process and validate fetched data"""
+        try:
+            stats: Dict[str, int] = {}
+            validated_data = [record async for record in self.iter_processed(stats)]
             
-            self.logger.info("Data processing completed", 
-                           total=len(raw_data), 
-                           transformed=len(transformed_data),
-                           validated=len(validated_data))
+            self.logger.info("Data processing completed", **stats)
             
             return validated_data
             
@@ -61,32 +228,104 @@ class BaseDataClient(ABC):
             self.logger.error("Error processing data", error=str(e))
             raise
     
-    async def fetch_and_store_data(self, session: AsyncSession, tenant_id: UUID, use_archive_refresh: bool = False) -> Dict[str, Any]:
-        """Complete workflow: fetch, process, and store data"""
+    async def iter_batches(self, batch_size: int) -> AsyncIterator[Sequence[Dict[str, Any]]]:
+        """
+        Yield processed records in batches of at most ``batch_size`` as they are fetched.
+        
+        Clients with a ``batch_class`` get columnar batches built from each
+        chunk of raw records; others get lists from ``iter_processed``.
+        """
+        chunk: List[Dict[str, Any]] = []
+        records = self.stream_data() if self.batch_class is not None else self.iter_processed()
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= batch_size:
+                yield self.batch_class.from_records(chunk) if self.batch_class is not None else chunk
+                chunk = []
+        if chunk:
+            yield self.batch_class.from_records(chunk) if self.batch_class is not None else chunk
+    
+    async def collect_batch(self) -> Sequence[Dict[str, Any]]:
+        """Processed records of the whole feed, as one columnar batch when the client has a ``batch_class``"""
+        if self.batch_class is None:
+            return await self.process_data()
+        
+        batch = self.batch_class.from_records([record async for record in self.stream_data()])
+        self.logger.info("Data processing completed", total=batch.total, validated=len(batch))
+        return batch
+    
+    async def _stream_and_store(self, session: AsyncSession, tenant_id: UUID) -> Dict[str, int]:
+        """
+        Upsert records in batches as they are fetched.
+        
+        Only one batch of processed records is held at a time.
+        
+        Returns:
+            Collected count and summed storage stats
+        """
+        batch_size = self.config.get("stream_batch_size") or settings.INGEST_STREAM_BATCH_SIZE
+        totals: Dict[str, int] = {"collected": 0}
+        
+        async for batch in self.iter_batches(batch_size):
+            result = await self.store_data(session, tenant_id, batch)
+            totals["collected"] += len(batch)
+            for name, count in result.items():
+                totals[name] = totals.get(name, 0) + count
+        
+        return totals
+    
+    async def fetch_and_store_data(
+        self,
+        session: AsyncSession,
+        tenant_id: UUID,
+        use_archive_refresh: bool = False,
+        storage_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Complete workflow: fetch, process, and store data.
+        
+        ``storage_mode`` is one of STORAGE_MODES. When omitted it falls back to
+        the legacy ``use_archive_refresh`` flag.
+        
+        When the source is unchanged since this tenant and job last stored
+        it, nothing is parsed or written, and the result has ``unchanged`` set.
+        """
+        self.tenant_id = tenant_id
         try:
-            # Process data
-            processed_data = await self.process_data()
+            if storage_mode is None:
+                storage_mode = STORAGE_MODE_ARCHIVE_REFRESH if use_archive_refresh else STORAGE_MODE_UPSERT
+            if storage_mode not in STORAGE_MODES:
+                raise ValueError(f"Unknown storage mode: {storage_mode}")
             
-            # Store in database
-            if processed_data:
-                if use_archive_refresh:
+            if storage_mode == STORAGE_MODE_UPSERT:
+                # Upserts need no view of the whole feed, so they are written batch by batch
+                storage_result = await self._stream_and_store(session, tenant_id)
+                collected = storage_result.pop("collected")
+            else:
+                # Archive and incremental refreshes compare against the whole feed
+                processed_data = await self.collect_batch()
+                collected = len(processed_data)
+                storage_result = {}
+                if storage_mode == STORAGE_MODE_ARCHIVE_REFRESH and processed_data:
                     storage_result = await self.archive_and_refresh_data(session, tenant_id, processed_data)
-                else:
-                    storage_result = await self.store_data(session, tenant_id, processed_data)
-                
-                self.logger.info(
-                    "Data collection and storage completed",
-                    collected=len(processed_data),
-                    archive_refresh=use_archive_refresh,
-                    **storage_result
-                )
-                
+                elif processed_data:
+                    storage_result = await self.incremental_refresh_data(session, tenant_id, processed_data)
+            
+            if self.unchanged:
+                self.logger.info("Source unchanged, nothing stored", storage_mode=storage_mode)
                 return {
                     "success": True,
-                    "collected": len(processed_data),
-                    **storage_result
+                    "unchanged": True,
+                    "collected": 0,
+                    "created": 0,
+                    "updated": 0,
+                    "errors": 0
                 }
-            else:
+            
+            # Stored: the next identical response can be skipped
+            self._commit_fetch_state()
+            
+            if not collected:
                 self.logger.warning("No data collected")
                 return {
                     "success": True,
@@ -95,6 +334,19 @@ class BaseDataClient(ABC):
                     "updated": 0,
                     "errors": 0
                 }
+            
+            self.logger.info(
+                "Data collection and storage completed",
+                collected=collected,
+                storage_mode=storage_mode,
+                **storage_result
+            )
+            
+            return {
+                "success": True,
+                "collected": collected,
+                **storage_result
+            }
                 
         except Exception as e:
             self.logger.error("Error in fetch and store workflow", error=str(e))
@@ -115,4 +367,12 @@ class BaseDataClient(ABC):
         # This method should be implemented by specific client types
         # For aircraft clients, this will use AircraftService.archive_and_refresh_aircraft_data
         # For other data types, implement similar logic
-        raise NotImplementedError("Subclasses must implement archive_and_refresh_data method")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement archive_and_refresh_data method")
+    
+    async def incremental_refresh_data(self, session: AsyncSession, tenant_id: UUID, data: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Write only new and changed records, archiving departed or materially changed ones.
+        Default implementation - subclasses can override for specific behavior.
+        """
+        # For aircraft clients, this will use AircraftService.incremental_refresh_aircraft_data
+        raise NotImplementedError("Subclasses must implement incremental_refresh_data method")
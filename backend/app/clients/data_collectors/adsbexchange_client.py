@@ -4,8 +4,7 @@ Collects military aircraft data from ADSBExchange via RapidAPI
 """
 import asyncio
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from typing import AsyncIterator, Dict, List, Any, Optional
 from uuid import UUID
 
 import httpx
@@ -13,8 +12,9 @@ import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.clients.base_client import BaseDataClient
-from app.services.aircraft_service import AircraftService
+from app.services.aircraft_service import AIRCRAFT_FEED_SPEC, AircraftBatch, AircraftService
 from app.core.config import settings
+from app.utils.json_stream import iter_json_array, read_chunks
 
 logger = structlog.get_logger()
 
@@ -22,6 +22,10 @@ logger = structlog.get_logger()
 class ADSBExchangeClient(BaseDataClient):
     """Client for ADSBExchange RapidAPI military aircraft data"""
     
+    # Feed records are mapped once here and handed to AircraftService as-is
+    record_spec = AIRCRAFT_FEED_SPEC
+    batch_class = AircraftBatch
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.api_key = self.config.get("rapidapi_key", settings.ADSBEXCHANGE_RAPIDAPI_KEY)
@@ -39,27 +43,34 @@ class ADSBExchangeClient(BaseDataClient):
     
     async def fetch_data(self) -> List[Dict[str, Any]]:
         """Fetch aircraft data from ADSBExchange RapidAPI"""
+        return [aircraft async for aircraft in self.stream_data()]
+    
+    async def stream_data(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield aircraft from ADSBExchange RapidAPI.
+        
+        The body is spooled and hashed by ``conditional_get``; an unchanged
+        feed yields nothing. Otherwise each aircraft is decoded from the
+        ``ac`` array and handed on before the next one is read, so the
+        decoded feed is never held whole.
+        """
         url = f"{self.base_url}{self.endpoint}"
         
         try:
             self.logger.info("Fetching aircraft data from ADSBExchange", url=url)
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                
+            body = await self.conditional_get(url, headers=self.headers, timeout=self.timeout)
+            if body is None:
+                return
+            
+            with body:
                 # ADSBExchange returns data in format: {"ac": [...], "ctime": ..., "ptime": ...}
-                aircraft_list = data.get("ac", [])
-                
-                self.logger.info(
-                    "Successfully fetched aircraft data",
-                    count=len(aircraft_list),
-                    response_time=response.elapsed.total_seconds() if response.elapsed else None
-                )
-                
-                return aircraft_list
+                count = 0
+                async for aircraft in iter_json_array(read_chunks(body), "ac"):
+                    count += 1
+                    yield aircraft
+            
+            self.logger.info("Successfully fetched aircraft data", count=count)
                 
         except httpx.TimeoutException:
             self.logger.error("Request timeout while fetching aircraft data", url=url)
@@ -80,123 +91,24 @@ class ADSBExchangeClient(BaseDataClient):
             raise
     
     def validate_data(self, data: Dict[str, Any]) -> bool:
-        """Validate aircraft data from ADSBExchange"""
-        if not isinstance(data, dict):
-            return False
-        
-        # Check for required fields
-        hex_code = data.get("hex")
-        if not hex_code or not isinstance(hex_code, str):
-            return False
-        
-        # Validate hex code format (6 character hexadecimal)
-        if len(hex_code) != 6:
-            return False
-        
-        try:
-            int(hex_code, 16)  # Validate it's valid hex
-        except ValueError:
-            return False
-        
-        # Check aircraft type
-        aircraft_type = data.get("type")
-        if not aircraft_type or aircraft_type not in ["adsb_icao", "mode_s", "tisb", "mlat"]:
-            return False
-        
-        # Validate coordinates if present
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is not None and lon is not None:
-            if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
-                return False
-        
-        # Validate altitude if present
-        alt = data.get("alt_baro")
-        if alt is not None and alt != "ground":
-            if not isinstance(alt, (int, float)) or alt < -1000 or alt > 60000:
-                return False
-        
-        return True
+        """Validate a raw ADSBExchange aircraft record"""
+        return self.record_spec.apply(data) is not None
     
     def transform_data(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Transform ADSBExchange data to our internal format"""
-        transformed = []
-        
-        for aircraft in raw_data:
-            if not self.validate_data(aircraft):
-                continue
-            
-            # Transform to our internal format
-            transformed_aircraft = {
-                # Core identification
-                "hex": aircraft.get("hex"),
-                "type": aircraft.get("type"),
-                "flight": aircraft.get("flight", "").strip() if aircraft.get("flight") else None,
-                "registration": aircraft.get("r"),
-                "aircraft_type_code": aircraft.get("t"),
-                
-                # Flags and metadata
-                "db_flags": aircraft.get("dbFlags"),
-                "squawk": aircraft.get("squawk"),
-                "emergency": aircraft.get("emergency", "none"),
-                "category": aircraft.get("category"),
-                
-                # Position data
-                "latitude": aircraft.get("lat"),
-                "longitude": aircraft.get("lon"),
-                "altitude_baro": aircraft.get("alt_baro") if aircraft.get("alt_baro") != "ground" else 0,
-                "altitude_geom": aircraft.get("alt_geom"),
-                
-                # Movement data
-                "ground_speed": aircraft.get("gs"),
-                "track": aircraft.get("track"),
-                "true_heading": aircraft.get("true_heading"),
-                "vertical_rate": aircraft.get("geom_rate"),
-                
-                # Quality indicators
-                "nic": aircraft.get("nic"),
-                "nac_p": aircraft.get("nac_p"),
-                "nac_v": aircraft.get("nac_v"),
-                "sil": aircraft.get("sil"),
-                "sil_type": aircraft.get("sil_type"),
-                "sda": aircraft.get("sda"),
-                
-                # Signal data
-                "messages": aircraft.get("messages"),
-                "seen": aircraft.get("seen"),
-                "seen_pos": aircraft.get("seen_pos"),
-                "rssi": aircraft.get("rssi"),
-                
-                # GPS data for aircraft without current position
-                "gps_ok_before": aircraft.get("gpsOkBefore"),
-                "gps_ok_lat": aircraft.get("gpsOkLat"),
-                "gps_ok_lon": aircraft.get("gpsOkLon"),
-                
-                # Store raw data for debugging
-                "raw_data": aircraft,
-                
-                # Add collection metadata
-                "collected_at": datetime.utcnow().isoformat(),
-                "data_source": "adsbexchange_rapidapi"
-            }
-            
-            # Handle lastPosition data for aircraft without current position
-            if not transformed_aircraft["latitude"] and aircraft.get("lastPosition"):
-                last_pos = aircraft["lastPosition"]
-                transformed_aircraft["latitude"] = last_pos.get("lat")
-                transformed_aircraft["longitude"] = last_pos.get("lon")
-                transformed_aircraft["nic"] = last_pos.get("nic")
-                transformed_aircraft["seen_pos"] = last_pos.get("seen_pos")
-            
-            transformed.append(transformed_aircraft)
-        
-        return transformed
+        """Map raw ADSBExchange records onto aircraft columns, dropping invalid ones"""
+        apply = self.record_spec.apply
+        return [record for record in map(apply, raw_data) if record is not None]
     
     async def store_data(self, session: AsyncSession, tenant_id: UUID, data: List[Dict[str, Any]]) -> Dict[str, int]:
         """Store aircraft data in database"""
         try:
             aircraft_service = AircraftService(session)
-            result = await aircraft_service.process_bulk_aircraft_data(tenant_id, data)
+            result = await aircraft_service.process_bulk_aircraft_data(
+                tenant_id,
+                data,
+                chunk_size=self.config.get("upsert_chunk_size"),
+                mapped=True
+            )
             
             self.logger.info(
                 "Aircraft data stored successfully",
@@ -223,7 +135,8 @@ class ADSBExchangeClient(BaseDataClient):
             result = await aircraft_service.archive_and_refresh_aircraft_data(
                 tenant_id, 
                 data, 
-                archive_reason="adsb_scheduled_refresh"
+                archive_reason="adsb_scheduled_refresh",
+                mapped=True
             )
             
             self.logger.info(
@@ -244,6 +157,31 @@ class ADSBExchangeClient(BaseDataClient):
             self.logger.error("Failed to archive and refresh aircraft data", error=str(e))
             raise
     
+    async def incremental_refresh_data(self, session: AsyncSession, tenant_id: UUID, data: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Write only new and changed aircraft, archiving departed or materially changed ones"""
+        try:
+            aircraft_service = AircraftService(session)
+            result = await aircraft_service.incremental_refresh_aircraft_data(
+                tenant_id,
+                data,
+                archive_reason="adsb_incremental",
+                min_distance_m=self.config.get("archive_min_distance_m"),
+                min_altitude_ft=self.config.get("archive_min_altitude_ft"),
+                mapped=True
+            )
+            
+            self.logger.info(
+                "Aircraft data incrementally refreshed",
+                aircraft_count=len(data),
+                **result
+            )
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error("Failed to incrementally refresh aircraft data", error=str(e))
+            raise
+    
     def get_client_info(self) -> Dict[str, Any]:
         """Get information about this client"""
         return {
@@ -0,0 +1,139 @@
+"""
+Composite ADSBExchange Client
+Collects aircraft from several ADSBExchange endpoints concurrently and merges them by ICAO hex
+"""
+import asyncio
+import hashlib
+import math
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from app.clients.base_client import FetchState, fetch_states
+from app.clients.data_collectors.adsbexchange_client import ADSBExchangeClient
+from app.core.config import settings
+
+
+# A position and the metadata describing its quality and age. They are only
+# meaningful together, so they always come from the winning record.
+POSITION_FIELDS = frozenset({
+    "lat", "lon", "seen_pos", "lastPosition", "nic", "rc", "nac_p", "nac_v",
+    "sil", "sil_type", "gva", "sda", "gpsOkBefore", "gpsOkLat", "gpsOkLon",
+})
+
+
+def _has_position(aircraft: Dict[str, Any]) -> bool:
+    return aircraft.get("lat") is not None and aircraft.get("lon") is not None
+
+
+def position_age(aircraft: Dict[str, Any]) -> float:
+    """Seconds since the record's position was received (infinite when it has none)"""
+    if _has_position(aircraft):
+        seen_pos = aircraft.get("seen_pos")
+    else:
+        seen_pos = (aircraft.get("lastPosition") or {}).get("seen_pos")
+    return float(seen_pos) if isinstance(seen_pos, (int, float)) else math.inf
+
+
+def _preference(aircraft: Dict[str, Any]) -> Tuple[bool, float, float]:
+    """Sort key preferring a current position, then the freshest one, then the best integrity (nic)"""
+    nic = aircraft.get("nic")
+    return not _has_position(aircraft), position_age(aircraft), -(nic if isinstance(nic, (int, float)) else -1)
+
+
+def merge_aircraft(sources: Iterable[Iterable[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Merge raw ADSBExchange records from several sources into one per ICAO hex.
+    
+    A record with a current position beats one with only ``lastPosition``;
+    among those the freshest (lowest ``seen_pos``) wins, with the higher
+    ``nic`` breaking ties, so nic stays with the position it describes.
+    Other fields the winner lacks are filled from the other records; the
+    POSITION_FIELDS never are, so a position is not paired with another
+    record's integrity or age.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for records in sources:
+        for aircraft in records:
+            hex_code = aircraft.get("hex")
+            if not isinstance(hex_code, str):
+                continue
+            key = hex_code.lower()
+            
+            current = merged.get(key)
+            if current is None:
+                merged[key] = aircraft
+                continue
+            
+            best, other = (aircraft, current) if _preference(aircraft) < _preference(current) else (current, aircraft)
+            missing = {
+                name: value for name, value in other.items()
+                if best.get(name) is None and name not in POSITION_FIELDS
+            }
+            merged[key] = {**best, **missing} if missing else best
+    
+    return merged
+
+
+class CompositeADSBExchangeClient(ADSBExchangeClient):
+    """
+    Client fetching several ADSBExchange endpoints (or regional queries) in one run.
+    
+    Endpoints are fetched concurrently, at most ``max_concurrency`` at a
+    time, so wider coverage costs about one upstream round trip rather than
+    one per endpoint. Results are merged by hex and stored as one batch.
+    Configure with ``endpoints``, e.g. ``["/v2/mil/", "/v2/lat/51.5/lon/-0.1/dist/250/"]``.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
+        self.endpoints: List[str] = list(self.config.get("endpoints") or [self.endpoint])
+        self.max_concurrency = self.config.get("max_concurrency") or settings.COLLECTOR_MAX_CONCURRENCY
+    
+    async def _fetch_endpoint(self, endpoint: str, semaphore: asyncio.Semaphore) -> Tuple[str, List[Dict[str, Any]]]:
+        """Fetch one endpoint in full, returning its body hash and aircraft"""
+        async with semaphore:
+            # Each endpoint is fetched unconditionally; change detection applies to the merged set
+            client = ADSBExchangeClient({**self.config, "endpoint": endpoint, "conditional_fetch": False})
+            aircraft = [record async for record in client.stream_data()]
+            return client.last_fetch_state.body_hash, aircraft
+    
+    async def stream_data(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the merged aircraft of every endpoint.
+        
+        Any endpoint failing fails the run, so incremental and archive
+        refreshes never treat aircraft from a missing region as departed.
+        The run is unchanged when every endpoint returned the same bodies as
+        the last stored run.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._fetch_endpoint(endpoint, semaphore) for endpoint in self.endpoints))
+        
+        digest = hashlib.blake2b(digest_size=16)
+        for endpoint, (body_hash, _) in zip(self.endpoints, results):
+            digest.update(f"{endpoint}={body_hash};".encode())
+        key = self.fetch_state_key(f"{self.base_url}#composite:{','.join(self.endpoints)}")
+        
+        previous = fetch_states.get(key)
+        if previous is not None and previous.body_hash == digest.hexdigest():
+            self.unchanged = True
+            self.logger.info("Endpoints unchanged", endpoints=len(self.endpoints))
+            return
+        self._pending_fetch_state = (key, FetchState(body_hash=digest.hexdigest()))
+        
+        merged = merge_aircraft(aircraft for _, aircraft in results)
+        self.logger.info("Merged aircraft from endpoints",
+                        endpoints=len(self.endpoints),
+                        fetched=sum(len(aircraft) for _, aircraft in results),
+                        merged=len(merged))
+        
+        for aircraft in merged.values():
+            yield aircraft
+    
+    def get_client_info(self) -> Dict[str, Any]:
+        """Get information about this client"""
+        return {
+            **super().get_client_info(),
+            "name": "Composite ADSBExchange RapidAPI Client",
+            "endpoints": [f"{self.base_url}{endpoint}" for endpoint in self.endpoints],
+            "description": "Collects aircraft from several ADSBExchange endpoints, merged by ICAO hex"
+        }
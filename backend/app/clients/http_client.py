@@ -0,0 +1,247 @@
+"""
+Shared outbound HTTP clients for data collectors
+"""
+import asyncio
+import contextlib
+import ipaddress
+import socket
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+import structlog
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+logger = structlog.get_logger()
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches host name resolution.
+    
+    Addresses are resolved once per TTL and tried in order. TLS still uses
+    the original host name for SNI and certificate checks, since httpcore
+    passes it separately to ``start_tls``.
+    """
+    
+    def __init__(self, ttl: float, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+    
+    async def resolve(self, host: str, port: int) -> List[str]:
+        """Addresses for a host, from the cache while fresh"""
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        
+        cached = self._cache.get((host, port))
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(f"Failed to resolve {host}: {e}") from e
+        
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+    
+    def forget(self, host: str, port: int) -> None:
+        """Drop a cached resolution"""
+        self._cache.pop((host, port), None)
+    
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[httpcore.SOCKET_OPTION]] = None
+    ) -> httpcore.AsyncNetworkStream:
+        """Connect to the first reachable cached address of a host"""
+        error: Optional[Exception] = None
+        for address in await self.resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        
+        # Every address failed: the records may be stale
+        self.forget(host, port)
+        raise error or httpcore.ConnectError(f"No addresses for {host}")
+    
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable[httpcore.SOCKET_OPTION]] = None
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+    
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore exceptions and the httpx exceptions collectors catch
+_HTTPCORE_ERRORS = {
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.ProtocolError: httpx.ProtocolError,
+}
+
+
+@contextlib.contextmanager
+def _httpx_errors() -> Iterator[None]:
+    """Re-raise httpcore errors as their httpx equivalents"""
+    try:
+        yield
+    except Exception as e:
+        for core_error, httpx_error in _HTTPCORE_ERRORS.items():
+            if isinstance(e, core_error):
+                raise httpx_error(str(e)) from e
+        raise
+
+
+class _PoolResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterator[bytes]):
+        self._stream = stream
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+    
+    async def aclose(self) -> None:
+        with _httpx_errors():
+            await self._stream.aclose()
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport over an ``httpcore.AsyncConnectionPool``.
+    
+    ``httpx.AsyncHTTPTransport`` cannot be given a network backend, so the
+    registry builds the pool itself (with the shared DNS cache) and sends
+    requests through this thin adapter.
+    """
+    
+    def __init__(self, pool: httpcore.AsyncConnectionPool):
+        self.pool = pool
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions
+        )
+        with _httpx_errors():
+            response = await self.pool.handle_async_request(core_request)
+        
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_PoolResponseStream(response.stream),
+            extensions=response.extensions
+        )
+    
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+def _origin(url: str) -> str:
+    """scheme://host[:port] of a URL"""
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"Not an absolute URL: {url}")
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpClientRegistry:
+    """
+    One pooled ``httpx.AsyncClient`` per upstream origin.
+    
+    Collectors share these clients across scheduled runs, so connections
+    (and TLS sessions) are kept alive between fetches instead of being set
+    up on every run. Each origin gets its own pool, which is what bounds
+    connections per host; all pools share one DNS cache.
+    """
+    
+    def __init__(self):
+        self._clients: Dict[Tuple[str, bool], httpx.AsyncClient] = {}
+        self.dns = CachingDNSBackend(settings.HTTP_CLIENT_DNS_TTL_SECONDS)
+    
+    def get(self, url: str, verify: bool = True) -> httpx.AsyncClient:
+        """
+        Get the shared client for a URL's origin, creating it on first use.
+        
+        ``verify=False`` gets a separate pool that skips certificate checks.
+        """
+        key = (_origin(url), verify)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._clients[key] = self._create(key[0], verify)
+        return client
+    
+    def _create(self, origin: str, verify: bool) -> httpx.AsyncClient:
+        http2 = settings.HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE
+        pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify, http2=http2),
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            http2=http2,
+            retries=1,
+            network_backend=self.dns
+        )
+        
+        logger.info("Created pooled HTTP client", origin=origin, verify=verify, http2=http2)
+        return httpx.AsyncClient(
+            base_url=origin,
+            transport=PoolTransport(pool),
+            timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+            headers={"User-Agent": "SkyTrace/1.0"}
+        )
+    
+    async def close(self) -> None:
+        """Close every client and its connections"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+        if clients:
+            logger.info("Closed pooled HTTP clients", count=len(clients))
+
+
+# Global registry shared by all data collectors, closed on application shutdown
+http_clients = HttpClientRegistry()
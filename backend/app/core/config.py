@@ -30,6 +30,106 @@ class Settings(BaseSettings):
     # Data collection settings
     DEFAULT_REFRESH_INTERVAL: int = Field(default=60, description="Default data refresh interval in seconds")
     MAX_AIRCRAFT_AGE: int = Field(default=300, description="Maximum age for aircraft data in seconds")
+    BULK_UPSERT_CHUNK_SIZE: int = Field(
+        default=500,
+        description="Rows per INSERT ... ON CONFLICT statement during bulk aircraft ingest"
+    )
+    INGEST_STREAM_BATCH_SIZE: int = Field(
+        default=2000,
+        description="Processed records written per batch while streaming an upsert ingest"
+    )
+    INGEST_SPOOL_MAX_BYTES: int = Field(
+        default=8 * 1024 * 1024,
+        description="Feed bytes kept in memory while hashing a response; larger bodies spill to a temporary file"
+    )
+    COLLECTOR_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="Endpoints a composite collector fetches at the same time"
+    )
+    INCREMENTAL_ARCHIVE_MIN_DISTANCE_M: float = Field(
+        default=1000.0,
+        description="Movement in metres that archives an aircraft's previous position during incremental refresh"
+    )
+    INCREMENTAL_ARCHIVE_MIN_ALTITUDE_FT: int = Field(
+        default=500,
+        description="Altitude change in feet that archives an aircraft's previous state during incremental refresh"
+    )
+    GEOJSON_STREAM_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Features fetched per cursor batch when streaming aircraft GeoJSON"
+    )
+    GEOJSON_CLUSTER_MAX_ZOOM: int = Field(
+        default=6,
+        description="Highest map zoom at which aircraft GeoJSON is thinned to one aircraft per grid cell"
+    )
+    GEOJSON_CLUSTER_CELL_PX: int = Field(
+        default=32,
+        description="Grid cell size in screen pixels used to thin aircraft GeoJSON at low zoom"
+    )
+    
+    # Live fleet cache
+    FLEET_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Serve aircraft reads from an in-memory snapshot rebuilt after each ingest"
+    )
+    
+    # Vector tiles
+    TILE_CACHE_MAX_ENTRIES: int = Field(default=4096, description="Maximum number of rendered aircraft tiles kept in memory")
+    TILE_EXTENT: int = Field(default=4096, description="Vector tile extent in tile coordinate units")
+    TILE_BUFFER: int = Field(default=64, description="Vector tile buffer in tile coordinate units")
+    
+    # Aircraft push stream
+    STREAM_KEEPALIVE_SECONDS: int = Field(default=15, description="Seconds between keepalive comments on idle aircraft streams")
+    STREAM_MAX_PENDING_EVENTS: int = Field(
+        default=32,
+        description="Queued events per stream client before it is resynchronised with a full snapshot"
+    )
+    
+    # Airspace cache
+    AIRSPACE_CACHE_TTL_SECONDS: int = Field(
+        default=900,
+        description="Age after which cached airspace is served stale while a refresh runs in the background"
+    )
+    AIRSPACE_REFRESH_INTERVAL_MINUTES: int = Field(default=10, description="Minutes between scheduled airspace refreshes")
+    AIRSPACE_DEFAULT_LIMIT: int = Field(default=3000, description="Airspace record limit refreshed by the scheduler before any request")
+    AIRSPACE_CACHE_MAX_LIMITS: int = Field(default=8, description="Distinct airspace limits kept in the cache")
+    AIRSPACE_FIXTURE_PATH: Optional[str] = Field(
+        default=None,
+        description="Recorded FAA schedule JSON served instead of the live API (local development and tests)"
+    )
+    INCURSION_AIRSPACE_TYPES: List[str] = Field(
+        default=["R", "P"],
+        description="FAA SUA types checked for incursions (R restricted, P prohibited; M, A, W, T are not restricted)"
+    )
+    
+    # HTTP caching
+    HTTP_MAX_AGE_CAP_SECONDS: int = Field(
+        default=300,
+        description="Upper bound on the max-age hint given for live data, which otherwise runs to the next scheduled ingest"
+    )
+    
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, description="Smallest response body in bytes that is compressed")
+    COMPRESSION_DYNAMIC_GZIP_LEVEL: int = Field(default=5, description="Gzip level for responses compressed per request")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=9, description="Gzip level for payloads precompressed once per data generation")
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=9, description="Brotli quality for precompressed payloads")
+    COMPRESSION_ZSTD_LEVEL: int = Field(default=12, description="Zstandard level for precompressed payloads")
+    
+    # Aircraft archive partitioning
+    ARCHIVE_PARTITION_INTERVAL: str = Field(default="daily", description="aircraft_archive partition size (hourly or daily)")
+    ARCHIVE_PARTITIONS_AHEAD: int = Field(default=3, description="Number of future archive partitions to pre-create")
+    ARCHIVE_RETENTION_DAYS: int = Field(default=30, description="Days of archive history to keep")
+    ARCHIVE_RETENTION_ACTION: str = Field(
+        default="drop",
+        description="What to do with expired archive partitions (drop or detach)"
+    )
+    
+    # Outbound HTTP (shared collector clients)
+    HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST: int = Field(default=10, description="Pooled connections per upstream host")
+    HTTP_CLIENT_KEEPALIVE_SECONDS: float = Field(default=120.0, description="Idle seconds before a pooled connection is closed")
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = Field(default=30.0, description="Default timeout for upstream requests")
+    HTTP_CLIENT_HTTP2: bool = Field(default=True, description="Negotiate HTTP/2 with upstreams when h2 is installed")
+    HTTP_CLIENT_DNS_TTL_SECONDS: float = Field(default=300.0, description="Seconds upstream host name resolutions are cached")
     
     # ADSBExchange API settings
     ADSBEXCHANGE_RAPIDAPI_KEY: str = Field(
@@ -0,0 +1,22 @@
+"""
+ASGI middleware for the SkyTrace API
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Gzip dynamic responses.
+    
+    Responses that already carry a Content-Encoding (precompressed payloads)
+    pass through untouched. Event streams are skipped because gzip would
+    buffer events until enough output accumulates.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "text/event-stream" in Headers(scope=scope).get("accept", ""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -7,6 +7,8 @@ from .feature_flag import FeatureFlag
 from .data_source import DataSource
 from .aircraft import Aircraft
 from .map_layer import MapLayer
+from .airspace import Airspace
+from .airspace_incursion import AirspaceIncursion
 
 __all__ = [
     "Tenant",
@@ -15,4 +17,6 @@ __all__ = [
     "DataSource",
     "Aircraft",
     "MapLayer",
+    "Airspace",
+    "AirspaceIncursion",
 ]
\ No newline at end of file
@@ -62,6 +62,7 @@ class Aircraft(Base):
     
     # Raw data
     raw_data = Column(JSONB)
+    content_hash = Column(String(32))  # Fingerprint of the aircraft's state, used for incremental refresh
     
     # Relationships
     tenant = relationship("Tenant", back_populates="aircraft")
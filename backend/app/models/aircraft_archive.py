@@ -62,8 +62,8 @@ class AircraftArchive(Base):
     # Raw data
     raw_data = Column(JSONB)
     
-    # Archive-specific fields
-    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Archive-specific fields (archived_at is the partition key, so part of the primary key)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
     original_created_at = Column(DateTime)
     original_last_updated = Column(DateTime)
     archive_reason = Column(String(50), default="scheduled_refresh")
@@ -0,0 +1,47 @@
+"""
+Airspace model for persisted FAA special use airspace schedules
+"""
+from sqlalchemy import Boolean, Column, Computed, DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSTZRANGE, UUID
+from geoalchemy2 import Geometry
+import uuid
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class Airspace(Base):
+    """One scheduled activation of a special use airspace"""
+    
+    __tablename__ = "airspace"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    gid = Column(Integer, nullable=False)  # FAA schedule record id
+    airspace_name = Column(String(255))
+    type = Column(String(10))  # R, A, M, W, P, T
+    type_class = Column(String(20))
+    center_id = Column(String(10))
+    state = Column(String(10))
+    
+    # Validity window; a missing bound is open-ended
+    valid_from = Column(DateTime(timezone=True))
+    valid_to = Column(DateTime(timezone=True))
+    validity = Column(TSTZRANGE, Computed("tstzrange(valid_from, valid_to, '[)')", persisted=True))
+    
+    # Altitude band in feet
+    min_alt_ft = Column(Integer, nullable=False, default=0)
+    max_alt_ft = Column(Integer, nullable=False, default=0)
+    agl = Column(Boolean, nullable=False, default=False)  # min_alt_ft is above ground level
+    
+    geometry = Column(Geometry("POLYGON", srid=4326), nullable=False)  # GIST index idx_airspace_geometry
+    properties = Column(JSONB)  # GeoJSON feature properties as served to clients
+    fetched_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("gid", "valid_from", name="uq_airspace_gid_valid_from", postgresql_nulls_not_distinct=True),
+        Index("idx_airspace_validity", "validity", postgresql_using="gist"),
+        Index("idx_airspace_altitude", "min_alt_ft", "max_alt_ft"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<Airspace(gid={self.gid}, name='{self.airspace_name}', type='{self.type}')>"
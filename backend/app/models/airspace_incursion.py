@@ -0,0 +1,42 @@
+"""
+Airspace incursion model for aircraft detected inside active airspace
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from geoalchemy2 import Geometry
+import uuid
+
+from app.core.database import Base
+
+
+class AirspaceIncursion(Base):
+    """An aircraft's stay inside one active airspace; open while ended_at is NULL"""
+    
+    __tablename__ = "airspace_incursions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    aircraft_id = Column(UUID(as_uuid=True))
+    hex = Column(String(6), nullable=False)  # ICAO 24-bit address
+    flight = Column(String(20))
+    airspace_gid = Column(Integer, nullable=False)  # FAA schedule record id
+    airspace_name = Column(String(255))
+    airspace_type = Column(String(10))
+    
+    # Latest position and altitude seen inside the airspace
+    position = Column(Geometry("POINT", srid=4326))
+    altitude = Column(Integer)
+    
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), nullable=False)
+    ended_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("uq_airspace_incursions_open", "tenant_id", "hex", "airspace_gid",
+              unique=True, postgresql_where=text("ended_at IS NULL")),
+        Index("idx_airspace_incursions_tenant_started", "tenant_id", text("started_at DESC")),
+        Index("idx_airspace_incursions_tenant_hex", "tenant_id", "hex", text("started_at DESC")),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<AirspaceIncursion(hex='{self.hex}', airspace_gid={self.airspace_gid}, ended_at={self.ended_at})>"
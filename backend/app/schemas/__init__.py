@@ -1,14 +1,14 @@
 """
 Pydantic schemas for API request/response models
 """
-from .aircraft import Aircraft, AircraftCreate, AircraftUpdate, AircraftResponse
+from .aircraft import Aircraft, AircraftCreate, AircraftUpdate, AircraftProjection, AircraftResponse
 from .tenant import Tenant, TenantCreate, TenantUpdate, TenantResponse
 from .feature_flag import FeatureFlag, FeatureFlagCreate, FeatureFlagUpdate, FeatureFlagResponse
 from .data_source import DataSource, DataSourceCreate, DataSourceUpdate, DataSourceResponse
 from .map_layer import MapLayer, MapLayerCreate, MapLayerUpdate, MapLayerResponse
 
 __all__ = [
-    "Aircraft", "AircraftCreate", "AircraftUpdate", "AircraftResponse",
+    "Aircraft", "AircraftCreate", "AircraftUpdate", "AircraftProjection", "AircraftResponse",
     "Tenant", "TenantCreate", "TenantUpdate", "TenantResponse",
     "FeatureFlag", "FeatureFlagCreate", "FeatureFlagUpdate", "FeatureFlagResponse",
     "DataSource", "DataSourceCreate", "DataSourceUpdate", "DataSourceResponse",
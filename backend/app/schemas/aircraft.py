@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 from decimal import Decimal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator
 
 from .base import BaseSchema, BaseCreateSchema, BaseUpdateSchema
 
@@ -59,6 +59,12 @@ class AircraftCreate(BaseCreateSchema):
     
     # Raw data
     raw_data: Optional[Dict[str, Any]] = Field(None, description="Raw aircraft data")
+    
+    @field_validator("hex")
+    @classmethod
+    def lowercase_hex(cls, value: str) -> str:
+        """Store hex lowercase, as the feed ingest does"""
+        return value.lower()
 
 
 class AircraftUpdate(BaseUpdateSchema):
@@ -150,9 +156,20 @@ class Aircraft(BaseSchema):
     raw_data: Optional[Dict[str, Any]] = None
 
 
+# Aircraft as the read endpoints return it: ``fields`` and ``include_raw``
+# choose which keys are present, so every field is optional
+AircraftProjection = create_model(
+    "AircraftProjection",
+    __doc__="Aircraft response schema, limited to the requested fields",
+    **{name: (Optional[field.annotation], None) for name, field in Aircraft.model_fields.items()}
+)
+
+
 class AircraftResponse(BaseModel):
     """Aircraft API response schema"""
-    aircraft: List[Aircraft]
-    total: int
+    aircraft: List[AircraftProjection]
+    total: Optional[int] = None
+    total_estimated: bool = False
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -1,23 +1,459 @@
 """
 Aircraft service for business logic
 """
-from typing import Dict, List, Optional, Any
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID
 from datetime import datetime
 
-from sqlalchemy import select, update, text
+from sqlalchemy import Float, Numeric, case, cast, or_, select, update, text, func, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
-from geoalchemy2.functions import ST_Point, ST_GeomFromText
+from geoalchemy2.functions import ST_Point, ST_GeomFromText, ST_X, ST_Y
 import structlog
 
+from app.core.config import settings
 from app.models.aircraft import Aircraft as AircraftModel
 from app.models.aircraft_archive import AircraftArchive as AircraftArchiveModel
 from app.schemas.aircraft import AircraftCreate, AircraftUpdate
+from app.utils.batching import chunked
+from app.utils.geometry import grid_cell_degrees
+from app.utils.record_batch import RecordBatch
+from app.utils.record_spec import FieldSpec, RecordSpec
+from app.utils.serialization import dumps
 from app.utils.validation import validate_aircraft_numeric_fields, safe_aircraft_insert
 
 logger = structlog.get_logger()
 
+# Raw ADSBExchange-format record -> aircraft columns (plus latitude/longitude and
+# raw_data). Shared by the collectors and every storage path, so each record is
+# mapped, coerced and validated once; records that fail map to None.
+AIRCRAFT_FEED_SPEC = RecordSpec(
+    [
+        FieldSpec("hex", lower=True, required=True, pattern=r"[0-9a-f]{6}"),
+        FieldSpec("type", default="adsb_icao", choices=("adsb_icao", "mode_s", "tisb", "mlat")),
+        FieldSpec("flight", coerce=str),
+        FieldSpec("registration", source="r"),
+        FieldSpec("aircraft_type_code", source="t"),
+        FieldSpec("db_flags", source="dbFlags", coerce=int),
+        FieldSpec("squawk"),
+        FieldSpec("emergency", default="none"),
+        FieldSpec("category"),
+        FieldSpec("latitude", source="lat", coerce=float, minimum=-90, maximum=90, fallback=True),
+        FieldSpec("longitude", source="lon", coerce=float, minimum=-180, maximum=180, fallback=True),
+        FieldSpec("altitude_baro", source="alt_baro", coerce=int, literals={"ground": 0}, minimum=-1000, maximum=60000),
+        FieldSpec("altitude_geom", source="alt_geom", coerce=int),
+        FieldSpec("ground_speed", source="gs", coerce=float),
+        FieldSpec("track", coerce=float),
+        FieldSpec("true_heading", coerce=float),
+        FieldSpec("vertical_rate", source="geom_rate", coerce=int),
+        FieldSpec("nic", coerce=int, fallback=True),
+        FieldSpec("nac_p", coerce=int),
+        FieldSpec("nac_v", coerce=int),
+        FieldSpec("sil", coerce=int),
+        FieldSpec("sil_type"),
+        FieldSpec("sda", coerce=int),
+        FieldSpec("messages", coerce=int),
+        FieldSpec("seen", coerce=float),
+        FieldSpec("seen_pos", coerce=float, fallback=True),
+        FieldSpec("rssi", coerce=float),
+        FieldSpec("gps_ok_before", source="gpsOkBefore", coerce=float),
+        FieldSpec("gps_ok_lat", source="gpsOkLat", coerce=float),
+        FieldSpec("gps_ok_lon", source="gpsOkLon", coerce=float),
+    ],
+    # Aircraft without a current position report their last one
+    fallback="lastPosition",
+    fallback_when=("lat", "lon"),
+    raw_field="raw_data"
+)
+
+
+# Temporary table that receives each refresh via COPY. Numeric columns are
+# plain float/int so asyncpg's binary codecs can encode feed values directly.
+STAGING_TABLE = "aircraft_staging"
+
+STAGING_COLUMNS = (
+    "hex", "type", "flight", "registration", "aircraft_type_code", "db_flags",
+    "squawk", "emergency", "category", "latitude", "longitude",
+    "altitude_baro", "altitude_geom", "ground_speed", "track", "true_heading",
+    "vertical_rate", "nic", "nac_p", "nac_v", "sil", "sil_type", "sda",
+    "messages", "seen", "seen_pos", "rssi",
+    "gps_ok_before", "gps_ok_lat", "gps_ok_lon", "raw_data", "content_hash",
+)
+
+CREATE_STAGING_TABLE_SQL = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    hex TEXT NOT NULL,
+    type TEXT,
+    flight TEXT,
+    registration TEXT,
+    aircraft_type_code TEXT,
+    db_flags INTEGER,
+    squawk TEXT,
+    emergency TEXT,
+    category TEXT,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    altitude_baro INTEGER,
+    altitude_geom INTEGER,
+    ground_speed DOUBLE PRECISION,
+    track DOUBLE PRECISION,
+    true_heading DOUBLE PRECISION,
+    vertical_rate INTEGER,
+    nic INTEGER,
+    nac_p INTEGER,
+    nac_v INTEGER,
+    sil INTEGER,
+    sil_type TEXT,
+    sda INTEGER,
+    messages BIGINT,
+    seen DOUBLE PRECISION,
+    seen_pos DOUBLE PRECISION,
+    rssi DOUBLE PRECISION,
+    gps_ok_before DOUBLE PRECISION,
+    gps_ok_lat DOUBLE PRECISION,
+    gps_ok_lon DOUBLE PRECISION,
+    raw_data JSONB,
+    content_hash TEXT
+) ON COMMIT DROP
+"""
+
+# Columns shared verbatim between aircraft and aircraft_archive
+ARCHIVED_COLUMNS = (
+    "tenant_id", "hex", "type", "flight", "registration", "aircraft_type_code",
+    "db_flags", "squawk", "emergency", "category", "position",
+    "altitude_baro", "altitude_geom", "ground_speed", "track", "true_heading",
+    "vertical_rate", "nic", "nac_p", "nac_v", "sil", "sil_type", "sda",
+    "messages", "seen", "seen_pos", "rssi",
+    "gps_ok_before", "gps_ok_lat", "gps_ok_lon", "raw_data",
+)
+
+# Fields that make up an aircraft's content fingerprint. Signal counters
+# (messages, seen, seen_pos, rssi) tick on every poll and are left out so an
+# aircraft that has not moved or changed state hashes the same between runs.
+FINGERPRINT_COLUMNS = (
+    "hex", "type", "flight", "registration", "aircraft_type_code", "db_flags",
+    "squawk", "emergency", "category", "latitude", "longitude",
+    "altitude_baro", "altitude_geom", "ground_speed", "track", "true_heading",
+    "vertical_rate", "nic", "nac_p", "nac_v", "sil", "sil_type", "sda",
+    "gps_ok_before", "gps_ok_lat", "gps_ok_lon",
+)
+
+ARCHIVE_AIRCRAFT_SQL = f"""
+INSERT INTO aircraft_archive (
+    original_aircraft_id, {", ".join(ARCHIVED_COLUMNS)},
+    archived_at, original_created_at, original_last_updated, archive_reason
+)
+SELECT
+    id, {", ".join(ARCHIVED_COLUMNS)},
+    NOW(), created_at, last_updated, CAST(:archive_reason AS VARCHAR)
+FROM aircraft
+WHERE tenant_id = :tenant_id
+"""
+
+# Live columns written from staging on refresh (everything except keys/timestamps)
+_REFRESHED_COLUMNS = tuple(c for c in ARCHIVED_COLUMNS if c not in ("tenant_id", "hex")) + ("content_hash",)
+
+# Staging rows cast to aircraft column types
+_STAGED_AIRCRAFT_SQL = f"""
+SELECT
+    s.hex, CAST(s.type AS aircraft_type) AS type, s.flight, s.registration,
+    s.aircraft_type_code, s.db_flags, s.squawk,
+    CAST(COALESCE(s.emergency, 'none') AS emergency_type) AS emergency, s.category,
+    CASE WHEN s.latitude IS NOT NULL AND s.longitude IS NOT NULL
+         THEN ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326) END AS position,
+    s.altitude_baro, s.altitude_geom, s.ground_speed, s.track, s.true_heading,
+    s.vertical_rate, s.nic, s.nac_p, s.nac_v, s.sil, s.sil_type, s.sda,
+    s.messages, s.seen, s.seen_pos, s.rssi,
+    s.gps_ok_before, s.gps_ok_lat, s.gps_ok_lon, s.raw_data, s.content_hash
+FROM {STAGING_TABLE} s
+"""
+
+_INSERT_STAGED_SQL = f"""
+INSERT INTO aircraft (tenant_id, hex, {", ".join(_REFRESHED_COLUMNS)}, created_at, last_updated)
+SELECT CAST(:tenant_id AS UUID), v.hex, {", ".join(f"v.{c}" for c in _REFRESHED_COLUMNS)}, NOW(), NOW()
+FROM ({_STAGED_AIRCRAFT_SQL}) v
+"""
+
+_DELETE_DEPARTED_SQL = f"""
+DELETE FROM aircraft a
+WHERE a.tenant_id = CAST(:tenant_id AS UUID)
+  AND NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} s WHERE s.hex = a.hex)
+RETURNING 1
+"""
+
+# Upsert staging into aircraft and delete aircraft missing from staging in one
+# statement. The two CTEs touch disjoint hex sets, so neither sees the other's rows.
+SWAP_STAGING_SQL = f"""
+WITH upserted AS (
+    {_INSERT_STAGED_SQL}
+    ON CONFLICT (tenant_id, hex) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _REFRESHED_COLUMNS)},
+        last_updated = NOW()
+    RETURNING 1
+), removed AS (
+    {_DELETE_DEPARTED_SQL}
+)
+SELECT (SELECT COUNT(*) FROM upserted), (SELECT COUNT(*) FROM removed)
+"""
+
+# Archive live rows that departed the feed, or whose fingerprint changed and
+# which moved, climbed/descended or changed identity/emergency state enough to
+# be worth keeping as history.
+ARCHIVE_INCREMENTAL_SQL = f"""
+INSERT INTO aircraft_archive (
+    original_aircraft_id, {", ".join(ARCHIVED_COLUMNS)},
+    archived_at, original_created_at, original_last_updated, archive_reason
+)
+SELECT
+    a.id, {", ".join(f"a.{c}" for c in ARCHIVED_COLUMNS)},
+    NOW(), a.created_at, a.last_updated,
+    CAST(:archive_reason AS VARCHAR) || CASE WHEN v.hex IS NULL THEN '_departed' ELSE '_changed' END
+FROM aircraft a
+LEFT JOIN ({_STAGED_AIRCRAFT_SQL}) v ON v.hex = a.hex
+WHERE a.tenant_id = CAST(:tenant_id AS UUID)
+  AND (
+      v.hex IS NULL
+      OR (
+          a.content_hash IS DISTINCT FROM v.content_hash
+          AND (
+              a.flight IS DISTINCT FROM v.flight
+              OR a.squawk IS DISTINCT FROM v.squawk
+              OR a.emergency IS DISTINCT FROM v.emergency
+              OR (a.position IS NULL) <> (v.position IS NULL)
+              OR ST_DistanceSphere(a.position, v.position) > :min_distance_m
+              OR ABS(COALESCE(a.altitude_baro, 0) - COALESCE(v.altitude_baro, 0)) > :min_altitude_ft
+          )
+      )
+  )
+"""
+
+# Insert new aircraft, update aircraft whose fingerprint changed and delete
+# departed aircraft in one statement; unchanged rows are not written at all.
+INCREMENTAL_REFRESH_SQL = f"""
+WITH changed AS (
+    UPDATE aircraft a SET
+        {", ".join(f"{c} = v.{c}" for c in _REFRESHED_COLUMNS)},
+        last_updated = NOW()
+    FROM ({_STAGED_AIRCRAFT_SQL}) v
+    WHERE a.tenant_id = CAST(:tenant_id AS UUID)
+      AND a.hex = v.hex
+      AND a.content_hash IS DISTINCT FROM v.content_hash
+    RETURNING 1
+), inserted AS (
+    {_INSERT_STAGED_SQL}
+    WHERE NOT EXISTS (
+        SELECT 1 FROM aircraft a
+        WHERE a.tenant_id = CAST(:tenant_id AS UUID) AND a.hex = v.hex
+    )
+    RETURNING 1
+), departed AS (
+    {_DELETE_DEPARTED_SQL}
+)
+SELECT
+    (SELECT COUNT(*) FROM inserted),
+    (SELECT COUNT(*) FROM changed),
+    (SELECT COUNT(*) FROM departed),
+    (SELECT COUNT(*) FROM {STAGING_TABLE})
+"""
+
+
+# GeoJSON feature properties as (property name, aircraft column)
+GEOJSON_PROPERTIES = (
+    ("id", "id"),
+    ("hex", "hex"),
+    ("flight", "flight"),
+    ("registration", "registration"),
+    ("aircraft_type", "aircraft_type_code"),
+    ("altitude", "altitude_baro"),
+    ("speed", "ground_speed"),
+    ("track", "track"),
+    ("squawk", "squawk"),
+    ("emergency", "emergency"),
+    ("category", "category"),
+)
+
+_GEOJSON_COLUMNS = ", ".join([column for _, column in GEOJSON_PROPERTIES] + ["position", "last_updated"])
+
+# Envelope tests use idx_aircraft_position; a box with minLon > maxLon
+# crosses the antimeridian and is split in two
+_BBOX_CLAUSE = """
+  AND position && ST_MakeEnvelope(
+      CAST(:min_lon AS DOUBLE PRECISION), CAST(:min_lat AS DOUBLE PRECISION),
+      CAST(:max_lon AS DOUBLE PRECISION), CAST(:max_lat AS DOUBLE PRECISION), 4326)
+"""
+
+_ANTIMERIDIAN_BBOX_CLAUSE = """
+  AND (position && ST_MakeEnvelope(
+           CAST(:min_lon AS DOUBLE PRECISION), CAST(:min_lat AS DOUBLE PRECISION),
+           180, CAST(:max_lat AS DOUBLE PRECISION), 4326)
+       OR position && ST_MakeEnvelope(
+           -180, CAST(:min_lat AS DOUBLE PRECISION),
+           CAST(:max_lon AS DOUBLE PRECISION), CAST(:max_lat AS DOUBLE PRECISION), 4326))
+"""
+
+
+def build_geojson_sql(bbox: Optional[Tuple[float, float, float, float]] = None, cluster: bool = False) -> str:
+    """
+    Build the query that renders one GeoJSON feature (as text) per row.
+    
+    PostGIS renders each feature, so only the serialized text crosses the
+    wire and raw_data is never read. With ``cluster`` aircraft are grouped
+    into grid cells of ``:cell_degrees``; the most recently updated aircraft
+    of each cell is returned with a ``point_count`` property.
+    """
+    properties = [f"'{name}', {column}" for name, column in GEOJSON_PROPERTIES]
+    if cluster:
+        properties.append("'point_count', point_count")
+    
+    where = "WHERE tenant_id = :tenant_id\n  AND position IS NOT NULL"
+    if bbox:
+        where += _ANTIMERIDIAN_BBOX_CLAUSE if bbox[0] > bbox[2] else _BBOX_CLAUSE
+    
+    source = f"aircraft\n{where}"
+    if cluster:
+        source = f"""(
+    SELECT DISTINCT ON (cell_x, cell_y) *
+    FROM (
+        SELECT {_GEOJSON_COLUMNS},
+               FLOOR(ST_X(position) / CAST(:cell_degrees AS DOUBLE PRECISION)) AS cell_x,
+               FLOOR(ST_Y(position) / CAST(:cell_degrees AS DOUBLE PRECISION)) AS cell_y,
+               COUNT(*) OVER (
+                   PARTITION BY FLOOR(ST_X(position) / CAST(:cell_degrees AS DOUBLE PRECISION)),
+                                FLOOR(ST_Y(position) / CAST(:cell_degrees AS DOUBLE PRECISION))
+               ) AS point_count
+        FROM aircraft
+        {where}
+    ) gridded
+    ORDER BY cell_x, cell_y, last_updated DESC
+) clustered"""
+
+    return f"""
+SELECT CAST(json_build_object(
+    'type', 'Feature',
+    'geometry', CAST(ST_AsGeoJSON(position, 6) AS json),
+    'properties', json_build_object(
+        {", ".join(properties)}
+    )
+) AS text)
+FROM {source}
+"""
+
+
+GEOJSON_COLLECTION_HEADER = '{"type":"FeatureCollection","features":['
+GEOJSON_COLLECTION_FOOTER = "]}"
+
+
+# Aircraft API response fields in schema order; updated_at is last_updated
+AIRCRAFT_RESPONSE_FIELDS = (
+    "id", "created_at", "updated_at", "tenant_id", "hex", "type", "flight",
+    "registration", "aircraft_type_code", "db_flags", "squawk", "emergency",
+    "category", "altitude_baro", "altitude_geom", "ground_speed", "track",
+    "true_heading", "vertical_rate", "nic", "nac_p", "nac_v", "sil", "sil_type",
+    "sda", "messages", "seen", "seen_pos", "rssi", "gps_ok_before", "gps_ok_lat",
+    "gps_ok_lon", "raw_data", "latitude", "longitude",
+)
+
+DEFAULT_RESPONSE_FIELDS = tuple(field for field in AIRCRAFT_RESPONSE_FIELDS if field != "raw_data")
+
+
+def _raw_number(*path: str):
+    """Numeric value at a raw_data JSON path, or NULL when absent or not a number"""
+    element = AircraftModel.raw_data[path]
+    return case(
+        (func.jsonb_typeof(element) == "number", cast(AircraftModel.raw_data[path].astext, Float)),
+        else_=None
+    )
+
+
+def _coordinate(postgis_value, key: str, last_position_key: str):
+    """Coordinate from the position column, falling back to positions stored in raw_data"""
+    return func.coalesce(
+        postgis_value,
+        _raw_number(key),
+        _raw_number("lastPosition", last_position_key),
+        _raw_number("raw_data", "lastPosition", last_position_key),
+    )
+
+
+def _response_column(field: str):
+    """SQL expression for one response field; numerics come back as floats"""
+    if field == "updated_at":
+        return AircraftModel.last_updated.label(field)
+    if field == "latitude":
+        return _coordinate(ST_Y(AircraftModel.position), "latitude", "lat").label(field)
+    if field == "longitude":
+        return _coordinate(ST_X(AircraftModel.position), "longitude", "lon").label(field)
+    
+    column = getattr(AircraftModel, field)
+    if isinstance(column.type, Numeric):
+        return cast(column, Float).label(field)
+    return column
+
+
+def resolve_response_fields(fields: Optional[str] = None, include_raw: bool = False) -> List[str]:
+    """
+    Resolve a ``fields=`` projection into response field names.
+    
+    raw_data is only returned when requested explicitly or with ``include_raw``.
+    
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if fields:
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in AIRCRAFT_RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        names = list(DEFAULT_RESPONSE_FIELDS)
+    
+    if include_raw and "raw_data" not in names:
+        names.append("raw_data")
+    return names
+
+
+def response_columns(fields: Iterable[str]) -> List[Any]:
+    """SQL expressions selecting the given response fields"""
+    return [_response_column(field) for field in fields]
+
+
+# Search scores per column as (exact, prefix, substring); hex is matched by
+# exact/prefix only through idx_aircraft_hex_prefix, other columns also by
+# substring through their trigram indexes
+SEARCH_WEIGHTS = {
+    "hex": (100, 80, 0),
+    "flight": (95, 75, 40),
+    "registration": (90, 70, 35),
+    "aircraft_type_code": (60, 50, 20),
+}
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_score(column_name: str, query: str):
+    """Score expression for one column against a lowercased query"""
+    exact, prefix, substring = SEARCH_WEIGHTS[column_name]
+    column = func.lower(func.trim(getattr(AircraftModel, column_name)))
+    pattern = escape_like(query)
+    
+    whens = [
+        (column == query, exact),
+        (column.like(f"{pattern}%", escape="\\"), prefix),
+    ]
+    if substring:
+        whens.append((getattr(AircraftModel, column_name).ilike(f"%{pattern}%", escape="\\"), substring))
+    return case(*whens, else_=0)
+
+
+class AircraftBatch(RecordBatch):
+    """Columnar batch of feed records mapped by AIRCRAFT_FEED_SPEC"""
+    
+    spec = AIRCRAFT_FEED_SPEC
+
 
 class AircraftService:
     """Service class for aircraft operations"""
@@ -81,141 +517,297 @@ class AircraftService:
         )
         return result.scalar_one_or_none()
     
-    async def get_aircraft_geojson(self, tenant_id: UUID) -> Dict[str, Any]:
+    async def search_aircraft(
+        self,
+        tenant_id: UUID,
+        query: str,
+        response_fields: List[str],
+        limit: int = 20
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Search aircraft by hex, flight, registration and type code.
+        
+        Exact matches rank above prefix matches, which rank above substring
+        matches; ties go to the closest trigram similarity, then the most
+        recently updated aircraft.
+        
+        Returns:
+            Rows of the projected response fields followed by the score
+        """
+        query = query.strip().lower()
+        pattern = escape_like(query)
+        
+        score = func.greatest(*(_search_score(name, query) for name in SEARCH_WEIGHTS)).label("score")
+        similarity = func.greatest(*(
+            func.coalesce(func.similarity(getattr(AircraftModel, name), query), 0) for name in SEARCH_WEIGHTS
+        ))
+        
+        statement = (
+            select(*response_columns(response_fields), score)
+            .where(
+                AircraftModel.tenant_id == tenant_id,
+                or_(
+                    func.lower(AircraftModel.hex).like(f"{pattern}%", escape="\\"),
+                    AircraftModel.flight.ilike(f"%{pattern}%", escape="\\"),
+                    AircraftModel.registration.ilike(f"%{pattern}%", escape="\\"),
+                    AircraftModel.aircraft_type_code.ilike(f"%{pattern}%", escape="\\"),
+                )
+            )
+            .order_by(score.desc(), similarity.desc(), AircraftModel.last_updated.desc())
+            .limit(limit)
+        )
+        
+        result = await self.session.execute(statement)
+        return result.fetchall()
+    
+    def _geojson_query(
+        self,
+        tenant_id: UUID,
+        bbox: Optional[Tuple[float, float, float, float]],
+        zoom: Optional[int]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the GeoJSON query and parameters for a viewport"""
+        params: Dict[str, Any] = {"tenant_id": tenant_id}
+        if bbox:
+            params.update(zip(("min_lon", "min_lat", "max_lon", "max_lat"), bbox))
+        
+        cluster = zoom is not None and zoom <= settings.GEOJSON_CLUSTER_MAX_ZOOM
+        if cluster:
+            params["cell_degrees"] = grid_cell_degrees(zoom, settings.GEOJSON_CLUSTER_CELL_PX)
+        
+        return build_geojson_sql(bbox, cluster), params
+    
+    async def get_aircraft_geojson(
+        self,
+        tenant_id: UUID,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        zoom: Optional[int] = None
+    ) -> Dict[str, Any]:
         """Get aircraft data as GeoJSON FeatureCollection"""
-        query = select(AircraftModel).where(AircraftModel.tenant_id == tenant_id)
-        result = await self.session.execute(query)
-        aircraft_list = result.scalars().all()
-        
-        features = []
-        for aircraft in aircraft_list:
-            if aircraft.position:
-                # Extract coordinates - for now we'll parse from the database
-                try:
-                    # This is a simplified approach - in production you'd use proper PostGIS functions
-                    coordinates = [0, 0]  # Default coordinates
-                    
-                    # Create feature
-                    feature = {
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": coordinates
-                        },
-                        "properties": {
-                            "id": str(aircraft.id),
-                            "hex": aircraft.hex,
-                            "flight": aircraft.flight,
-                            "registration": aircraft.registration,
-                            "aircraft_type": aircraft.aircraft_type_code,
-                            "altitude": aircraft.altitude_baro,
-                            "speed": aircraft.ground_speed,
-                            "track": aircraft.track,
-                            "squawk": aircraft.squawk,
-                            "emergency": aircraft.emergency,
-                            "category": aircraft.category
-                        }
-                    }
-                    features.append(feature)
-                except Exception as e:
-                    logger.warning("Failed to process aircraft for GeoJSON", 
-                                 aircraft_id=aircraft.id, error=str(e))
+        sql, params = self._geojson_query(tenant_id, bbox, zoom)
+        result = await self.session.execute(text(sql), params)
         
         return {
             "type": "FeatureCollection",
-            "features": features
+            "features": [json.loads(row[0]) for row in result.fetchall()]
+        }
+    
+    async def stream_aircraft_geojson(
+        self,
+        tenant_id: UUID,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        zoom: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream aircraft as a serialized GeoJSON FeatureCollection.
+        
+        Rows are read through a server-side cursor ``batch_size`` features at
+        a time, so memory stays flat regardless of fleet size. ``bbox``
+        restricts output to a viewport and a ``zoom`` at or below
+        GEOJSON_CLUSTER_MAX_ZOOM thins it to one aircraft per grid cell.
+        """
+        batch_size = batch_size or settings.GEOJSON_STREAM_BATCH_SIZE
+        sql, params = self._geojson_query(tenant_id, bbox, zoom)
+        result = await self.session.stream(
+            text(sql),
+            params,
+            execution_options={"yield_per": batch_size}
+        )
+        
+        yield GEOJSON_COLLECTION_HEADER
+        
+        separator = ""
+        async for rows in result.partitions():
+            yield separator + ",".join(row[0] for row in rows)
+            separator = ","
+        
+        yield GEOJSON_COLLECTION_FOOTER
+    
+    def _map_aircraft_fields(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a raw feed record onto aircraft columns with AIRCRAFT_FEED_SPEC (None if invalid)"""
+        return AIRCRAFT_FEED_SPEC.apply(data)
+    
+    def _content_fingerprint(self, aircraft_dict: Dict[str, Any], lat: Any, lon: Any) -> str:
+        """Hash the fields that describe an aircraft's state (see FINGERPRINT_COLUMNS)"""
+        return AircraftBatch.fingerprint({**aircraft_dict, "latitude": lat, "longitude": lon}, FINGERPRINT_COLUMNS)
+    
+    def _raw_json(self, raw: Dict[str, Any]) -> str:
+        """Serialize a raw feed record for the raw_data column"""
+        try:
+            return dumps(raw).decode()
+        except TypeError:
+            # Values orjson cannot encode (e.g. integers beyond 64 bits)
+            return json.dumps(raw, default=str)
+    
+    def _mapped_record(self, data: Dict[str, Any], mapped: bool) -> Dict[str, Any]:
+        aircraft_dict = data if mapped else self._map_aircraft_fields(data)
+        if aircraft_dict is None:
+            raise ValueError("Invalid aircraft record")
+        return aircraft_dict
+    
+    def _prepare_aircraft_row(self, tenant_id: UUID, data: Dict[str, Any], mapped: bool = False) -> Dict[str, Any]:
+        """Build an aircraft table row from a raw feed record (or one already mapped by AIRCRAFT_FEED_SPEC)"""
+        aircraft_dict = {"tenant_id": tenant_id, **self._mapped_record(data, mapped)}
+        lat = aircraft_dict.pop("latitude")
+        lon = aircraft_dict.pop("longitude")
+        aircraft_dict["content_hash"] = self._content_fingerprint(aircraft_dict, lat, lon)
+        
+        # Position is always present so every row in a batch has the same columns
+        aircraft_dict["position"] = None
+        if lat is not None and lon is not None:
+            aircraft_dict["position"] = ST_GeomFromText(f"POINT({lon} {lat})", 4326)
+        
+        return aircraft_dict
+    
+    def _prepare_staging_record(self, data: Dict[str, Any], mapped: bool = False) -> Tuple[Any, ...]:
+        """Build a COPY record for the aircraft staging table from a raw (or mapped) feed record"""
+        aircraft_dict = self._mapped_record(data, mapped)
+        values = {
+            **aircraft_dict,
+            "raw_data": self._raw_json(aircraft_dict["raw_data"]),
+            "content_hash": self._content_fingerprint(
+                aircraft_dict, aircraft_dict["latitude"], aircraft_dict["longitude"]
+            )
         }
+        
+        return tuple(values.get(column) for column in STAGING_COLUMNS)
+    
+    def _prepare_staging_batch(self, batch: AircraftBatch) -> Dict[str, Tuple[Any, ...]]:
+        """Build COPY records keyed by hex from a columnar batch"""
+        records = batch.rows(STAGING_COLUMNS, {
+            "raw_data": [self._raw_json(raw) for raw in batch.values("raw_data")],
+            "content_hash": batch.fingerprints(FINGERPRINT_COLUMNS)
+        })
+        return dict(zip(batch.values("hex"), records))
+    
+    def _prepare_staging_records(
+        self,
+        aircraft_data: Union[List[Dict[str, Any]], AircraftBatch],
+        mapped: bool = False
+    ) -> Tuple[Dict[str, Tuple[Any, ...]], int]:
+        """
+        Build COPY records keyed by hex; a later record for the same hex
+        replaces the earlier one. Returns the records and the error count.
+        """
+        if isinstance(aircraft_data, AircraftBatch):
+            # Invalid records were already dropped when the batch was built
+            return self._prepare_staging_batch(aircraft_data), 0
+        
+        error_count = 0
+        records_by_hex: Dict[str, Tuple[Any, ...]] = {}
+        for data in aircraft_data:
+            try:
+                aircraft_dict = data if mapped else self._map_aircraft_fields(data)
+                if aircraft_dict is None:
+                    error_count += 1
+                    continue
+                
+                records_by_hex[aircraft_dict["hex"]] = self._prepare_staging_record(aircraft_dict, mapped=True)
+            
+            except Exception as e:
+                logger.error("Error creating fresh aircraft data", 
+                           hex=data.get("hex"), error=str(e))
+                error_count += 1
+        
+        return records_by_hex, error_count
+    
+    def _build_upsert_statement(self, rows: List[Dict[str, Any]]):
+        """
+        Build a multi-row INSERT ... ON CONFLICT (tenant_id, hex) DO UPDATE.
+        
+        RETURNING ``xmax = 0`` is true for freshly inserted rows and false for
+        rows that hit the conflict path, which lets us keep created/updated stats.
+        A record without a position keeps the stored one.
+        """
+        stmt = insert(AircraftModel).values(rows)
+        update_columns = {
+            column: getattr(stmt.excluded, column)
+            for column in rows[0].keys()
+            if column not in ("tenant_id", "hex")
+        }
+        if "position" in update_columns:
+            update_columns["position"] = func.coalesce(stmt.excluded.position, AircraftModel.position)
+        update_columns["last_updated"] = func.now()
+        
+        return stmt.on_conflict_do_update(
+            index_elements=[AircraftModel.tenant_id, AircraftModel.hex],
+            set_=update_columns
+        ).returning(literal_column("(xmax = 0)").label("inserted"))
+    
+    async def _upsert_chunk(self, rows: List[Dict[str, Any]]) -> List[bool]:
+        """Upsert one chunk inside a savepoint; returns the inserted flag per row"""
+        async with self.session.begin_nested():
+            result = await self.session.execute(self._build_upsert_statement(rows))
+            return list(result.scalars().all())
     
-    async def process_bulk_aircraft_data(self, tenant_id: UUID, aircraft_data: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Process bulk aircraft data from external sources"""
+    async def process_bulk_aircraft_data(
+        self,
+        tenant_id: UUID,
+        aircraft_data: Union[List[Dict[str, Any]], AircraftBatch],
+        chunk_size: Optional[int] = None,
+        mapped: bool = False
+    ) -> Dict[str, int]:
+        """
+        Process bulk aircraft data from external sources.
+        
+        Rows are written set-based with INSERT ... ON CONFLICT DO UPDATE, one
+        statement per chunk. Each chunk runs in its own savepoint; if a chunk
+        fails it is retried row by row so a single bad record only costs itself.
+        
+        Args:
+            tenant_id: UUID of the tenant
+            aircraft_data: Raw aircraft records, or an AircraftBatch
+            chunk_size: Rows per statement (default: settings.BULK_UPSERT_CHUNK_SIZE)
+            mapped: Records were already mapped by AIRCRAFT_FEED_SPEC (as collectors deliver them)
+        
+        Returns:
+            Dictionary with created, updated and error counts
+        """
+        chunk_size = chunk_size or settings.BULK_UPSERT_CHUNK_SIZE
         created_count = 0
         updated_count = 0
         error_count = 0
         
+        if isinstance(aircraft_data, AircraftBatch):
+            aircraft_data, mapped = aircraft_data.records(), True
+        
+        # Prepare rows, keyed by hex - one statement cannot touch the same row twice,
+        # so a later record for the same aircraft replaces the earlier one
+        rows_by_hex: Dict[str, Dict[str, Any]] = {}
         for data in aircraft_data:
             try:
-                hex_code = data.get("hex")
-                if not hex_code:
+                aircraft_dict = data if mapped else self._map_aircraft_fields(data)
+                if aircraft_dict is None:
                     error_count += 1
                     continue
                 
-                # Check if aircraft exists
-                result = await self.session.execute(
-                    select(AircraftModel).where(
-                        AircraftModel.tenant_id == tenant_id,
-                        AircraftModel.hex == hex_code
-                    )
-                )
-                existing_aircraft = result.scalar_one_or_none()
-                
-                # Prepare aircraft data
-                aircraft_dict = {
-                    "tenant_id": tenant_id,
-                    "hex": hex_code,
-                    "type": data.get("type", "adsb_icao"),
-                    "flight": data.get("flight", "").strip() if data.get("flight") else None,
-                    "registration": data.get("r"),
-                    "aircraft_type_code": data.get("t"),
-                    "db_flags": data.get("dbFlags"),
-                    "squawk": data.get("squawk"),
-                    "emergency": data.get("emergency", "none"),
-                    "category": data.get("category"),
-                    "altitude_baro": data.get("alt_baro") if data.get("alt_baro") != "ground" else 0,
-                    "altitude_geom": data.get("alt_geom"),
-                    "ground_speed": data.get("gs"),
-                    "track": data.get("track"),
-                    "true_heading": data.get("true_heading"),
-                    "vertical_rate": data.get("geom_rate"),
-                    "nic": data.get("nic"),
-                    "nac_p": data.get("nac_p"),
-                    "nac_v": data.get("nac_v"),
-                    "sil": data.get("sil"),
-                    "sil_type": data.get("sil_type"),
-                    "sda": data.get("sda"),
-                    "messages": data.get("messages"),
-                    "seen": data.get("seen"),
-                    "seen_pos": data.get("seen_pos"),
-                    "rssi": data.get("rssi"),
-                    "gps_ok_before": data.get("gpsOkBefore"),
-                    "gps_ok_lat": data.get("gpsOkLat"),
-                    "gps_ok_lon": data.get("gpsOkLon"),
-                    "raw_data": data
-                }
-                
-                # Validate and convert numeric fields
-                aircraft_dict = validate_aircraft_numeric_fields(aircraft_dict)
-                
-                # Handle position
-                lat = data.get("lat")
-                lon = data.get("lon")
-                if lat is not None and lon is not None:
-                    aircraft_dict["position"] = ST_GeomFromText(f"POINT({lon} {lat})", 4326)
-                elif data.get("lastPosition"):
-                    last_pos = data["lastPosition"]
-                    if last_pos.get("lat") and last_pos.get("lon"):
-                        aircraft_dict["position"] = ST_GeomFromText(f"POINT({last_pos['lon']} {last_pos['lat']})", 4326)
-                
-                # Use no_autoflush for safer bulk operations
-                with self.session.no_autoflush:
-                    if existing_aircraft:
-                        # Update existing aircraft
-                        await self.session.execute(
-                            update(AircraftModel)
-                            .where(AircraftModel.id == existing_aircraft.id)
-                            .values(**{k: v for k, v in aircraft_dict.items() if k != "tenant_id"})
-                        )
-                        updated_count += 1
-                    else:
-                        # Create new aircraft
-                        new_aircraft = AircraftModel(**aircraft_dict)
-                        self.session.add(new_aircraft)
-                        created_count += 1
-                
+                rows_by_hex[aircraft_dict["hex"]] = self._prepare_aircraft_row(tenant_id, aircraft_dict, mapped=True)
+            
             except Exception as e:
                 logger.error("Error processing aircraft data", 
                            hex=data.get("hex"), error=str(e))
                 error_count += 1
         
+        for chunk in chunked(list(rows_by_hex.values()), chunk_size):
+            try:
+                inserted_flags = await self._upsert_chunk(chunk)
+            except Exception as e:
+                logger.warning("Bulk upsert chunk failed, retrying row by row",
+                               rows=len(chunk), error=str(e))
+                inserted_flags = []
+                for row in chunk:
+                    try:
+                        inserted_flags.extend(await self._upsert_chunk([row]))
+                    except Exception as row_error:
+                        logger.error("Error processing aircraft data",
+                                     hex=row.get("hex"), error=str(row_error))
+                        error_count += 1
+            
+            inserted = sum(1 for flag in inserted_flags if flag)
+            created_count += inserted
+            updated_count += len(inserted_flags) - inserted
+        
         await self.session.commit()
         
         logger.info("Bulk aircraft processing completed",
@@ -227,163 +819,71 @@ class AircraftService:
             "errors": error_count
         }
     
-    async def archive_and_refresh_aircraft_data(self, tenant_id: UUID, new_aircraft_data: List[Dict[str, Any]], archive_reason: str = "scheduled_refresh") -> Dict[str, int]:
+    async def _copy_to_staging(self, records: Iterable[Tuple[Any, ...]]) -> None:
+        """Stream records into the staging table with asyncpg's binary COPY"""
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=records,
+            columns=list(STAGING_COLUMNS)
+        )
+    
+    async def archive_and_refresh_aircraft_data(
+        self,
+        tenant_id: UUID,
+        new_aircraft_data: Union[List[Dict[str, Any]], AircraftBatch],
+        archive_reason: str = "scheduled_refresh",
+        mapped: bool = False
+    ) -> Dict[str, int]:
         """
         Archive all current aircraft data and replace with fresh data.
         
+        The refresh runs server-side in one transaction: fresh records are
+        COPY'd into a temporary staging table, the live rows are archived with
+        a single INSERT ... SELECT, and a single statement swaps staging into
+        the aircraft table. Existing rows are never loaded into Python.
+        
         Args:
             tenant_id: UUID of the tenant
-            new_aircraft_data: List of new aircraft data to insert
+            new_aircraft_data: New aircraft records (or an AircraftBatch) to insert
             archive_reason: Reason for archiving (default: 'scheduled_refresh')
-            
+            mapped: Records were already mapped by AIRCRAFT_FEED_SPEC
+        
         Returns:
             Dictionary with counts of archived and created records
         """
-        archived_count = 0
-        created_count = 0
-        error_count = 0
+        records_by_hex, error_count = self._prepare_staging_records(new_aircraft_data, mapped)
         
         try:
-            # Step 1: Archive all existing aircraft for this tenant
-            existing_aircraft_query = select(AircraftModel).where(AircraftModel.tenant_id == tenant_id)
-            existing_result = await self.session.execute(existing_aircraft_query)
-            existing_aircraft = existing_result.scalars().all()
-            
-            logger.info(f"Archiving {len(existing_aircraft)} aircraft records", tenant_id=tenant_id)
+            # Step 1: Stream fresh data into the staging table
+            await self.session.execute(text(CREATE_STAGING_TABLE_SQL))
+            await self._copy_to_staging(records_by_hex.values())
             
-            # Archive each existing aircraft record
-            for aircraft in existing_aircraft:
-                try:
-                    archive_record = AircraftArchiveModel(
-                        original_aircraft_id=aircraft.id,
-                        tenant_id=aircraft.tenant_id,
-                        hex=aircraft.hex,
-                        type=aircraft.type,
-                        flight=aircraft.flight,
-                        registration=aircraft.registration,
-                        aircraft_type_code=aircraft.aircraft_type_code,
-                        db_flags=aircraft.db_flags,
-                        squawk=aircraft.squawk,
-                        emergency=aircraft.emergency,
-                        category=aircraft.category,
-                        position=aircraft.position,
-                        altitude_baro=aircraft.altitude_baro,
-                        altitude_geom=aircraft.altitude_geom,
-                        ground_speed=aircraft.ground_speed,
-                        track=aircraft.track,
-                        true_heading=aircraft.true_heading,
-                        vertical_rate=aircraft.vertical_rate,
-                        nic=aircraft.nic,
-                        nac_p=aircraft.nac_p,
-                        nac_v=aircraft.nac_v,
-                        sil=aircraft.sil,
-                        sil_type=aircraft.sil_type,
-                        sda=aircraft.sda,
-                        messages=aircraft.messages,
-                        seen=aircraft.seen,
-                        seen_pos=aircraft.seen_pos,
-                        rssi=aircraft.rssi,
-                        gps_ok_before=aircraft.gps_ok_before,
-                        gps_ok_lat=aircraft.gps_ok_lat,
-                        gps_ok_lon=aircraft.gps_ok_lon,
-                        raw_data=aircraft.raw_data,
-                        original_created_at=aircraft.created_at,
-                        original_last_updated=aircraft.last_updated,
-                        archive_reason=archive_reason
-                    )
-                    
-                    self.session.add(archive_record)
-                    archived_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error archiving aircraft {aircraft.id}: {e}")
-                    error_count += 1
-            
-            # Step 2: Delete all existing aircraft for this tenant
-            await self.session.execute(
-                update(AircraftModel)
-                .where(AircraftModel.tenant_id == tenant_id)
-                .execution_options(synchronize_session=False)
+            # Step 2: Archive all existing aircraft for this tenant server-side
+            archive_result = await self.session.execute(
+                text(ARCHIVE_AIRCRAFT_SQL),
+                {"tenant_id": tenant_id, "archive_reason": archive_reason}
             )
+            archived_count = archive_result.rowcount
             
-            # Actually delete using a delete statement
-            from sqlalchemy import delete
-            await self.session.execute(
-                delete(AircraftModel).where(AircraftModel.tenant_id == tenant_id)
-            )
+            logger.info(f"Archived {archived_count} aircraft records", tenant_id=tenant_id)
             
-            # Step 3: Insert fresh aircraft data
-            for data in new_aircraft_data:
-                try:
-                    hex_code = data.get("hex")
-                    if not hex_code:
-                        error_count += 1
-                        continue
-                    
-                    # Prepare aircraft data (reuse existing logic)
-                    aircraft_dict = {
-                        "tenant_id": tenant_id,
-                        "hex": hex_code,
-                        "type": data.get("type", "adsb_icao"),
-                        "flight": data.get("flight", "").strip() if data.get("flight") else None,
-                        "registration": data.get("r"),
-                        "aircraft_type_code": data.get("t"),
-                        "db_flags": data.get("dbFlags"),
-                        "squawk": data.get("squawk"),
-                        "emergency": data.get("emergency", "none"),
-                        "category": data.get("category"),
-                        "altitude_baro": data.get("alt_baro") if data.get("alt_baro") != "ground" else 0,
-                        "altitude_geom": data.get("alt_geom"),
-                        "ground_speed": data.get("gs"),
-                        "track": data.get("track"),
-                        "true_heading": data.get("true_heading"),
-                        "vertical_rate": data.get("geom_rate"),
-                        "nic": data.get("nic"),
-                        "nac_p": data.get("nac_p"),
-                        "nac_v": data.get("nac_v"),
-                        "sil": data.get("sil"),
-                        "sil_type": data.get("sil_type"),
-                        "sda": data.get("sda"),
-                        "messages": data.get("messages"),
-                        "seen": data.get("seen"),
-                        "seen_pos": data.get("seen_pos"),
-                        "rssi": data.get("rssi"),
-                        "gps_ok_before": data.get("gpsOkBefore"),
-                        "gps_ok_lat": data.get("gpsOkLat"),
-                        "gps_ok_lon": data.get("gpsOkLon"),
-                        "raw_data": data
-                    }
-                    
-                    # Validate and convert numeric fields
-                    aircraft_dict = validate_aircraft_numeric_fields(aircraft_dict)
-                    
-                    # Handle position
-                    lat = data.get("lat")
-                    lon = data.get("lon")
-                    if lat is not None and lon is not None:
-                        aircraft_dict["position"] = ST_GeomFromText(f"POINT({lon} {lat})", 4326)
-                    elif data.get("lastPosition"):
-                        last_pos = data["lastPosition"]
-                        if last_pos.get("lat") and last_pos.get("lon"):
-                            aircraft_dict["position"] = ST_GeomFromText(f"POINT({last_pos['lon']} {last_pos['lat']})", 4326)
-                    
-                    # Create new aircraft
-                    new_aircraft = AircraftModel(**aircraft_dict)
-                    self.session.add(new_aircraft)
-                    created_count += 1
-                    
-                except Exception as e:
-                    logger.error("Error creating fresh aircraft data", 
-                               hex=data.get("hex"), error=str(e))
-                    error_count += 1
+            # Step 3: Swap staging into the live table
+            swap_result = await self.session.execute(
+                text(SWAP_STAGING_SQL),
+                {"tenant_id": tenant_id}
+            )
+            created_count, removed_count = swap_result.one()
             
-            # Commit all changes
+            # Commit all changes (drops the staging table)
             await self.session.commit()
             
             logger.info("Archive and refresh completed",
                        tenant_id=tenant_id,
                        archived=archived_count,
                        created=created_count,
+                       removed=removed_count,
                        errors=error_count)
             
             return {
@@ -391,8 +891,95 @@ class AircraftService:
                 "created": created_count,
                 "errors": error_count
             }
-            
+        
         except Exception as e:
             logger.error("Error in archive and refresh process", error=str(e))
             await self.session.rollback()
-            raise
\ No newline at end of file
+            raise
+    
+    async def incremental_refresh_aircraft_data(
+        self,
+        tenant_id: UUID,
+        new_aircraft_data: Union[List[Dict[str, Any]], AircraftBatch],
+        archive_reason: str = "incremental_refresh",
+        min_distance_m: Optional[float] = None,
+        min_altitude_ft: Optional[int] = None,
+        mapped: bool = False
+    ) -> Dict[str, int]:
+        """
+        Diff fresh aircraft data against the live table and write only what changed.
+        
+        Each record carries a content fingerprint (see FINGERPRINT_COLUMNS).
+        Aircraft with an unchanged fingerprint are skipped, changed ones are
+        updated in place and new ones inserted. Only aircraft that departed the
+        feed, or changed materially (moved further than ``min_distance_m``,
+        changed altitude by more than ``min_altitude_ft``, or changed flight,
+        squawk or emergency state), are copied to aircraft_archive first.
+        
+        Args:
+            tenant_id: UUID of the tenant
+            new_aircraft_data: Current feed records, or an AircraftBatch
+            archive_reason: Archive reason prefix; '_departed' or '_changed' is appended
+            min_distance_m: Movement that counts as material (default from settings)
+            min_altitude_ft: Altitude change that counts as material (default from settings)
+            mapped: Records were already mapped by AIRCRAFT_FEED_SPEC
+        
+        Returns:
+            Dictionary with inserted, changed, unchanged, departed, archived and error counts
+        """
+        if min_distance_m is None:
+            min_distance_m = settings.INCREMENTAL_ARCHIVE_MIN_DISTANCE_M
+        if min_altitude_ft is None:
+            min_altitude_ft = settings.INCREMENTAL_ARCHIVE_MIN_ALTITUDE_FT
+        
+        records_by_hex, error_count = self._prepare_staging_records(new_aircraft_data, mapped)
+        
+        try:
+            # Step 1: Stream fresh data into the staging table
+            await self.session.execute(text(CREATE_STAGING_TABLE_SQL))
+            await self._copy_to_staging(records_by_hex.values())
+            
+            # Step 2: Archive departed and materially changed aircraft
+            archive_result = await self.session.execute(
+                text(ARCHIVE_INCREMENTAL_SQL),
+                {
+                    "tenant_id": tenant_id,
+                    "archive_reason": archive_reason,
+                    "min_distance_m": float(min_distance_m),
+                    "min_altitude_ft": int(min_altitude_ft)
+                }
+            )
+            archived_count = archive_result.rowcount
+            
+            # Step 3: Insert new, update changed and delete departed aircraft
+            refresh_result = await self.session.execute(
+                text(INCREMENTAL_REFRESH_SQL),
+                {"tenant_id": tenant_id}
+            )
+            inserted_count, changed_count, departed_count, staged_count = refresh_result.one()
+            unchanged_count = staged_count - inserted_count - changed_count
+            
+            await self.session.commit()
+            
+            logger.info("Incremental refresh completed",
+                       tenant_id=tenant_id,
+                       inserted=inserted_count,
+                       changed=changed_count,
+                       unchanged=unchanged_count,
+                       departed=departed_count,
+                       archived=archived_count,
+                       errors=error_count)
+            
+            return {
+                "inserted": inserted_count,
+                "changed": changed_count,
+                "unchanged": unchanged_count,
+                "departed": departed_count,
+                "archived": archived_count,
+                "errors": error_count
+            }
+        
+        except Exception as e:
+            logger.error("Error in incremental refresh process", error=str(e))
+            await self.session.rollback()
+            raise
@@ -0,0 +1,179 @@
+"""
+Aircraft stream service pushing fleet snapshots and deltas to connected clients
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.aircraft_service import AircraftService
+from app.services.data_generation import data_generations
+from app.utils.geometry import point_in_bbox
+
+logger = structlog.get_logger()
+
+Feature = Dict[str, Any]
+Fleet = Dict[str, Feature]
+BBox = Tuple[float, float, float, float]
+
+# Queued in place of deltas when a subscriber fell too far behind
+RESYNC = {"type": "resync"}
+
+
+class StreamSubscriber:
+    """A connected client with its own event queue and optional viewport"""
+    
+    def __init__(self, tenant_id: str, bbox: Optional[BBox] = None, max_pending: int = 32):
+        self.tenant_id = tenant_id
+        self.bbox = bbox
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    
+    def visible(self, feature: Optional[Feature]) -> bool:
+        """Check whether a feature falls inside this subscriber's viewport"""
+        if feature is None:
+            return False
+        if self.bbox is None:
+            return True
+        
+        longitude, latitude = feature["geometry"]["coordinates"][:2]
+        return point_in_bbox(longitude, latitude, self.bbox)
+    
+    def delta(self, previous: Fleet, current: Fleet, changed: Set[str]) -> Dict[str, Any]:
+        """
+        Build this subscriber's view of a fleet change.
+        
+        Aircraft crossing into the viewport are reported as added and those
+        leaving it as removed, so the client's view always matches its bbox.
+        """
+        added: List[Feature] = []
+        moved: List[Feature] = []
+        removed: List[str] = []
+        
+        for hex_code in changed:
+            before, after = previous.get(hex_code), current.get(hex_code)
+            was_visible, is_visible = self.visible(before), self.visible(after)
+            
+            if was_visible and is_visible:
+                moved.append(after)
+            elif is_visible:
+                added.append(after)
+            elif was_visible:
+                removed.append(hex_code)
+        
+        return {"added": added, "moved": moved, "removed": removed}
+    
+    def push(self, message: Dict[str, Any]) -> None:
+        """Queue a message, replacing the backlog with a resync if the client is behind"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class AircraftStreamBroker:
+    """
+    Keeps the last published fleet per tenant and fans out deltas.
+    
+    The diff is computed once per ingest regardless of the number of
+    connected clients; each subscriber only filters it by its viewport.
+    """
+    
+    def __init__(self):
+        self._subscribers: Dict[str, Set[StreamSubscriber]] = {}
+        self._fleets: Dict[str, Fleet] = {}
+    
+    def subscribe(self, tenant_id: UUID, bbox: Optional[BBox] = None) -> StreamSubscriber:
+        """Register a new subscriber for a tenant"""
+        subscriber = StreamSubscriber(str(tenant_id), bbox, settings.STREAM_MAX_PENDING_EVENTS)
+        self._subscribers.setdefault(subscriber.tenant_id, set()).add(subscriber)
+        logger.info("Aircraft stream subscriber connected",
+                   tenant_id=subscriber.tenant_id,
+                   subscribers=len(self._subscribers[subscriber.tenant_id]))
+        return subscriber
+    
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        """Remove a subscriber; the tenant's fleet is dropped with its last subscriber"""
+        subscribers = self._subscribers.get(subscriber.tenant_id, set())
+        subscribers.discard(subscriber)
+        if not subscribers:
+            self._subscribers.pop(subscriber.tenant_id, None)
+            self._fleets.pop(subscriber.tenant_id, None)
+        logger.info("Aircraft stream subscriber disconnected",
+                   tenant_id=subscriber.tenant_id,
+                   subscribers=len(subscribers))
+    
+    def subscriber_count(self, tenant_id: UUID) -> int:
+        """Number of connected subscribers for a tenant"""
+        return len(self._subscribers.get(str(tenant_id), ()))
+    
+    async def _load_fleet(self, session: AsyncSession, tenant_id: UUID) -> Fleet:
+        """Load the tenant's positioned aircraft keyed by hex"""
+        geojson = await AircraftService(session).get_aircraft_geojson(tenant_id)
+        return {feature["properties"]["hex"]: feature for feature in geojson["features"]}
+    
+    async def snapshot(self, session: AsyncSession, subscriber: StreamSubscriber) -> Dict[str, Any]:
+        """Get the initial snapshot for a subscriber, loading the fleet if needed"""
+        if subscriber.tenant_id not in self._fleets:
+            self._fleets[subscriber.tenant_id] = await self._load_fleet(session, UUID(subscriber.tenant_id))
+        return self.current_snapshot(subscriber)
+    
+    def current_snapshot(self, subscriber: StreamSubscriber) -> Dict[str, Any]:
+        """Build a snapshot from the in-memory fleet, filtered to the subscriber's viewport"""
+        fleet = self._fleets.get(subscriber.tenant_id, {})
+        return {
+            "type": "FeatureCollection",
+            "generation": data_generations.get(subscriber.tenant_id),
+            "features": [feature for feature in fleet.values() if subscriber.visible(feature)]
+        }
+    
+    async def publish(self, session: AsyncSession, tenant_id: UUID) -> int:
+        """
+        Diff the tenant's fleet against the last published one and push deltas.
+        
+        Called after an ingest commits. Does no database work when the tenant
+        has no connected subscribers.
+        
+        Returns:
+            Number of subscribers that were sent a delta
+        """
+        key = str(tenant_id)
+        subscribers = list(self._subscribers.get(key, ()))
+        if not subscribers:
+            self._fleets.pop(key, None)
+            return 0
+        
+        previous = self._fleets.get(key, {})
+        current = await self._load_fleet(session, tenant_id)
+        self._fleets[key] = current
+        
+        changed = {
+            hex_code for hex_code in previous.keys() | current.keys()
+            if previous.get(hex_code) != current.get(hex_code)
+        }
+        if not changed:
+            return 0
+        
+        generation = data_generations.get(tenant_id)
+        notified = 0
+        for subscriber in subscribers:
+            delta = subscriber.delta(previous, current, changed)
+            if delta["added"] or delta["moved"] or delta["removed"]:
+                subscriber.push({"type": "delta", "generation": generation, **delta})
+                notified += 1
+        
+        logger.info("Published aircraft deltas",
+                   tenant_id=key,
+                   generation=generation,
+                   changed=len(changed),
+                   subscribers=notified)
+        
+        return notified
+
+
+# Global broker shared by the scheduler and stream endpoint
+aircraft_stream = AircraftStreamBroker()
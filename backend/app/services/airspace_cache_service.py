@@ -0,0 +1,211 @@
+"""
+Airspace cache serving FAA airspace collections refreshed in the background
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.airspace_service import AirspaceService, airspace_service
+from app.services.airspace_store_service import AirspaceStore
+from app.utils.compression import CompressedPayload
+from app.utils.http_cache import content_etag
+from app.utils.serialization import dumps
+
+logger = structlog.get_logger()
+
+# Minimum seconds between refresh attempts for a limit after a failure
+REFRESH_RETRY_SECONDS = 60
+
+
+class AirspaceEntry:
+    """
+    One cached airspace collection for a record limit.
+    
+    ``fetched_at`` tracks freshness (last successful download) while
+    ``modified_at`` only moves when the features actually change, so an
+    unchanged FAA schedule keeps its ETag, Last-Modified and compressed body.
+    """
+    
+    __slots__ = ("limit", "data", "features_etag", "payload", "fetched_at", "modified_at")
+    
+    def __init__(self, limit: int, data: Dict[str, Any], previous: Optional["AirspaceEntry"] = None):
+        self.limit = limit
+        self.fetched_at = datetime.now(timezone.utc)
+        self.features_etag = content_etag(dumps(data["features"]))
+        
+        if previous is not None and previous.features_etag == self.features_etag:
+            self.data = previous.data
+            self.payload = previous.payload
+            self.modified_at = previous.modified_at
+        else:
+            self.data = data
+            self.payload = CompressedPayload(dumps(data))
+            self.modified_at = self.fetched_at
+    
+    def age(self, now: Optional[datetime] = None) -> float:
+        """Seconds since the last successful download"""
+        return ((now or datetime.now(timezone.utc)) - self.fetched_at).total_seconds()
+    
+    def is_stale(self, now: Optional[datetime] = None, ttl_seconds: Optional[int] = None) -> bool:
+        """Whether the entry is older than the TTL (default: AIRSPACE_CACHE_TTL_SECONDS)"""
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AIRSPACE_CACHE_TTL_SECONDS
+        return self.age(now) > ttl_seconds
+
+
+class AirspaceCache:
+    """
+    Per-limit airspace collections with stale-while-revalidate.
+    
+    A scheduler job refreshes every cached limit; requests are answered from
+    memory, and a stale entry triggers at most one background refresh per
+    limit. When the FAA fails, the last good copy keeps being served.
+    """
+    
+    def __init__(self, service: Optional[AirspaceService] = None):
+        self.service = service or airspace_service
+        self._entries: "OrderedDict[int, AirspaceEntry]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        self._failed_at: Dict[int, datetime] = {}
+        
+        # Features ETag of the collection last written to the airspace table
+        self.persisted_etag: Optional[str] = None
+        # Set from the refresh job's config; None falls back to the settings
+        self.ttl_seconds: Optional[int] = None
+    
+    def get(self, limit: int) -> Optional[AirspaceEntry]:
+        """Get the cached entry for a limit, if any"""
+        return self._entries.get(limit)
+    
+    def largest(self) -> Optional[AirspaceEntry]:
+        """Get the entry with the largest limit, which holds every activation the smaller ones do"""
+        return self._entries[max(self._entries)] if self._entries else None
+    
+    async def get_or_fetch(self, limit: int) -> Optional[AirspaceEntry]:
+        """
+        Get the entry for a limit, fetching it on first use.
+        
+        Stale entries are returned immediately while a refresh runs in the
+        background. Returns None only if the limit has never been fetched
+        successfully and the upstream is failing.
+        """
+        entry = self._entries.get(limit)
+        if entry is None:
+            if self._recently_failed(limit):
+                return None
+            
+            # Only one request per limit waits on the first download
+            async with self._locks.setdefault(limit, asyncio.Lock()):
+                entry = self._entries.get(limit)
+                if entry is None:
+                    entry = await self.refresh(limit)
+            return entry
+        
+        self._entries.move_to_end(limit)
+        if entry.is_stale(ttl_seconds=self.ttl_seconds):
+            self._schedule_refresh(limit)
+        return entry
+    
+    def _schedule_refresh(self, limit: int) -> None:
+        """Start a background refresh unless one is running or recently failed"""
+        if limit in self._refreshing or self._recently_failed(limit):
+            return
+        
+        task = asyncio.create_task(self.refresh(limit))
+        self._refreshing[limit] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(limit, None))
+    
+    def _recently_failed(self, limit: int) -> bool:
+        """Whether the last attempt for a limit failed within the retry window"""
+        failed_at = self._failed_at.get(limit)
+        return failed_at is not None and (datetime.now(timezone.utc) - failed_at).total_seconds() < REFRESH_RETRY_SECONDS
+    
+    async def refresh(self, limit: int) -> Optional[AirspaceEntry]:
+        """
+        Download and swap in a limit's collection.
+        
+        On failure the previous entry (if any) is kept and returned.
+        """
+        previous = self._entries.get(limit)
+        try:
+            records = await self.service.download_schedule(limit)
+            entry = AirspaceEntry(limit, self.service.build_collection(records), previous)
+        except Exception as e:
+            self._failed_at[limit] = datetime.now(timezone.utc)
+            logger.warning("Airspace refresh failed, keeping last good copy",
+                          limit=limit,
+                          has_fallback=previous is not None,
+                          error=str(e))
+            return previous
+        
+        self._failed_at.pop(limit, None)
+        self._entries[limit] = entry
+        self._entries.move_to_end(limit)
+        while len(self._entries) > settings.AIRSPACE_CACHE_MAX_LIMITS:
+            self._entries.popitem(last=False)
+        
+        logger.info("Airspace cache refreshed",
+                   limit=limit,
+                   features=len(entry.data["features"]),
+                   changed=entry.modified_at == entry.fetched_at)
+        return entry
+    
+    async def refresh_all(self, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Refresh every cached limit, or the default limit before any request (scheduler task).
+        
+        ``config`` (the job's config) may set ``ttl_seconds``, the age at
+        which requests trigger a background refresh, and ``default_limit``;
+        missing keys fall back to the settings.
+        """
+        config = config or {}
+        self.ttl_seconds = config.get("ttl_seconds")
+        limits = list(self._entries) or [config.get("default_limit") or settings.AIRSPACE_DEFAULT_LIMIT]
+        failed = 0
+        for limit in limits:
+            await self.refresh(limit)
+            if limit in self._failed_at:
+                failed += 1
+        
+        if failed == len(limits):
+            raise Exception("Airspace refresh failed for every limit")
+        
+        persisted = await self.persist(self.largest())
+        
+        return {
+            "refreshed": len(limits) - failed,
+            "failed": failed,
+            "persisted": persisted
+        }
+    
+    async def persist(self, entry: AirspaceEntry) -> bool:
+        """
+        Write an entry's features to the airspace table unless already written.
+        
+        The in-memory cache keeps serving if the write fails; the next
+        refresh retries it.
+        
+        Returns:
+            Whether the table was updated
+        """
+        if entry.features_etag == self.persisted_etag or not AsyncSessionLocal:
+            return False
+        
+        try:
+            async with AsyncSessionLocal() as session:
+                await AirspaceStore(session).replace_features(entry.data["features"], entry.fetched_at)
+        except Exception as e:
+            logger.warning("Failed to persist airspace", limit=entry.limit, error=str(e))
+            return False
+        
+        self.persisted_etag = entry.features_etag
+        return True
+
+
+# Global airspace cache shared by the scheduler and API endpoints
+airspace_cache = AirspaceCache()
@@ -1,14 +1,17 @@
 """
 Airspace service for fetching restricted airspace data from FAA
 """
-import aiohttp
-import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import ssl
 import json
 
+import numpy as np
+
+from app.clients.http_client import http_clients
+from app.core.config import settings
+from app.utils.geometry import mbr_rings, parse_mbr_array, web_mercator_to_lonlat
+
 logger = logging.getLogger(__name__)
 
 class AirspaceService:
@@ -16,68 +19,28 @@ class AirspaceService:
     
     FAA_AIRSPACE_URL = "https://sua.faa.gov/sua/schedule.json"
     
-    def __init__(self):
-        self.session = None
-    
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
-        if self.session is None or self.session.closed:
-            # Create SSL context that's more permissive for FAA endpoint
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            headers = {
-                'Accept': 'application/json',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Connection': 'keep-alive'
-            }
-            
-            self.session = aiohttp.ClientSession(
-                connector=connector,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        
-        return self.session
+    FAA_HEADERS = {
+        'Accept': 'application/json',
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
     
     def parse_mbr_to_bbox(self, mbr_string: str) -> Optional[Dict[str, float]]:
         """
         Parse MBR string to bounding box coordinates
         MBR format: "min_x,min_y,max_x,max_y" in Web Mercator projection
         """
-        try:
-            coords = [float(x) for x in mbr_string.split(',')]
-            if len(coords) != 4:
-                return None
-            
-            # Convert from Web Mercator to lat/lng (approximate)
-            # This is a simplified conversion - for production you'd want proper projection
-            min_x, min_y, max_x, max_y = coords
-            
-            # Web Mercator to WGS84 conversion (simplified)
-            min_lng = min_x / 111319.9
-            max_lng = max_x / 111319.9
-            min_lat = min_y / 111319.9  
-            max_lat = max_y / 111319.9
-            
-            # Clamp to valid lat/lng ranges
-            min_lng = max(-180, min(180, min_lng))
-            max_lng = max(-180, min(180, max_lng))
-            min_lat = max(-90, min(90, min_lat))
-            max_lat = max(-90, min(90, max_lat))
-            
-            return {
-                'min_lng': min_lng,
-                'min_lat': min_lat,
-                'max_lng': max_lng,
-                'max_lat': max_lat
-            }
-        except (ValueError, IndexError) as e:
-            logger.warning(f"Failed to parse MBR: {mbr_string}, error: {e}")
+        box = parse_mbr_array([mbr_string])[0]
+        if np.isnan(box).any():
+            logger.warning(f"Failed to parse MBR: {mbr_string}")
             return None
+        
+        (min_lng, max_lng), (min_lat, max_lat) = web_mercator_to_lonlat(box[[0, 2]], box[[1, 3]])
+        return {
+            'min_lng': float(min_lng),
+            'min_lat': float(min_lat),
+            'max_lng': float(max_lng),
+            'max_lat': float(max_lat)
+        }
     
     def get_airspace_color(self, airspace_type: str, type_class: str) -> str:
         """Get color for airspace based on type"""
@@ -91,21 +54,21 @@ class AirspaceService:
         }
         return color_map.get(airspace_type, '#888888')  # Default gray
     
-    def process_airspace_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Process a single airspace record into GeoJSON feature"""
+    def process_airspace_record(self, record: Dict[str, Any], ring: Optional[List[List[float]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Process a single airspace record into GeoJSON feature
+        
+        ``ring`` is the record's MBR rectangle when already converted in
+        bulk by ``build_collection``; otherwise it is converted here.
+        """
         try:
-            bbox = self.parse_mbr_to_bbox(record.get('mbr', ''))
-            if not bbox:
+            if ring is None:
+                ring = mbr_rings([record.get('mbr')])[0]
+            if not ring:
                 return None
             
-            # Create a rectangle polygon from bounding box
-            coordinates = [[
-                [bbox['min_lng'], bbox['min_lat']],  # Bottom-left
-                [bbox['max_lng'], bbox['min_lat']],  # Bottom-right
-                [bbox['max_lng'], bbox['max_lat']],  # Top-right
-                [bbox['min_lng'], bbox['max_lat']],  # Top-left
-                [bbox['min_lng'], bbox['min_lat']]   # Close polygon
-            ]]
+            # Rectangle polygon from the bounding box
+            coordinates = [ring]
             
             airspace_type = record.get('type', 'Unknown')
             color = self.get_airspace_color(airspace_type, record.get('type_class', ''))
@@ -144,53 +107,66 @@ class AirspaceService:
             logger.warning(f"Failed to process airspace record: {e}")
             return None
     
-    async def fetch_airspace_data(self, limit: int = 3000) -> Dict[str, Any]:
-        """Fetch airspace data from FAA API"""
-        try:
-            session = await self.get_session()
+    async def download_schedule(self, limit: int = 3000) -> List[Dict[str, Any]]:
+        """
+        Download raw airspace schedule records from the FAA API.
+        
+        When AIRSPACE_FIXTURE_PATH is set the records are read from that
+        recorded schedule instead, as a local stand-in for the FAA.
+        
+        Raises:
+            Exception: If the FAA API fails or returns an unexpected payload
+        """
+        if settings.AIRSPACE_FIXTURE_PATH:
+            with open(settings.AIRSPACE_FIXTURE_PATH) as fixture:
+                data = json.load(fixture)
+        else:
+            # The FAA endpoint's certificate chain does not verify, so it gets an unverified pool
+            client = http_clients.get(self.FAA_AIRSPACE_URL, verify=False)
             
             params = {
                 'limit': limit,
                 'raw': 'true'
             }
             
-            async with session.get(self.FAA_AIRSPACE_URL, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if not data or 'schedule' not in data:
-                        logger.error("Invalid response format from FAA API")
-                        return {'type': 'FeatureCollection', 'features': []}
-                    
-                    logger.info(f"Retrieved {len(data['schedule'])} airspace records")
-                    
-                    # Process records into GeoJSON features
-                    features = []
-                    for record in data['schedule']:
-                        feature = self.process_airspace_record(record)
-                        if feature:
-                            features.append(feature)
-                    
-                    logger.info(f"Successfully processed {len(features)} airspace features")
-                    
-                    return {
-                        'type': 'FeatureCollection',
-                        'features': features,
-                        'total': len(features),
-                        'retrieved_at': datetime.utcnow().isoformat()
-                    }
-                else:
-                    logger.error(f"FAA API returned status {response.status}")
-                    return {'type': 'FeatureCollection', 'features': []}
-                    
+            response = await client.get(self.FAA_AIRSPACE_URL, params=params, headers=self.FAA_HEADERS)
+            if response.status_code != 200:
+                raise Exception(f"FAA API returned status {response.status_code}")
+            data = response.json()
+        
+        if not data or 'schedule' not in data:
+            raise Exception("Invalid response format from FAA API")
+        
+        logger.info(f"Retrieved {len(data['schedule'])} airspace records")
+        return data['schedule'][:limit]
+    
+    def build_collection(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Process schedule records into a GeoJSON FeatureCollection"""
+        # Convert every MBR in one vectorized step
+        rings = mbr_rings(record.get('mbr') for record in records)
+        
+        features = []
+        for record, ring in zip(records, rings):
+            feature = self.process_airspace_record(record, ring) if ring else None
+            if feature:
+                features.append(feature)
+        
+        logger.info(f"Successfully processed {len(features)} airspace features")
+        
+        return {
+            'type': 'FeatureCollection',
+            'features': features,
+            'total': len(features),
+            'retrieved_at': datetime.utcnow().isoformat()
+        }
+    
+    async def fetch_airspace_data(self, limit: int = 3000) -> Dict[str, Any]:
+        """Fetch airspace data from FAA API (an empty collection on failure)"""
+        try:
+            return self.build_collection(await self.download_schedule(limit))
         except Exception as e:
             logger.error(f"Failed to fetch airspace data: {e}")
             return {'type': 'FeatureCollection', 'features': []}
-    
-    async def close(self):
-        """Close the aiohttp session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
 
 # Global service instance
 airspace_service = AirspaceService()
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Airspace store persisting FAA airspace to PostGIS and answering filtered queries
+"""
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger()
+
+BBox = Tuple[float, float, float, float]
+
+# One row per airspace activation; re-fetching the same activation updates it
+UPSERT_AIRSPACE_SQL = """
+INSERT INTO airspace (
+    gid, airspace_name, type, type_class, center_id, state,
+    valid_from, valid_to, min_alt_ft, max_alt_ft, agl,
+    geometry, properties, fetched_at
+) VALUES (
+    :gid, :airspace_name, :type, :type_class, :center_id, :state,
+    :valid_from, :valid_to, :min_alt_ft, :max_alt_ft, :agl,
+    ST_SetSRID(ST_GeomFromGeoJSON(:geometry), 4326), CAST(:properties AS JSONB), :fetched_at
+)
+ON CONFLICT (gid, valid_from) DO UPDATE SET
+    airspace_name = EXCLUDED.airspace_name,
+    type = EXCLUDED.type,
+    type_class = EXCLUDED.type_class,
+    center_id = EXCLUDED.center_id,
+    state = EXCLUDED.state,
+    valid_to = EXCLUDED.valid_to,
+    min_alt_ft = EXCLUDED.min_alt_ft,
+    max_alt_ft = EXCLUDED.max_alt_ft,
+    agl = EXCLUDED.agl,
+    geometry = EXCLUDED.geometry,
+    properties = EXCLUDED.properties,
+    fetched_at = EXCLUDED.fetched_at
+"""
+
+# Activations missing from the latest feed were cancelled or have expired
+DELETE_UNSEEN_AIRSPACE_SQL = """
+DELETE FROM airspace WHERE fetched_at < :fetched_at
+"""
+
+# Envelope tests use idx_airspace_geometry; a box with minLon > maxLon
+# crosses the antimeridian and is split in two
+_BBOX_CLAUSE = """
+  AND geometry && ST_MakeEnvelope(
+      CAST(:min_lon AS DOUBLE PRECISION), CAST(:min_lat AS DOUBLE PRECISION),
+      CAST(:max_lon AS DOUBLE PRECISION), CAST(:max_lat AS DOUBLE PRECISION), 4326)
+"""
+
+_ANTIMERIDIAN_BBOX_CLAUSE = """
+  AND (geometry && ST_MakeEnvelope(
+           CAST(:min_lon AS DOUBLE PRECISION), CAST(:min_lat AS DOUBLE PRECISION),
+           180, CAST(:max_lat AS DOUBLE PRECISION), 4326)
+       OR geometry && ST_MakeEnvelope(
+           -180, CAST(:min_lat AS DOUBLE PRECISION),
+           CAST(:max_lon AS DOUBLE PRECISION), CAST(:max_lat AS DOUBLE PRECISION), 4326))
+"""
+
+# Range containment uses idx_airspace_validity
+_ACTIVE_AT_CLAUSE = """
+  AND validity @> CAST(:active_at AS TIMESTAMPTZ)
+"""
+
+# Airspace whose altitude band overlaps the requested band
+_MIN_ALT_CLAUSE = """
+  AND max_alt_ft >= CAST(:min_alt AS INTEGER)
+"""
+
+_MAX_ALT_CLAUSE = """
+  AND min_alt_ft <= CAST(:max_alt AS INTEGER)
+"""
+
+
+def build_airspace_query_sql(
+    bbox: Optional[BBox] = None,
+    active_at: bool = False,
+    min_alt: bool = False,
+    max_alt: bool = False
+) -> str:
+    """
+    Build the query rendering matching airspace as one GeoJSON FeatureCollection (text).
+    
+    PostGIS assembles the whole collection, so only the serialized
+    document crosses the wire.
+    """
+    where = "WHERE TRUE"
+    if bbox:
+        where += _ANTIMERIDIAN_BBOX_CLAUSE if bbox[0] > bbox[2] else _BBOX_CLAUSE
+    if active_at:
+        where += _ACTIVE_AT_CLAUSE
+    if min_alt:
+        where += _MIN_ALT_CLAUSE
+    if max_alt:
+        where += _MAX_ALT_CLAUSE
+    
+    return f"""
+SELECT CAST(json_build_object(
+    'type', 'FeatureCollection',
+    'features', COALESCE(json_agg(json_build_object(
+        'type', 'Feature',
+        'geometry', CAST(ST_AsGeoJSON(geometry, 6) AS json),
+        'properties', properties
+    ) ORDER BY gid, valid_from), CAST('[]' AS json)),
+    'total', COUNT(*)
+) AS text)
+FROM (
+    SELECT gid, valid_from, geometry, properties
+    FROM airspace
+    {where}
+    ORDER BY gid, valid_from
+    LIMIT :limit
+) matched
+"""
+
+
+def parse_schedule_time(value: Any) -> Optional[datetime]:
+    """Parse an FAA schedule timestamp as UTC (None when missing or malformed)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _feet(value: Any) -> int:
+    """Coerce an FAA altitude to integer feet (0 when missing)"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def airspace_row(feature: Dict[str, Any], fetched_at: datetime) -> Optional[Dict[str, Any]]:
+    """Map an airspace GeoJSON feature to upsert parameters (None without a gid)"""
+    properties = feature.get("properties") or {}
+    if properties.get("gid") is None:
+        return None
+    
+    return {
+        "gid": int(properties["gid"]),
+        "airspace_name": properties.get("airspace_name") or None,
+        "type": properties.get("type") or None,
+        "type_class": properties.get("type_class") or None,
+        "center_id": properties.get("center_id") or None,
+        "state": properties.get("state") or None,
+        "valid_from": parse_schedule_time(properties.get("start_time")),
+        "valid_to": parse_schedule_time(properties.get("end_time")),
+        "min_alt_ft": _feet(properties.get("min_alt")),
+        "max_alt_ft": _feet(properties.get("max_alt")),
+        "agl": bool(properties.get("agl")),
+        "geometry": json.dumps(feature["geometry"]),
+        "properties": json.dumps(properties),
+        "fetched_at": fetched_at
+    }
+
+
+class AirspaceStore:
+    """Persists airspace features and runs filtered airspace queries"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def replace_features(self, features: List[Dict[str, Any]], fetched_at: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Upsert the latest feed's features and drop activations no longer in it.
+        An empty feature list leaves the table untouched.
+        
+        Returns:
+            Counts of upserted and removed rows
+        """
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        rows = [row for row in (airspace_row(feature, fetched_at) for feature in features) if row]
+        
+        if not rows:
+            # An empty feed is more likely an upstream fault than no airspace
+            return {"upserted": 0, "removed": 0}
+        
+        await self.session.execute(text(UPSERT_AIRSPACE_SQL), rows)
+        result = await self.session.execute(text(DELETE_UNSEEN_AIRSPACE_SQL), {"fetched_at": fetched_at})
+        await self.session.commit()
+        
+        logger.info("Airspace persisted", upserted=len(rows), removed=result.rowcount)
+        return {
+            "upserted": len(rows),
+            "removed": result.rowcount
+        }
+    
+    async def query_geojson(
+        self,
+        limit: int,
+        bbox: Optional[BBox] = None,
+        active_at: Optional[datetime] = None,
+        min_alt: Optional[int] = None,
+        max_alt: Optional[int] = None
+    ) -> bytes:
+        """Get matching airspace as a serialized GeoJSON FeatureCollection"""
+        params: Dict[str, Any] = {"limit": limit}
+        if bbox:
+            params.update(zip(("min_lon", "min_lat", "max_lon", "max_lat"), bbox))
+        if active_at is not None:
+            params["active_at"] = active_at
+        if min_alt is not None:
+            params["min_alt"] = min_alt
+        if max_alt is not None:
+            params["max_alt"] = max_alt
+        
+        sql = build_airspace_query_sql(bbox, active_at is not None, min_alt is not None, max_alt is not None)
+        result = await self.session.execute(text(sql), params)
+        return result.scalar_one().encode()
@@ -0,0 +1,233 @@
+"""
+Archive partition service for managing time partitions of aircraft_archive
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = structlog.get_logger()
+
+PARENT_TABLE = "aircraft_archive"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+PARTITION_INTERVALS = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+
+RETENTION_ACTIONS = ("drop", "detach")
+
+# ArchivePartitionService arguments a maintenance job's config may set
+MAINTENANCE_CONFIG_KEYS = ("interval", "partitions_ahead", "retention_days", "retention_action")
+
+LIST_PARTITIONS_SQL = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = CAST(:parent AS regclass)
+"""
+
+# e.g. FOR VALUES FROM ('2026-10-16 00:00:00+00') TO ('2026-10-17 00:00:00+00')
+_RANGE_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def parse_partition_bound(bound: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Parse a range partition bound expression into UTC (start, end).
+    
+    Returns None for the DEFAULT partition or bounds that are not timestamps.
+    """
+    match = _RANGE_BOUND_PATTERN.search(bound or "")
+    if not match:
+        return None
+    
+    try:
+        start, end = (_parse_bound_timestamp(value) for value in match.groups())
+    except ValueError:
+        return None
+    
+    return start, end
+
+
+def _parse_bound_timestamp(value: str) -> datetime:
+    """Parse a timestamptz literal as rendered by PostgreSQL"""
+    # PostgreSQL renders offsets as +00 or +05:30; fromisoformat wants +00:00
+    if re.search(r"[+-]\d{2}$", value):
+        value = f"{value}:00"
+    
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class ArchivePartitionService:
+    """Service for creating and expiring aircraft_archive partitions"""
+    
+    def __init__(
+        self,
+        session: AsyncSession,
+        interval: Optional[str] = None,
+        partitions_ahead: Optional[int] = None,
+        retention_days: Optional[int] = None,
+        retention_action: Optional[str] = None
+    ):
+        self.session = session
+        self.interval = interval or settings.ARCHIVE_PARTITION_INTERVAL
+        self.partitions_ahead = partitions_ahead if partitions_ahead is not None else settings.ARCHIVE_PARTITIONS_AHEAD
+        self.retention_days = retention_days if retention_days is not None else settings.ARCHIVE_RETENTION_DAYS
+        self.retention_action = retention_action or settings.ARCHIVE_RETENTION_ACTION
+        
+        if self.interval not in PARTITION_INTERVALS:
+            raise ValueError(f"Unknown archive partition interval: {self.interval}")
+        if self.retention_action not in RETENTION_ACTIONS:
+            raise ValueError(f"Unknown archive retention action: {self.retention_action}")
+    
+    def partition_bounds(self, moment: datetime) -> Tuple[datetime, datetime]:
+        """Get the [start, end) range of the partition containing ``moment``"""
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        moment = moment.astimezone(timezone.utc)
+        
+        if self.interval == "hourly":
+            start = moment.replace(minute=0, second=0, microsecond=0)
+        else:
+            start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        return start, start + PARTITION_INTERVALS[self.interval]
+    
+    def partition_name(self, start: datetime) -> str:
+        """Get the table name for the partition starting at ``start``"""
+        suffix = start.strftime("%Y%m%d%H" if self.interval == "hourly" else "%Y%m%d")
+        return f"{PARENT_TABLE}_p{suffix}"
+    
+    async def list_partitions(self) -> List[Tuple[str, datetime, datetime]]:
+        """List existing range partitions as (name, start, end), oldest first"""
+        result = await self.session.execute(text(LIST_PARTITIONS_SQL), {"parent": PARENT_TABLE})
+        
+        partitions = []
+        for name, bound in result.fetchall():
+            bounds = parse_partition_bound(bound)
+            if bounds:
+                partitions.append((name, *bounds))
+        
+        return sorted(partitions, key=lambda partition: partition[1])
+    
+    async def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create partitions for the current period and the configured number of
+        future periods. Ranges already covered by an existing partition (for
+        example after switching between hourly and daily) are skipped.
+        
+        Returns:
+            Names of the partitions that were created
+        """
+        now = now or datetime.now(timezone.utc)
+        existing = await self.list_partitions()
+        created = []
+        
+        start, end = self.partition_bounds(now)
+        for _ in range(self.partitions_ahead + 1):
+            overlaps = any(start < p_end and p_start < end for _, p_start, p_end in existing)
+            if not overlaps:
+                name = self.partition_name(start)
+                try:
+                    # The current period may already have rows in the default
+                    # partition, which makes PostgreSQL reject the new range
+                    async with self.session.begin_nested():
+                        await self.session.execute(text(
+                            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+                            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                        ))
+                    created.append(name)
+                    existing.append((name, start, end))
+                except Exception as e:
+                    logger.warning("Failed to create archive partition", partition=name, error=str(e))
+            
+            start, end = end, end + PARTITION_INTERVALS[self.interval]
+        
+        return created
+    
+    async def expire_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Drop or detach partitions whose whole range is older than the retention period.
+        
+        Returns:
+            Names of the partitions that were removed
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.retention_days)
+        expired = []
+        
+        for name, _, end in await self.list_partitions():
+            if end > cutoff:
+                continue
+            
+            if self.retention_action == "detach":
+                await self.session.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            else:
+                await self.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            expired.append(name)
+        
+        return expired
+    
+    async def expire_default_rows(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete rows older than the retention period from the default partition.
+        
+        Rows archived before their range partition existed land in the
+        default partition, which is never dropped or detached, so they are
+        expired row by row whatever the retention action.
+        
+        Returns:
+            Number of rows deleted
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.retention_days)
+        result = await self.session.execute(
+            text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE archived_at < :cutoff'),
+            {"cutoff": cutoff}
+        )
+        return result.rowcount or 0
+    
+    async def run_maintenance(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Create upcoming partitions and expire old ones"""
+        created = await self.ensure_partitions(now)
+        expired = await self.expire_partitions(now)
+        expired_default_rows = await self.expire_default_rows(now)
+        await self.session.commit()
+        
+        logger.info("Archive partition maintenance completed",
+                   interval=self.interval,
+                   created=created,
+                   expired=expired,
+                   expired_default_rows=expired_default_rows,
+                   retention_action=self.retention_action)
+        
+        return {
+            "created": len(created),
+            "expired": len(expired),
+            "expired_default_rows": expired_default_rows
+        }
+
+
+async def run_archive_partition_maintenance(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run archive partition maintenance in its own session (scheduler task).
+    
+    ``config`` (the job's config) overrides the settings for any of
+    MAINTENANCE_CONFIG_KEYS.
+    """
+    if not AsyncSessionLocal:
+        raise Exception("Database not available")
+    
+    options = {key: value for key, value in (config or {}).items() if key in MAINTENANCE_CONFIG_KEYS}
+    async with AsyncSessionLocal() as session:
+        return await ArchivePartitionService(session, **options).run_maintenance()
@@ -0,0 +1,49 @@
+"""
+Per-tenant data generation counters used to key caches of live aircraft data
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union
+from uuid import UUID, uuid4
+
+import structlog
+
+logger = structlog.get_logger()
+
+TenantKey = Union[UUID, str]
+
+
+class DataGenerationTracker:
+    """
+    Tracks a monotonically increasing generation per tenant.
+    
+    The generation is bumped whenever an ingest commits new aircraft data,
+    so anything cached under an older generation is known to be stale.
+    Generations restart at 0 with the process, so values handed to clients
+    (ETags) are qualified with the per-process ``epoch``.
+    """
+    
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        self._changed_at: Dict[str, datetime] = {}
+        self.epoch = uuid4().hex[:8]
+    
+    def get(self, tenant_id: TenantKey) -> int:
+        """Get the current generation for a tenant"""
+        return self._generations.get(str(tenant_id), 0)
+    
+    def changed_at(self, tenant_id: TenantKey) -> Optional[datetime]:
+        """Get when a tenant's generation last advanced (UTC), if it has"""
+        return self._changed_at.get(str(tenant_id))
+    
+    def bump(self, tenant_id: TenantKey) -> int:
+        """Advance a tenant's generation after its data changed"""
+        key = str(tenant_id)
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self._changed_at[key] = datetime.now(timezone.utc)
+        logger.debug("Data generation advanced", tenant_id=key, generation=generation)
+        return generation
+
+
+# Global generation tracker
+data_generations = DataGenerationTracker()
@@ -0,0 +1,259 @@
+"""
+Live fleet cache serving aircraft reads from immutable in-memory snapshots
+"""
+import asyncio
+from bisect import bisect_left
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import structlog
+from geoalchemy2.functions import ST_X, ST_Y
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.aircraft import Aircraft as AircraftModel
+from app.services.aircraft_service import (
+    DEFAULT_RESPONSE_FIELDS,
+    GEOJSON_PROPERTIES,
+    SEARCH_WEIGHTS,
+    response_columns,
+)
+from app.services.data_generation import data_generations
+from app.utils.compression import CompressedPayload
+from app.utils.geometry import point_in_bbox
+from app.utils.serialization import dumps
+from app.utils.trigram import similarity
+
+logger = structlog.get_logger()
+
+# Snapshots hold every response field except raw_data; requests for it go to the database
+SNAPSHOT_FIELDS = DEFAULT_RESPONSE_FIELDS
+
+BBox = Tuple[float, float, float, float]
+Position = Tuple[float, float]
+
+
+class FleetSnapshot:
+    """
+    Immutable view of a tenant's live aircraft at one data generation.
+    
+    Aircraft are held newest first, ordered by (updated_at, id) descending
+    like the keyset-paginated list endpoint. Snapshots are never modified
+    after construction, so readers need no locking.
+    """
+    
+    __slots__ = ("tenant_id", "generation", "built_at", "aircraft", "positions",
+                 "by_id", "features", "geojson", "_keys_ascending")
+    
+    def __init__(
+        self,
+        tenant_id: str,
+        generation: int,
+        aircraft: Sequence[Mapping[str, Any]],
+        positions: Sequence[Optional[Position]]
+    ):
+        self.tenant_id = tenant_id
+        self.generation = generation
+        self.built_at = datetime.now(timezone.utc)
+        self.aircraft: Tuple[Mapping[str, Any], ...] = tuple(MappingProxyType(dict(row)) for row in aircraft)
+        self.positions: Tuple[Optional[Position], ...] = tuple(positions)
+        self.by_id: Mapping[UUID, Mapping[str, Any]] = MappingProxyType({row["id"]: row for row in self.aircraft})
+        self._keys_ascending = [(row["updated_at"], row["id"]) for row in reversed(self.aircraft)]
+        
+        # Features only for aircraft with a stored position, as in the SQL GeoJSON
+        self.features: Tuple[Tuple[Position, Dict[str, Any]], ...] = tuple(
+            (position, _feature(row, position))
+            for row, position in zip(self.aircraft, self.positions)
+            if position is not None
+        )
+        self.geojson = CompressedPayload(dumps({
+            "type": "FeatureCollection",
+            "features": [feature for _, feature in self.features]
+        }))
+    
+    def __len__(self) -> int:
+        return len(self.aircraft)
+    
+    def index_after(self, after: Tuple[datetime, UUID]) -> int:
+        """Index of the first aircraft sorting after a keyset cursor"""
+        return len(self._keys_ascending) - bisect_left(self._keys_ascending, after)
+    
+    def iter_matching(self, predicate: Optional[Callable[[Mapping[str, Any], Optional[Position]], bool]],
+                      start: int = 0) -> Iterator[Mapping[str, Any]]:
+        """Iterate aircraft from ``start`` that satisfy ``predicate``"""
+        for index in range(start, len(self.aircraft)):
+            row = self.aircraft[index]
+            if predicate is None or predicate(row, self.positions[index]):
+                yield row
+    
+    def features_in(self, bbox: BBox) -> List[Dict[str, Any]]:
+        """GeoJSON features inside a bounding box"""
+        return [feature for position, feature in self.features if point_in_bbox(*position, bbox)]
+    
+    def search(self, query: str, limit: int) -> List[Tuple[Mapping[str, Any], int]]:
+        """Rank aircraft the same way as ``AircraftService.search_aircraft``"""
+        query = query.strip().lower()
+        ranked = []
+        for row in self.aircraft:
+            hex_code = (row["hex"] or "").lower()
+            if not (hex_code.startswith(query) or any(
+                query in (row[name] or "").lower() for name in SEARCH_WEIGHTS if name != "hex"
+            )):
+                continue
+            
+            score = max(_search_score(row[name], query, weights) for name, weights in SEARCH_WEIGHTS.items())
+            closeness = max(similarity(row[name], query) for name in SEARCH_WEIGHTS)
+            ranked.append((score, closeness, row["updated_at"], row))
+        
+        ranked.sort(key=lambda item: item[:3], reverse=True)
+        return [(row, score) for score, _, _, row in ranked[:limit]]
+
+
+def _feature(row: Mapping[str, Any], position: Position) -> Dict[str, Any]:
+    """GeoJSON feature for an aircraft, matching the features built by aircraft_service.build_geojson_sql"""
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(position[0], 6), round(position[1], 6)]},
+        "properties": {name: row[column] for name, column in GEOJSON_PROPERTIES}
+    }
+
+
+def _search_score(value: Optional[str], query: str, weights: Tuple[int, int, int]) -> int:
+    """Exact, prefix or substring score of one column value"""
+    exact, prefix, substring = weights
+    value = (value or "").strip().lower()
+    if not value:
+        return 0
+    if value == query:
+        return exact
+    if value.startswith(query):
+        return prefix
+    if substring and query in value:
+        return substring
+    return 0
+
+
+def aircraft_matcher(
+    hex_filter: Optional[str] = None,
+    flight_filter: Optional[str] = None,
+    bbox: Optional[BBox] = None
+) -> Optional[Callable[[Mapping[str, Any], Optional[Position]], bool]]:
+    """Build an in-memory equivalent of the list endpoint's filters"""
+    if not (hex_filter or flight_filter or bbox):
+        return None
+    
+    hex_filter = hex_filter.lower() if hex_filter else None
+    flight_filter = flight_filter.lower() if flight_filter else None
+    
+    def matches(row: Mapping[str, Any], position: Optional[Position]) -> bool:
+        if hex_filter and hex_filter not in (row["hex"] or "").lower():
+            return False
+        if flight_filter and flight_filter not in (row["flight"] or "").lower():
+            return False
+        if bbox and (position is None or not point_in_bbox(*position, bbox)):
+            return False
+        return True
+    
+    return matches
+
+
+class FleetCache:
+    """
+    Per-tenant live fleet snapshots.
+    
+    A snapshot is replaced wholesale after each ingest; until the new one is
+    built readers keep getting the previous snapshot, so the API serves from
+    memory during ingest.
+    """
+    
+    def __init__(self):
+        self._snapshots: Dict[str, FleetSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    def get(self, tenant_id: UUID) -> Optional[FleetSnapshot]:
+        """Get the current snapshot for a tenant, if one has been built"""
+        if not settings.FLEET_CACHE_ENABLED:
+            return None
+        return self._snapshots.get(str(tenant_id))
+    
+    def _lock(self, tenant_id: UUID) -> asyncio.Lock:
+        return self._locks.setdefault(str(tenant_id), asyncio.Lock())
+    
+    async def get_or_build(self, session: AsyncSession, tenant_id: UUID) -> Optional[FleetSnapshot]:
+        """Get the tenant's snapshot, building it on first use"""
+        if not settings.FLEET_CACHE_ENABLED:
+            return None
+        
+        snapshot = self._snapshots.get(str(tenant_id))
+        if snapshot is not None:
+            return snapshot
+        
+        # Only one request per tenant builds the first snapshot
+        async with self._lock(tenant_id):
+            snapshot = self._snapshots.get(str(tenant_id))
+            if snapshot is None:
+                snapshot = self._store(await self._build(session, tenant_id))
+        return snapshot
+    
+    async def rebuild(self, session: AsyncSession, tenant_id: UUID) -> FleetSnapshot:
+        """
+        Load the tenant's live aircraft and swap in a new snapshot.
+        
+        Builds for a tenant run one at a time, and a snapshot never replaces
+        one of a newer generation. Returns the snapshot now cached.
+        """
+        async with self._lock(tenant_id):
+            return self._store(await self._build(session, tenant_id))
+    
+    async def _build(self, session: AsyncSession, tenant_id: UUID) -> FleetSnapshot:
+        """Load the tenant's live aircraft into a snapshot (not yet visible to readers)"""
+        generation = data_generations.get(tenant_id)
+        result = await session.execute(
+            select(
+                *response_columns(SNAPSHOT_FIELDS),
+                ST_X(AircraftModel.position),
+                ST_Y(AircraftModel.position)
+            )
+            .where(AircraftModel.tenant_id == tenant_id)
+            .order_by(AircraftModel.last_updated.desc(), AircraftModel.id.desc())
+        )
+        
+        width = len(SNAPSHOT_FIELDS)
+        aircraft, positions = [], []
+        for row in result.fetchall():
+            aircraft.append(dict(zip(SNAPSHOT_FIELDS, row[:width])))
+            longitude, latitude = row[width], row[width + 1]
+            positions.append((longitude, latitude) if longitude is not None and latitude is not None else None)
+        
+        snapshot = FleetSnapshot(str(tenant_id), generation, aircraft, positions)
+        # Compress once per generation, before readers can see the snapshot
+        await snapshot.geojson.precompress()
+        return snapshot
+    
+    def _store(self, snapshot: FleetSnapshot) -> FleetSnapshot:
+        """Cache a snapshot unless a newer generation is already cached; returns the cached one"""
+        current = self._snapshots.get(snapshot.tenant_id)
+        if current is not None and current.generation > snapshot.generation:
+            logger.info("Discarded stale fleet snapshot",
+                       tenant_id=snapshot.tenant_id,
+                       generation=snapshot.generation,
+                       cached_generation=current.generation)
+            return current
+        
+        self._snapshots[snapshot.tenant_id] = snapshot
+        logger.info("Fleet snapshot rebuilt",
+                   tenant_id=snapshot.tenant_id,
+                   generation=snapshot.generation,
+                   aircraft=len(snapshot))
+        return snapshot
+    
+    def invalidate(self, tenant_id: UUID) -> None:
+        """Drop a tenant's snapshot"""
+        self._snapshots.pop(str(tenant_id), None)
+
+
+# Global fleet cache shared by the scheduler and API endpoints
+fleet_cache = FleetCache()
@@ -0,0 +1,288 @@
+"""
+Incursion service detecting live aircraft inside active restricted airspace
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+import shapely
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.airspace_cache_service import AirspaceCache, airspace_cache
+from app.services.airspace_store_service import parse_schedule_time
+from app.services.fleet_cache_service import FleetCache, fleet_cache
+
+logger = structlog.get_logger()
+
+Position = Tuple[float, float]
+
+# Live aircraft positions, used when the tenant has no fleet snapshot
+LIVE_POSITIONS_SQL = """
+SELECT id, hex, flight, altitude_baro, altitude_geom, ST_X(position), ST_Y(position)
+FROM aircraft
+WHERE tenant_id = :tenant_id AND position IS NOT NULL
+"""
+
+# Open incursions are unique per aircraft and airspace (uq_airspace_incursions_open)
+UPSERT_INCURSION_SQL = """
+INSERT INTO airspace_incursions (
+    id, tenant_id, aircraft_id, hex, flight, airspace_gid, airspace_name, airspace_type,
+    position, altitude, started_at, last_seen_at
+) VALUES (
+    gen_random_uuid(), :tenant_id, :aircraft_id, :hex, :flight, :airspace_gid, :airspace_name, :airspace_type,
+    ST_SetSRID(ST_MakePoint(:longitude, :latitude), 4326), :altitude, :evaluated_at, :evaluated_at
+)
+ON CONFLICT (tenant_id, hex, airspace_gid) WHERE ended_at IS NULL DO UPDATE SET
+    aircraft_id = EXCLUDED.aircraft_id,
+    flight = EXCLUDED.flight,
+    position = EXCLUDED.position,
+    altitude = EXCLUDED.altitude,
+    last_seen_at = EXCLUDED.last_seen_at
+"""
+
+# Open incursions not confirmed by this evaluation have ended
+CLOSE_INCURSIONS_SQL = """
+UPDATE airspace_incursions
+SET ended_at = :evaluated_at
+WHERE tenant_id = :tenant_id AND ended_at IS NULL AND last_seen_at < :evaluated_at
+"""
+
+LIST_INCURSIONS_SQL = """
+SELECT id, aircraft_id, hex, flight, airspace_gid, airspace_name, airspace_type,
+       ST_X(position) AS longitude, ST_Y(position) AS latitude, altitude,
+       started_at, last_seen_at, ended_at
+FROM airspace_incursions
+WHERE tenant_id = :tenant_id
+"""
+
+
+def _epoch(value: Any) -> float:
+    """Schedule time as epoch seconds (NaN when open-ended)"""
+    parsed = parse_schedule_time(value)
+    return parsed.timestamp() if parsed else np.nan
+
+
+def _altitude(value: Any) -> float:
+    """Altitude in feet (NaN when unknown)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class AirspaceIndex:
+    """
+    STR-tree over restricted airspace polygons with their time windows and altitude bands.
+    
+    Only airspace of the given FAA SUA ``types`` (default:
+    INCURSION_AIRSPACE_TYPES) is indexed, so MOAs, warning areas and the
+    like never record incursions.
+    
+    Built once per airspace collection; ``evaluate`` answers a whole fleet
+    with one bulk tree query instead of testing every aircraft against every
+    polygon. Altitude bands are compared as MSL, so AGL floors are an
+    approximation without terrain data.
+    """
+    
+    def __init__(
+        self,
+        features: Sequence[Mapping[str, Any]],
+        features_etag: Optional[str] = None,
+        types: Optional[Sequence[str]] = None
+    ):
+        self.features_etag = features_etag
+        types = frozenset(types if types is not None else settings.INCURSION_AIRSPACE_TYPES)
+        
+        # Incursions are keyed by the FAA record id
+        usable = [
+            feature for feature in features
+            if feature.get("geometry")
+            and (feature.get("properties") or {}).get("gid") is not None
+            and (feature.get("properties") or {}).get("type") in types
+        ]
+        properties = [feature.get("properties") or {} for feature in usable]
+        
+        self.polygons = np.array([shapely.geometry.shape(feature["geometry"]) for feature in usable], dtype=object)
+        self.tree = shapely.STRtree(self.polygons)
+        self.gids = [props.get("gid") for props in properties]
+        self.names = [props.get("airspace_name") or None for props in properties]
+        self.types = [props.get("type") or None for props in properties]
+        self.valid_from = np.array([_epoch(props.get("start_time")) for props in properties], dtype=float)
+        self.valid_to = np.array([_epoch(props.get("end_time")) for props in properties], dtype=float)
+        self.min_alt = np.array([_altitude(props.get("min_alt")) for props in properties], dtype=float)
+        self.max_alt = np.array([_altitude(props.get("max_alt")) for props in properties], dtype=float)
+    
+    def __len__(self) -> int:
+        return len(self.polygons)
+    
+    def active_mask(self, at: datetime) -> np.ndarray:
+        """Airspace scheduled to be active at a time; missing bounds are open"""
+        moment = at.timestamp()
+        return (np.isnan(self.valid_from) | (self.valid_from <= moment)) & \
+               (np.isnan(self.valid_to) | (moment < self.valid_to))
+    
+    def evaluate(
+        self,
+        positions: Sequence[Position],
+        altitudes: Sequence[Optional[float]],
+        at: datetime
+    ) -> List[Tuple[int, int]]:
+        """
+        Find aircraft inside active airspace within its altitude band.
+        
+        Aircraft without a known altitude are not reported.
+        
+        Returns:
+            (aircraft index, airspace index) pairs
+        """
+        if not len(self) or not len(positions):
+            return []
+        
+        coordinates = np.asarray(positions, dtype=float).reshape(-1, 2)
+        aircraft, airspace = self.tree.query(
+            shapely.points(coordinates), predicate="intersects"
+        )
+        if not len(aircraft):
+            return []
+        
+        altitude = np.array([_altitude(value) for value in altitudes], dtype=float)[aircraft]
+        keep = self.active_mask(at)[airspace] & \
+               (altitude >= np.nan_to_num(self.min_alt[airspace], nan=-np.inf)) & \
+               (altitude <= np.nan_to_num(self.max_alt[airspace], nan=np.inf))
+        
+        return list(zip(aircraft[keep].tolist(), airspace[keep].tolist()))
+
+
+class IncursionService:
+    """Records and lists airspace incursions"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def record(self, tenant_id: UUID, rows: List[Dict[str, Any]], evaluated_at: datetime) -> Dict[str, int]:
+        """
+        Upsert the current incursions and end those no longer observed.
+        
+        Returns:
+            Counts of open and ended incursions
+        """
+        for row in rows:
+            row.update(tenant_id=tenant_id, evaluated_at=evaluated_at)
+        if rows:
+            await self.session.execute(text(UPSERT_INCURSION_SQL), rows)
+        result = await self.session.execute(
+            text(CLOSE_INCURSIONS_SQL), {"tenant_id": tenant_id, "evaluated_at": evaluated_at}
+        )
+        await self.session.commit()
+        
+        return {
+            "open": len(rows),
+            "ended": result.rowcount
+        }
+    
+    async def list_incursions(
+        self,
+        tenant_id: UUID,
+        active: bool = True,
+        hex_code: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """List a tenant's incursions, newest first"""
+        sql = LIST_INCURSIONS_SQL
+        params: Dict[str, Any] = {"tenant_id": tenant_id, "limit": limit}
+        if active:
+            sql += "  AND ended_at IS NULL\n"
+        if hex_code:
+            sql += "  AND hex = :hex\n"
+            params["hex"] = hex_code.lower()
+        sql += "ORDER BY started_at DESC\nLIMIT :limit\n"
+        
+        result = await self.session.execute(text(sql), params)
+        return [dict(row) for row in result.mappings().all()]
+
+
+class IncursionEngine:
+    """
+    Evaluates a tenant's live fleet against the cached airspace after each ingest.
+    
+    The airspace index is rebuilt only when the airspace collection changes,
+    and aircraft come from the fleet snapshot when one exists.
+    """
+    
+    def __init__(self, airspace: Optional[AirspaceCache] = None, fleet: Optional[FleetCache] = None):
+        self.airspace = airspace or airspace_cache
+        self.fleet = fleet or fleet_cache
+        self._index: Optional[AirspaceIndex] = None
+    
+    def current_index(self) -> Optional[AirspaceIndex]:
+        """Index over the largest cached airspace collection (None before the first fetch)"""
+        entry = self.airspace.largest()
+        if entry is None:
+            return None
+        if self._index is None or self._index.features_etag != entry.features_etag:
+            self._index = AirspaceIndex(entry.data["features"], entry.features_etag)
+        return self._index
+    
+    async def _live_aircraft(self, session: AsyncSession, tenant_id: UUID) -> Tuple[List[Mapping[str, Any]], List[Position]]:
+        """Live aircraft with a position, and their positions"""
+        snapshot = self.fleet.get(tenant_id)
+        if snapshot is not None:
+            pairs = [(row, position) for row, position in zip(snapshot.aircraft, snapshot.positions) if position is not None]
+        else:
+            result = await session.execute(text(LIVE_POSITIONS_SQL), {"tenant_id": tenant_id})
+            pairs = [
+                ({"id": row[0], "hex": row[1], "flight": row[2], "altitude_baro": row[3], "altitude_geom": row[4]},
+                 (row[5], row[6]))
+                for row in result.fetchall()
+            ]
+        return [row for row, _ in pairs], [position for _, position in pairs]
+    
+    async def evaluate(self, session: AsyncSession, tenant_id: UUID, at: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Detect the tenant's current incursions and record them.
+        
+        Returns:
+            Counts of evaluated aircraft, open and ended incursions
+        """
+        index = self.current_index()
+        if index is None:
+            return {"aircraft": 0, "open": 0, "ended": 0}
+        
+        at = at or datetime.now(timezone.utc)
+        aircraft, positions = await self._live_aircraft(session, tenant_id)
+        altitudes = [
+            row["altitude_baro"] if row["altitude_baro"] is not None else row["altitude_geom"]
+            for row in aircraft
+        ]
+        
+        rows = []
+        for aircraft_index, airspace_index in index.evaluate(positions, altitudes, at):
+            row = aircraft[aircraft_index]
+            longitude, latitude = positions[aircraft_index]
+            rows.append({
+                "aircraft_id": row["id"],
+                "hex": row["hex"],
+                "flight": row["flight"],
+                "airspace_gid": index.gids[airspace_index],
+                "airspace_name": index.names[airspace_index],
+                "airspace_type": index.types[airspace_index],
+                "longitude": longitude,
+                "latitude": latitude,
+                "altitude": int(altitudes[aircraft_index])
+            })
+        
+        counts = await IncursionService(session).record(tenant_id, rows, at)
+        logger.info("Airspace incursions evaluated",
+                   tenant_id=str(tenant_id),
+                   aircraft=len(aircraft),
+                   airspace=len(index),
+                   **counts)
+        return {"aircraft": len(aircraft), **counts}
+
+
+# Global incursion engine run by the scheduler after each ingest
+incursion_engine = IncursionEngine()
@@ -4,8 +4,9 @@ Manages cron-like scheduling for data collection clients
 """
 import asyncio
 import importlib
+from functools import partial
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 from uuid import uuid4, UUID
 
 import structlog
@@ -15,6 +16,12 @@ from sqlalchemy import select
 from app.core.database import AsyncSessionLocal
 from app.core.config import settings
 from app.models.tenant import Tenant as TenantModel
+from app.services.aircraft_stream_service import aircraft_stream
+from app.services.airspace_cache_service import airspace_cache
+from app.services.archive_partition_service import run_archive_partition_maintenance
+from app.services.data_generation import data_generations
+from app.services.fleet_cache_service import fleet_cache
+from app.services.incursion_service import incursion_engine
 
 logger = structlog.get_logger()
 
@@ -26,11 +33,12 @@ class ScheduledJob:
         self,
         job_id: str,
         name: str,
-        client_class: str,
+        client_class: Optional[str],
         config: Dict[str, Any],
         interval_minutes: int,
         tenant_id: str,
-        enabled: bool = True
+        enabled: bool = True,
+        task: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
     ):
         self.job_id = job_id
         self.name = name
@@ -39,12 +47,15 @@ class ScheduledJob:
         self.interval_minutes = interval_minutes
         self.tenant_id = tenant_id
         self.enabled = enabled
+        self.task = task  # Maintenance jobs run a coroutine instead of a data client
         
         self.last_run: Optional[datetime] = None
         self.next_run: Optional[datetime] = None
         self.run_count = 0
         self.error_count = 0
+        self.no_change_count = 0  # Runs that found the source unchanged and stored nothing
         self.last_error: Optional[str] = None
+        self.last_outcome: Optional[str] = None  # "success", "no-change" or "failed"
         
         self._calculate_next_run()
     
@@ -62,16 +73,20 @@ class ScheduledJob:
             return False
         return self.next_run and datetime.utcnow() >= self.next_run
     
-    def mark_completed(self, success: bool = True, error: Optional[str] = None):
+    def mark_completed(self, success: bool = True, error: Optional[str] = None, unchanged: bool = False):
         """Mark job as completed"""
         self.last_run = datetime.utcnow()
         self.run_count += 1
         
         if success:
             self.last_error = None
+            self.last_outcome = "no-change" if unchanged else "success"
+            if unchanged:
+                self.no_change_count += 1
         else:
             self.error_count += 1
             self.last_error = error
+            self.last_outcome = "failed"
         
         self._calculate_next_run()
     
@@ -89,7 +104,9 @@ class ScheduledJob:
             "next_run": self.next_run.isoformat() if self.next_run else None,
             "run_count": self.run_count,
             "error_count": self.error_count,
-            "last_error": self.last_error
+            "no_change_count": self.no_change_count,
+            "last_error": self.last_error,
+            "last_outcome": self.last_outcome
         }
 
 
@@ -106,7 +123,45 @@ class SchedulerService:
     
     def _register_default_jobs(self):
         """Register default data collection jobs"""
-        # ADSBExchange military aircraft job with archive-and-refresh
+        # Archive partition maintenance - registered first so partitions exist
+        # before the first ingest archives anything
+        archive_maintenance_config = {
+            "interval": settings.ARCHIVE_PARTITION_INTERVAL,
+            "partitions_ahead": settings.ARCHIVE_PARTITIONS_AHEAD,
+            "retention_days": settings.ARCHIVE_RETENTION_DAYS,
+            "retention_action": settings.ARCHIVE_RETENTION_ACTION
+        }
+        archive_maintenance_job = ScheduledJob(
+            job_id="archive-partition-maintenance",
+            name="Aircraft Archive Partition Maintenance",
+            client_class=None,
+            config=archive_maintenance_config,
+            interval_minutes=60,  # Every hour (hourly partitions are pre-created ahead)
+            tenant_id="default",
+            # The task reads the job's config dict, so edits to it apply on the next run
+            task=partial(run_archive_partition_maintenance, archive_maintenance_config)
+        )
+        
+        self.jobs[archive_maintenance_job.job_id] = archive_maintenance_job
+        
+        # FAA airspace refresh - keeps the airspace endpoint served from memory
+        airspace_refresh_config = {
+            "ttl_seconds": settings.AIRSPACE_CACHE_TTL_SECONDS,
+            "default_limit": settings.AIRSPACE_DEFAULT_LIMIT
+        }
+        airspace_refresh_job = ScheduledJob(
+            job_id="airspace-refresh",
+            name="FAA Airspace Refresh",
+            client_class=None,
+            config=airspace_refresh_config,
+            interval_minutes=settings.AIRSPACE_REFRESH_INTERVAL_MINUTES,
+            tenant_id="default",
+            task=partial(airspace_cache.refresh_all, airspace_refresh_config)
+        )
+        
+        self.jobs[airspace_refresh_job.job_id] = airspace_refresh_job
+        
+        # ADSBExchange military aircraft job with incremental refresh
         adsbexchange_job = ScheduledJob(
             job_id="adsbexchange-military",
             name="ADSBExchange Military Aircraft",
@@ -115,7 +170,7 @@ class SchedulerService:
                 "rapidapi_key": settings.ADSBEXCHANGE_RAPIDAPI_KEY,
                 "endpoint": "/v2/mil/",
                 "timeout": 30,
-                "use_archive_refresh": True  # Enable archive-and-refresh mode
+                "storage_mode": "incremental"  # Only write and archive aircraft that changed
             },
             interval_minutes=30,  # Every 30 minutes
             tenant_id="default"
@@ -143,11 +198,20 @@ class SchedulerService:
                         job_id=job.job_id, job_name=job.name)
         
         try:
+            # Maintenance jobs run their task directly
+            if job.task is not None:
+                result = await job.task()
+                self.logger.info("Scheduled task completed successfully",
+                                job_id=job.job_id, **result)
+                job.mark_completed(success=True)
+                return
+            
             # Load the client class
             client_class = await self._load_client_class(job.client_class)
             
-            # Create client instance
-            client = client_class(job.config)
+            # Create client instance; the job id scopes its conditional-fetch state
+            client = client_class({**job.config, "job_id": job.job_id})
+            unchanged = False
             
             # Execute the complete workflow if database is available
             if AsyncSessionLocal:
@@ -176,13 +240,44 @@ class SchedulerService:
                         else:
                             tenant_uuid = job.tenant_id
                         
-                        # Check if we should use archive-and-refresh mode
+                        # Storage mode from config; older jobs may still set use_archive_refresh
                         use_archive_refresh = job.config.get("use_archive_refresh", False)
+                        storage_mode = job.config.get("storage_mode")
                         
                         # Let the client handle the entire fetch and store workflow
-                        result = await client.fetch_and_store_data(session, tenant_uuid, use_archive_refresh)
+                        result = await client.fetch_and_store_data(
+                            session,
+                            tenant_uuid,
+                            use_archive_refresh,
+                            storage_mode=storage_mode
+                        )
                         
-                        if result["success"]:
+                        if result.get("unchanged"):
+                            # Nothing was written, so caches and streams are still current
+                            unchanged = True
+                            self.logger.info("Data collection job found no changes", job_id=job.job_id)
+                        elif result["success"]:
+                            # Invalidate caches keyed on the tenant's data generation
+                            data_generations.bump(tenant_uuid)
+                            try:
+                                if settings.FLEET_CACHE_ENABLED:
+                                    await fleet_cache.rebuild(session, tenant_uuid)
+                            except Exception as e:
+                                # Readers fall back to the database without a snapshot
+                                fleet_cache.invalidate(tenant_uuid)
+                                self.logger.warning("Failed to rebuild fleet snapshot",
+                                                  job_id=job.job_id, error=str(e))
+                            try:
+                                await aircraft_stream.publish(session, tenant_uuid)
+                            except Exception as e:
+                                self.logger.warning("Failed to publish aircraft deltas",
+                                                  job_id=job.job_id, error=str(e))
+                            try:
+                                await incursion_engine.evaluate(session, tenant_uuid)
+                            except Exception as e:
+                                await session.rollback()
+                                self.logger.warning("Failed to evaluate airspace incursions",
+                                                  job_id=job.job_id, error=str(e))
                             self.logger.info(
                                 "Data collection job completed successfully",
                                 job_id=job.job_id,
@@ -205,7 +300,7 @@ class SchedulerService:
                                   job_id=job.job_id)
                 raise Exception("Database not available")
             
-            job.mark_completed(success=True)
+            job.mark_completed(success=True, unchanged=unchanged)
             
         except Exception as e:
             error_msg = f"Job failed: {str(e)}"
@@ -313,6 +408,19 @@ class SchedulerService:
         """List all scheduled jobs"""
         return [job.to_dict() for job in self.jobs.values()]
     
+    def next_run(self, job_id: str) -> Optional[datetime]:
+        """Get a job's next run (naive UTC) if it exists and is enabled"""
+        job = self.jobs.get(job_id)
+        return job.next_run if job and job.enabled else None
+    
+    def next_ingest_run(self) -> Optional[datetime]:
+        """Get the earliest next run (naive UTC) of the enabled data collection jobs"""
+        runs = [
+            job.next_run for job in self.jobs.values()
+            if job.enabled and job.client_class and job.next_run
+        ]
+        return min(runs) if runs else None
+    
     def enable_job(self, job_id: str) -> bool:
         """Enable a job"""
         if job_id in self.jobs:
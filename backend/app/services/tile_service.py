@@ -0,0 +1,165 @@
+"""
+Vector tile service rendering live aircraft as Mapbox Vector Tiles
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.data_generation import data_generations
+
+logger = structlog.get_logger()
+
+AIRCRAFT_LAYER = "aircraft"
+MAX_TILE_ZOOM = 22
+
+# Aircraft positions are stored in EPSG:4326; the envelope test runs in that
+# SRID so idx_aircraft_position is used, then geometries are clipped and
+# quantized to tile space by ST_AsMVTGeom. Rows are selected from the tile
+# envelope grown by the buffer (as a fraction of the extent), so symbols near
+# an edge are drawn in both neighbouring tiles instead of being cut off.
+AIRCRAFT_TILE_SQL = f"""
+WITH bounds AS (
+    SELECT ST_TileEnvelope(CAST(:z AS INTEGER), CAST(:x AS INTEGER), CAST(:y AS INTEGER)) AS geom,
+           ST_TileEnvelope(
+               CAST(:z AS INTEGER), CAST(:x AS INTEGER), CAST(:y AS INTEGER),
+               margin => CAST(:buffer AS DOUBLE PRECISION) / CAST(:extent AS DOUBLE PRECISION)
+           ) AS buffered
+),
+features AS (
+    SELECT ST_AsMVTGeom(
+               ST_Transform(a.position, 3857), bounds.geom,
+               CAST(:extent AS INTEGER), CAST(:buffer AS INTEGER), true
+           ) AS geom,
+           CAST(a.id AS text) AS id,
+           a.hex,
+           a.flight,
+           a.registration,
+           a.aircraft_type_code AS aircraft_type,
+           a.altitude_baro AS altitude,
+           a.ground_speed AS speed,
+           a.track,
+           a.squawk,
+           a.emergency,
+           a.category
+    FROM aircraft a, bounds
+    WHERE a.tenant_id = :tenant_id
+      AND a.position && ST_Transform(bounds.buffered, 4326)
+)
+SELECT ST_AsMVT(features.*, '{AIRCRAFT_LAYER}', CAST(:extent AS INTEGER), 'geom')
+FROM features
+WHERE geom IS NOT NULL
+"""
+
+TileKey = Tuple[str, int, int, int, int]
+
+
+def validate_tile(z: int, x: int, y: int) -> None:
+    """
+    Check that z/x/y addresses an existing tile.
+    
+    Raises:
+        ValueError: If the coordinates are out of range
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"Zoom must be between 0 and {MAX_TILE_ZOOM}")
+    
+    size = 2 ** z
+    if not (0 <= x < size and 0 <= y < size):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside the tile grid")
+
+
+class TileCache:
+    """
+    LRU cache of rendered tiles keyed by (tenant, z, x, y, generation).
+    
+    Storing a tile for a newer generation drops that tenant's tiles from
+    older generations, so an ingest invalidates everything it made stale.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._tiles: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+    
+    def get(self, key: TileKey) -> Optional[bytes]:
+        """Get a cached tile and mark it recently used"""
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+    
+    def put(self, key: TileKey, tile: bytes) -> None:
+        """Store a tile, evicting stale generations and least recently used tiles"""
+        tenant, generation = key[0], key[4]
+        if self._generations.get(tenant, generation) != generation:
+            self.invalidate(tenant, before_generation=generation)
+        self._generations[tenant] = generation
+        
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_entries:
+            self._tiles.popitem(last=False)
+    
+    def invalidate(self, tenant: str, before_generation: Optional[int] = None) -> int:
+        """Drop a tenant's tiles, optionally only those older than a generation"""
+        stale = [
+            key for key in self._tiles
+            if key[0] == tenant and (before_generation is None or key[4] < before_generation)
+        ]
+        for key in stale:
+            del self._tiles[key]
+        return len(stale)
+    
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+# Global tile cache shared by all requests
+tile_cache = TileCache(settings.TILE_CACHE_MAX_ENTRIES)
+
+
+class TileService:
+    """Service for rendering aircraft vector tiles"""
+    
+    def __init__(self, session: AsyncSession, cache: Optional[TileCache] = None):
+        self.session = session
+        self.cache = cache if cache is not None else tile_cache
+    
+    async def get_aircraft_tile(self, tenant_id: UUID, z: int, x: int, y: int) -> Tuple[bytes, int]:
+        """
+        Get the aircraft tile for z/x/y, rendering it on a cache miss.
+        
+        Returns:
+            Tuple of (MVT bytes, data generation the tile was rendered for)
+        """
+        validate_tile(z, x, y)
+        
+        generation = data_generations.get(tenant_id)
+        key = (str(tenant_id), z, x, y, generation)
+        
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile, generation
+        
+        result = await self.session.execute(
+            text(AIRCRAFT_TILE_SQL),
+            {
+                "tenant_id": tenant_id,
+                "z": z,
+                "x": x,
+                "y": y,
+                "extent": settings.TILE_EXTENT,
+                "buffer": settings.TILE_BUFFER
+            }
+        )
+        tile = bytes(result.scalar() or b"")
+        
+        self.cache.put(key, tile)
+        logger.debug("Rendered aircraft tile", z=z, x=x, y=y, generation=generation, size=len(tile))
+        
+        return tile, generation
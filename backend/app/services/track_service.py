@@ -0,0 +1,165 @@
+"""
+Track service for reading historical aircraft positions from aircraft_archive
+"""
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.geometry import douglas_peucker_mask, project_local_metres
+
+logger = structlog.get_logger()
+
+# Reads only columns held in idx_aircraft_archive_track, so PostgreSQL can
+# answer with an index-only scan on (tenant_id, hex, archived_at) and prune
+# to the partitions covering [start, end). Rows are thinned to one per time
+# bucket per aircraft; a bucket of 1 second keeps effectively every row.
+TRACK_SQL = """
+SELECT hex, archived_at, ST_X(position) AS longitude, ST_Y(position) AS latitude,
+       altitude_baro, ground_speed, track
+FROM (
+    SELECT DISTINCT ON (hex, FLOOR(EXTRACT(EPOCH FROM archived_at) / CAST(:bucket_seconds AS INTEGER)))
+           hex, archived_at, position, altitude_baro, ground_speed, track
+    FROM aircraft_archive
+    WHERE tenant_id = :tenant_id
+      AND hex = ANY(:hex_codes)
+      AND archived_at >= :start
+      AND archived_at < :end
+      AND position IS NOT NULL
+    ORDER BY hex, FLOOR(EXTRACT(EPOCH FROM archived_at) / CAST(:bucket_seconds AS INTEGER)), archived_at
+) bucketed
+ORDER BY hex, archived_at
+"""
+
+TRACK_FORMATS = ("linestring", "coordinates")
+
+
+class TrackService:
+    """Service for historical aircraft track queries"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    @staticmethod
+    def bucket_seconds(start: datetime, end: datetime, max_points: int) -> int:
+        """Time bucket size that keeps at most ``max_points`` rows per aircraft"""
+        span = (end - start).total_seconds()
+        return max(1, math.ceil(span / max_points))
+    
+    async def get_tracks(
+        self,
+        tenant_id: UUID,
+        hex_codes: List[str],
+        start: datetime,
+        end: datetime,
+        max_points: int = 2000,
+        tolerance_m: Optional[float] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get ordered track points per aircraft.
+        
+        Args:
+            tenant_id: UUID of the tenant
+            hex_codes: ICAO hex codes to fetch
+            start: Start of the time range (inclusive)
+            end: End of the time range (exclusive)
+            max_points: Upper bound on points per aircraft, enforced by time bucketing in SQL
+            tolerance_m: Optional Douglas-Peucker tolerance in metres applied after bucketing
+        
+        Returns:
+            Dictionary of hex code to list of track points
+        """
+        result = await self.session.execute(
+            text(TRACK_SQL),
+            {
+                "tenant_id": tenant_id,
+                "hex_codes": [hex_code.lower() for hex_code in hex_codes],
+                "start": start,
+                "end": end,
+                "bucket_seconds": self.bucket_seconds(start, end, max_points)
+            }
+        )
+        
+        tracks: Dict[str, List[Dict[str, Any]]] = {}
+        for hex_code, archived_at, longitude, latitude, altitude, speed, heading in result.fetchall():
+            tracks.setdefault(hex_code, []).append({
+                "time": archived_at,
+                "longitude": longitude,
+                "latitude": latitude,
+                "altitude": altitude,
+                "speed": float(speed) if speed is not None else None,
+                "track": float(heading) if heading is not None else None
+            })
+        
+        if tolerance_m:
+            tracks = {hex_code: self.simplify(points, tolerance_m) for hex_code, points in tracks.items()}
+        
+        logger.info("Track query completed",
+                   tenant_id=tenant_id,
+                   aircraft=len(tracks),
+                   points=sum(len(points) for points in tracks.values()))
+        
+        return tracks
+    
+    @staticmethod
+    def simplify(points: List[Dict[str, Any]], tolerance_m: float) -> List[Dict[str, Any]]:
+        """Douglas-Peucker simplification of a track, keeping per-point attributes"""
+        if len(points) < 3:
+            return points
+        
+        projected = project_local_metres([(point["longitude"], point["latitude"]) for point in points])
+        keep = douglas_peucker_mask(projected, tolerance_m)
+        return [point for point, kept in zip(points, keep) if kept]
+    
+    @staticmethod
+    def format_track(hex_code: str, points: List[Dict[str, Any]], track_format: str = "linestring") -> Dict[str, Any]:
+        """
+        Format track points as a GeoJSON LineString feature or compact arrays.
+        
+        The compact form uses parallel arrays: ``t`` (epoch seconds),
+        ``coords`` ([lon, lat]), ``alt``, ``gs`` and ``trk``.
+        """
+        times = [_epoch_seconds(point["time"]) for point in points]
+        coordinates = [[point["longitude"], point["latitude"]] for point in points]
+        altitudes = [point["altitude"] for point in points]
+        speeds = [point["speed"] for point in points]
+        headings = [point["track"] for point in points]
+        
+        if track_format == "coordinates":
+            return {
+                "hex": hex_code,
+                "t": times,
+                "coords": coordinates,
+                "alt": altitudes,
+                "gs": speeds,
+                "trk": headings
+            }
+        
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": coordinates
+            },
+            "properties": {
+                "hex": hex_code,
+                "points": len(points),
+                "start": points[0]["time"].isoformat() if points else None,
+                "end": points[-1]["time"].isoformat() if points else None,
+                "times": times,
+                "altitudes": altitudes,
+                "speeds": speeds,
+                "tracks": headings
+            }
+        }
+
+
+def _epoch_seconds(moment: datetime) -> int:
+    """Convert a datetime to integer epoch seconds (naive values are UTC)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
@@ -0,0 +1,31 @@
+"""
+Batching helpers for bulk data processing
+"""
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most ``size`` items.
+    
+    Args:
+        items: Items to split
+        size: Maximum chunk length (must be positive)
+        
+    Returns:
+        Iterator over consecutive chunks
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be positive")
+    
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
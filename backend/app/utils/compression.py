@@ -0,0 +1,122 @@
+"""
+Content-Encoding negotiation and precompressed response payloads
+"""
+import asyncio
+import gzip
+from typing import Dict, List, Optional
+
+from fastapi.responses import Response
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+
+def available_encodings() -> List[str]:
+    """Content codings this process can produce, most preferred first"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a content coding from an ``Accept-Encoding`` header.
+    
+    Codings are chosen by server preference among those the client accepts
+    with a non-zero q-value; ``*`` accepts any coding not listed explicitly.
+    
+    Returns:
+        The coding to use, or None to send the identity representation
+    """
+    if not accept_encoding:
+        return None
+    
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    
+    for coding in available_encodings():
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    """Compress content with a content coding at the configured level"""
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(content)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class CompressedPayload:
+    """
+    Response body kept alongside its compressed encodings.
+    
+    Each encoding is compressed at most once (off the event loop) and then
+    reused for every client, so payloads shared per data generation cost no
+    compression CPU per request.
+    """
+    
+    __slots__ = ("content", "_encoded")
+    
+    def __init__(self, content: bytes):
+        self.content = content
+        self._encoded: Dict[str, bytes] = {}
+    
+    async def encoded(self, encoding: Optional[str]) -> bytes:
+        """Get the payload in a content coding (None for identity)"""
+        if encoding is None:
+            return self.content
+        
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = await asyncio.to_thread(compress, self.content, encoding)
+            self._encoded[encoding] = body
+        return body
+    
+    async def precompress(self) -> None:
+        """Compress every available encoding ahead of the first request"""
+        for encoding in available_encodings():
+            await self.encoded(encoding)
+    
+    async def response(
+        self,
+        encoding: Optional[str],
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Build a response in a coding chosen by ``negotiate_encoding``"""
+        headers = dict(headers or {})
+        headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=await self.encoded(encoding), media_type=media_type, headers=headers)
@@ -0,0 +1,179 @@
+"""
+Geometry utilities for spatial data processing
+"""
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Approximate metres per degree, used for local equirectangular projection
+METRES_PER_DEGREE_LAT = 110540.0
+METRES_PER_DEGREE_LON = 111320.0
+
+# WGS84 semi-major axis used by spherical Web Mercator (EPSG:3857)
+WEB_MERCATOR_RADIUS = 6378137.0
+
+# Columns of a (min_lon, min_lat, max_lon, max_lat) row tracing a closed
+# rectangle from bottom-left, counter-clockwise
+_RECTANGLE_RING = np.array([0, 1, 2, 1, 2, 3, 0, 3, 0, 1])
+
+
+def project_local_metres(coordinates: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Project (lon, lat) pairs onto a local plane in metres.
+    
+    Uses an equirectangular projection around the mean latitude, which is
+    accurate enough for simplifying a single aircraft track.
+    """
+    points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return points
+    
+    mean_lat = math.radians(float(points[:, 1].mean()))
+    projected = np.empty_like(points)
+    projected[:, 0] = points[:, 0] * METRES_PER_DEGREE_LON * math.cos(mean_lat)
+    projected[:, 1] = points[:, 1] * METRES_PER_DEGREE_LAT
+    return projected
+
+
+def web_mercator_to_lonlat(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse spherical Web Mercator: EPSG:3857 metres to (lon, lat) degrees"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    longitude = np.degrees(x / WEB_MERCATOR_RADIUS)
+    latitude = np.degrees(2.0 * np.arctan(np.exp(y / WEB_MERCATOR_RADIUS)) - math.pi / 2)
+    return np.clip(longitude, -180.0, 180.0), latitude
+
+
+def parse_mbr_array(mbrs: Iterable[Optional[str]]) -> np.ndarray:
+    """
+    Parse ``min_x,min_y,max_x,max_y`` strings into an (N, 4) float array.
+    
+    All well-formed strings are converted in one NumPy call; missing or
+    malformed entries become rows of NaN.
+    """
+    mbrs = list(mbrs)
+    boxes = np.full((len(mbrs), 4), np.nan)
+    valid = [index for index, mbr in enumerate(mbrs) if isinstance(mbr, str) and mbr.count(",") == 3]
+    if not valid:
+        return boxes
+    
+    try:
+        boxes[valid] = np.array(",".join(mbrs[index] for index in valid).split(","), dtype=float).reshape(-1, 4)
+    except ValueError:
+        # A non-numeric value somewhere: fall back to parsing each string
+        for index in valid:
+            try:
+                boxes[index] = [float(part) for part in mbrs[index].split(",")]
+            except ValueError:
+                pass
+    
+    boxes[~np.isfinite(boxes).all(axis=1)] = np.nan
+    return boxes
+
+
+def mbr_rings(mbrs: Iterable[Optional[str]]) -> List[Optional[List[List[float]]]]:
+    """
+    Convert Web Mercator MBR strings to closed WGS84 rectangle rings.
+    
+    Returns:
+        One ``[[lon, lat], ...]`` ring (bottom-left, counter-clockwise) per
+        input, or None where the MBR is missing or malformed
+    """
+    boxes = parse_mbr_array(mbrs)
+    longitudes, latitudes = web_mercator_to_lonlat(boxes[:, [0, 2]], boxes[:, [1, 3]])
+    degrees = np.round(np.column_stack([longitudes[:, 0], latitudes[:, 0], longitudes[:, 1], latitudes[:, 1]]), 6)
+    rings = degrees[:, _RECTANGLE_RING].reshape(-1, 5, 2)
+    
+    valid = np.isfinite(boxes).all(axis=1)
+    return [ring if ok else None for ring, ok in zip(rings.tolist(), valid.tolist())]
+
+
+def douglas_peucker_mask(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker line simplification.
+    
+    Args:
+        points: (N, 2) array of planar coordinates
+        tolerance: Maximum allowed perpendicular distance, in the units of ``points``
+    
+    Returns:
+        Boolean mask of the points to keep (first and last are always kept)
+    """
+    count = len(points)
+    keep = np.zeros(count, dtype=bool)
+    if count == 0:
+        return keep
+    
+    keep[0] = keep[-1] = True
+    if count < 3:
+        return keep
+    
+    # Iterative to avoid recursion limits on long tracks
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        
+        start = points[first]
+        segment = points[last] - start
+        offsets = points[first + 1:last] - start
+        segment_length = math.hypot(segment[0], segment[1])
+        
+        if segment_length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / segment_length
+        
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    
+    return keep
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a ``minLon,minLat,maxLon,maxLat`` bounding box.
+    
+    ``minLon`` may exceed ``maxLon`` for boxes crossing the antimeridian.
+    
+    Raises:
+        ValueError: If the box is malformed or out of range
+    """
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in parts)
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise ValueError("bbox values must be finite numbers")
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        raise ValueError("bbox latitudes must be within [-90, 90]")
+    if min_lat >= max_lat:
+        raise ValueError("bbox minLat must be less than maxLat")
+    if min_lon == max_lon:
+        raise ValueError("bbox minLon must differ from maxLon")
+    
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def grid_cell_degrees(zoom: int, cell_px: int) -> float:
+    """Width in degrees of a ``cell_px`` square on a 256px Web Mercator tile at ``zoom``"""
+    return 360.0 / (256 * 2 ** zoom) * cell_px
+
+
+def point_in_bbox(longitude: float, latitude: float, bbox: Tuple[float, float, float, float]) -> bool:
+    """Check whether a point lies in a bbox (which may cross the antimeridian)"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if not min_lat <= latitude <= max_lat:
+        return False
+    if min_lon > max_lon:
+        return longitude >= min_lon or longitude <= max_lon
+    return min_lon <= longitude <= max_lon
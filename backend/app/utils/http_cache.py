@@ -0,0 +1,85 @@
+"""
+HTTP conditional request helpers (ETag, If-None-Match, Last-Modified)
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional
+
+from fastapi.responses import Response
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    Build an ETag from the values that identify a representation.
+    
+    Use ``weak`` when the bytes sent can vary without the parts changing,
+    e.g. a body the compression middleware may or may not gzip.
+    """
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'{"W/" if weak else ""}"{digest.hexdigest()}"'
+
+
+def content_etag(content: bytes) -> str:
+    """Build a strong ETag from a representation's bytes"""
+    return f'"{hashlib.blake2b(content, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against an ETag.
+    
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    ``W/`` prefix added by a proxy does not defeat revalidation.
+    """
+    if not if_none_match:
+        return False
+    
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((candidate[2:] if candidate.startswith("W/") else candidate) == opaque for candidate in candidates)
+
+
+def http_date(moment: datetime) -> str:
+    """Format a datetime as an IMF-fixdate (naive values are UTC)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Build validator and freshness headers for a cacheable response.
+    
+    Without ``max_age`` clients must revalidate on every use (``no-cache``).
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if max_age is not None and max_age > 0:
+        headers["Cache-Control"] = f"max-age={max_age}, must-revalidate"
+    else:
+        headers["Cache-Control"] = "no-cache"
+    return headers
+
+
+def seconds_until(moment: Optional[datetime], now: Optional[datetime] = None) -> Optional[int]:
+    """Whole seconds from now until ``moment`` (naive values are UTC), or None"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0, int((moment - now).total_seconds()))
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Build an empty 304 response carrying the representation's cache headers"""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,89 @@
+"""
+Incremental decoding of JSON arrays from a byte stream
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, BinaryIO
+
+# Whitespace and separators between array items
+_SEPARATORS = " \t\n\r,"
+
+_decoder = json.JSONDecoder()
+
+# Bytes read per chunk from a spooled body
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def read_chunks(file: BinaryIO, size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a file's remaining bytes in chunks, for decoding a spooled response"""
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], key: str) -> AsyncIterator[Any]:
+    """
+    Yield the items of the array stored under ``key`` in a JSON object, as the bytes arrive.
+    
+    Only the item being decoded is buffered, so memory stays bounded by the
+    largest item rather than the whole document. The key is located by its
+    first occurrence, which suits feeds that put the array first; when it is
+    absent (or not an array) the rest of the document is decoded to surface
+    malformed JSON and nothing is yielded.
+    
+    Raises:
+        json.JSONDecodeError: If the document is malformed or truncated
+    """
+    key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_array = False
+    
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        
+        if not in_array:
+            match = key_pattern.search(buffer)
+            if match is None:
+                continue
+            buffer = buffer[match.end():]
+            in_array = True
+        
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _SEPARATORS:
+                position += 1
+            if position == len(buffer) or buffer[position] == "]":
+                break
+            
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Item continues in the next chunk
+            if end == len(buffer):
+                break  # A bare number may continue in the next chunk
+            
+            yield item
+            position = end
+        
+        buffer = buffer[position:]
+        if buffer.startswith("]"):
+            return
+    
+    buffer += text_decoder.decode(b"", final=True)
+    if not in_array:
+        json.loads(buffer)
+        return
+    
+    # End of stream: whatever remains must be complete items and the closing bracket
+    position = 0
+    while True:
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        item, position = _decoder.raw_decode(buffer, position)
+        yield item
@@ -0,0 +1,34 @@
+"""
+Pagination utilities for keyset (cursor) pagination
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(last_updated: datetime, aircraft_id: UUID) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    payload = json.dumps([last_updated.isoformat(), str(aircraft_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_updated, aircraft_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        moment = datetime.fromisoformat(last_updated)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment, UUID(aircraft_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,225 @@
+"""
+Columnar batches of feed records mapped by a RecordSpec
+"""
+import hashlib
+import math
+import re
+import struct
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.record_spec import FieldSpec, RecordSpec
+from app.utils.validation import safe_numeric_convert
+
+_NUMERIC = (int, float)
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    """1-D object array of the values as given (nested lists stay elements)"""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _is_none(column: np.ndarray) -> np.ndarray:
+    return np.equal(column, None)
+
+
+def _missing(column: np.ndarray) -> np.ndarray:
+    return _is_none(column) if column.dtype == object else np.isnan(column)
+
+
+def _to_int(value: Any, field_name: str) -> Optional[int]:
+    """``int()`` of a value as the compiled spec converts it, None for infinities"""
+    if value.__class__ is float and not math.isfinite(value):
+        return None
+    return safe_numeric_convert(value, int, field_name)
+
+
+def _float_column(column: np.ndarray) -> np.ndarray:
+    """A numeric column as float64 with NaN for missing values"""
+    if column.dtype != object:
+        return column
+    return np.fromiter((math.nan if v is None else v for v in column.tolist()), dtype=np.float64, count=len(column))
+
+
+class RecordBatch:
+    """
+    Records held as one array per field instead of one dict per record.
+    
+    Subclasses set ``spec``. ``from_records`` applies the spec to a list of
+    raw records column by column: float coercion is one array conversion
+    and range checks are array comparisons, so there is no per-record dict.
+    Float fields are float64 arrays with NaN for missing values. Int fields
+    are object arrays of what ``int()`` gives, so values beyond 2**53 stay
+    exact; other fields are object arrays too. Invalid records are dropped,
+    as ``spec.apply`` would.
+    
+    Well-formed values map exactly as ``spec.apply`` maps them; ``records``
+    and ``rows`` convert back to Python values for SQL drivers.
+    """
+    
+    spec: ClassVar[RecordSpec]
+    _field_specs: ClassVar[Dict[str, FieldSpec]]
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "spec" in cls.__dict__:
+            cls._field_specs = {field.name: field for field in cls.spec.fields}
+    
+    def __init__(self, columns: Dict[str, np.ndarray], raw: np.ndarray, total: int):
+        self.columns = columns
+        self.raw = raw
+        self.total = total
+    
+    def __len__(self) -> int:
+        return len(self.raw)
+    
+    @property
+    def rejected(self) -> int:
+        """Records dropped as invalid"""
+        return self.total - len(self)
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Any]) -> "RecordBatch":
+        """Map, coerce and validate raw records into a batch"""
+        spec = cls.spec
+        total = len(records)
+        records = [record for record in records if isinstance(record, dict)]
+        count = len(records)
+        
+        # One compiled pass per record reads every source value; zip turns the rows into columns
+        sources = list(zip(*map(spec.extract, records))) or [()] * len(spec.fields)
+        
+        valid = np.ones(count, dtype=bool)
+        columns: Dict[str, np.ndarray] = {}
+        for field, values in zip(spec.fields, sources):
+            column = cls._convert(field, values)
+            valid &= cls._check(field, column)
+            columns[field.name] = column
+        
+        raw = _object_array(records)
+        if not valid.all():
+            columns = {name: column[valid] for name, column in columns.items()}
+            raw = raw[valid]
+        return cls(columns, raw, total)
+    
+    @staticmethod
+    def _convert(field: FieldSpec, values: Sequence[Any]) -> np.ndarray:
+        if field.literals:
+            literals = field.literals
+            literal_types = {type(literal) for literal in literals}
+            values = [literals[v] if v.__class__ in literal_types and v in literals else v for v in values]
+        
+        if field.coerce is int:
+            # Python ints in an object array: float64 would round values beyond 2**53
+            column = _object_array([v if v.__class__ is int or v is None else _to_int(v, field.name) for v in values])
+            if field.default is not None:
+                column[_is_none(column)] = field.default
+            return column
+        
+        if field.coerce is float:
+            try:
+                column = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                # Unparseable values: convert one by one, missing on failure
+                converted = (safe_numeric_convert(v, float, field.name) for v in values)
+                column = np.fromiter((math.nan if v is None else v for v in converted), dtype=np.float64, count=len(values))
+            if field.default is not None:
+                column[np.isnan(column)] = field.default
+            return column
+        
+        if field.coerce is str:
+            values = [v.strip() if v.__class__ is str else v for v in values]
+        if field.lower:
+            values = [v.lower() if v.__class__ is str else v for v in values]
+        column = _object_array(values)
+        if field.default is not None:
+            column[_is_none(column)] = field.default
+        return column
+    
+    @staticmethod
+    def _check(field: FieldSpec, column: np.ndarray) -> np.ndarray:
+        """Mask of values passing the field's checks"""
+        missing = _missing(column)
+        ok = np.ones(len(column), dtype=bool)
+        if field.pattern is not None:
+            match = re.compile(field.pattern).fullmatch
+            try:
+                ok &= ~_is_none(_object_array(list(map(match, column))))
+            except TypeError:
+                # Missing or non-string values: test one by one
+                ok &= np.fromiter((v.__class__ is str and match(v) is not None for v in column), dtype=bool, count=len(column))
+        if field.choices is not None:
+            choices = field.choices
+            choice_types = {type(choice) for choice in choices}
+            ok &= np.fromiter((v.__class__ in choice_types and v in choices for v in column), dtype=bool, count=len(column))
+        if field.minimum is not None or field.maximum is not None:
+            values = _float_column(column)
+            if field.minimum is not None:
+                ok &= ~(values < field.minimum)
+            if field.maximum is not None:
+                ok &= ~(values > field.maximum)
+        
+        if field.required:
+            return ok & ~missing
+        return ok | missing
+    
+    def values(self, name: str) -> List[Any]:
+        """A column as Python values (None for missing)"""
+        if name == self.spec.raw_field:
+            return self.raw.tolist()
+        
+        column = self.columns[name]
+        if column.dtype == object:
+            return column.tolist()
+        
+        missing = np.isnan(column)
+        if not missing.any():
+            return column.tolist()
+        values = column.astype(object)
+        values[missing] = None
+        return values.tolist()
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """The batch as dicts, as ``spec.apply`` would have returned them"""
+        names = self.spec.names
+        return [dict(zip(names, row)) for row in zip(*(self.values(name) for name in names))]
+    
+    def rows(self, names: Sequence[str], extra: Optional[Dict[str, Sequence[Any]]] = None) -> Iterator[Tuple[Any, ...]]:
+        """Tuples of the named columns (or ``extra`` sequences), e.g. for COPY"""
+        extra = extra or {}
+        return zip(*(extra[name] if name in extra else self.values(name) for name in names))
+    
+    def fingerprints(self, names: Sequence[str]) -> List[str]:
+        """``fingerprint`` of every record over the named fields"""
+        fields = self._field_specs
+        numeric = [name for name in names if fields[name].coerce in _NUMERIC]
+        text = [name for name in names if fields[name].coerce not in _NUMERIC]
+        
+        width = 8 * len(numeric)
+        packed = np.column_stack([_float_column(self.columns[name]) for name in numeric]).astype("<f8").tobytes() if numeric else b""
+        texts = zip(*(
+            ["\x00" if v is None else v if v.__class__ is str else str(v) for v in self.columns[name].tolist()]
+            for name in text
+        )) if text else ((),) * len(self)
+        
+        return [
+            hashlib.blake2b(packed[i * width:(i + 1) * width] + "\x1f".join(values).encode(), digest_size=16).hexdigest()
+            for i, values in enumerate(texts)
+        ]
+    
+    @classmethod
+    def fingerprint(cls, record: Dict[str, Any], names: Sequence[str]) -> str:
+        """
+        Content hash of one mapped record over the named fields.
+        
+        Numeric fields are packed as float64 and the others joined as text,
+        so ``fingerprints`` can compute the same hash for a whole batch.
+        """
+        fields = cls._field_specs
+        numeric = [record.get(name) for name in names if fields[name].coerce in _NUMERIC]
+        text = [record.get(name) for name in names if fields[name].coerce not in _NUMERIC]
+        
+        packed = struct.pack(f"<{len(numeric)}d", *(math.nan if v is None else v for v in numeric))
+        joined = "\x1f".join("\x00" if v is None else v if v.__class__ is str else str(v) for v in text)
+        return hashlib.blake2b(packed + joined.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,178 @@
+"""
+Compiled field-mapping and validation specs for feed records
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.validation import safe_numeric_convert
+
+
+class FieldSpec:
+    """
+    How one output field is read from a source record, coerced and checked.
+    
+    Args:
+        name: Output key
+        source: Source key (default: ``name``)
+        coerce: ``int`` or ``float`` (via ``safe_numeric_convert``), or
+            ``str`` to strip surrounding whitespace
+        lower: Lowercase string values (after stripping)
+        default: Value used when the source is missing or None
+        literals: Source values replaced before coercion (e.g. ``{"ground": 0}``)
+        required: Reject the record when the value is None
+        pattern: Regular expression a string value must fully match
+        choices: Allowed values
+        minimum: Smallest allowed value (after coercion)
+        maximum: Largest allowed value (after coercion)
+        fallback: Read from the spec's fallback record when the record
+            lacks its primary values
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        source: Optional[str] = None,
+        coerce: Optional[type] = None,
+        lower: bool = False,
+        default: Any = None,
+        literals: Optional[Dict[Any, Any]] = None,
+        required: bool = False,
+        pattern: Optional[str] = None,
+        choices: Optional[Sequence[Any]] = None,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+        fallback: bool = False
+    ):
+        if coerce not in (None, int, float, str):
+            raise ValueError(f"Unsupported coercion for {name}: {coerce}")
+        if (minimum is not None or maximum is not None) and coerce not in (int, float):
+            raise ValueError(f"Range checks on {name} need a numeric coercion")
+        self.name = name
+        self.source = source or name
+        self.coerce = coerce
+        self.lower = lower
+        self.default = default
+        self.literals = literals or {}
+        self.required = required
+        self.pattern = pattern
+        self.choices = frozenset(choices) if choices is not None else None
+        self.minimum = minimum
+        self.maximum = maximum
+        self.fallback = fallback
+
+
+class RecordSpec:
+    """
+    A record layout compiled once into a single-pass mapping function.
+    
+    ``apply(record)`` reads every field, coerces and checks it, and returns
+    the mapped dict, or None when the record is invalid. The function is
+    generated from the field list when the spec is built, so each record
+    costs one traversal with no per-field dispatch. ``extract(record)``
+    only reads the source values (fallback applied) into a tuple in field
+    order, for columnar processing.
+    
+    Args:
+        fields: Output fields, in output order
+        fallback: Key of a nested record that fallback fields are read from
+        fallback_when: Source keys whose absence (any of them None) selects the fallback
+        raw_field: Output key that receives the source record itself
+    """
+    
+    def __init__(
+        self,
+        fields: Sequence[FieldSpec],
+        fallback: Optional[str] = None,
+        fallback_when: Sequence[str] = (),
+        raw_field: Optional[str] = None
+    ):
+        self.fields: List[FieldSpec] = list(fields)
+        self.fallback = fallback
+        self.fallback_when = tuple(fallback_when)
+        self.raw_field = raw_field
+        self.names = [field.name for field in self.fields] + ([raw_field] if raw_field else [])
+        self.code = self._generate_apply() + "\n" + self._generate_extract()
+        namespace = self._compile()
+        self.apply: Callable[[Any], Optional[Dict[str, Any]]] = namespace["apply"]
+        self.extract: Callable[[Dict[str, Any]], Tuple[Any, ...]] = namespace["extract"]
+    
+    def _reader(self, field: FieldSpec) -> str:
+        return "pos" if field.fallback and self.fallback else "get"
+    
+    def _prelude(self, name: str) -> List[str]:
+        lines = [f"def {name}(src):", "    get = src.get"]
+        if self.fallback:
+            missing = " or ".join(f"get({key!r}) is None" for key in self.fallback_when) or "True"
+            lines += [
+                "    pos = get",
+                f"    if {missing}:",
+                f"        nested = get({self.fallback!r})",
+                "        if isinstance(nested, dict):",
+                "            pos = nested.get",
+            ]
+        return lines
+    
+    def _generate_extract(self) -> str:
+        values = ", ".join(f"{self._reader(field)}({field.source!r})" for field in self.fields)
+        return "\n".join(self._prelude("extract") + [f"    return ({values},)"]) + "\n"
+    
+    def _generate_apply(self) -> str:
+        lines = self._prelude("apply")
+        lines[1:1] = ["    if not isinstance(src, dict):", "        return None"]
+        
+        for i, field in enumerate(self.fields):
+            value = f"v{i}"
+            lines.append(f"    {value} = {self._reader(field)}({field.source!r})")
+            if field.default is not None:
+                lines += [f"    if {value} is None:", f"        {value} = _default_{i}"]
+            for literal in field.literals:
+                lines += [f"    if {value} == {literal!r}:", f"        {value} = _literals_{i}[{literal!r}]"]
+            
+            if field.coerce is str:
+                lines += [f"    if {value}.__class__ is str:", f"        {value} = {value}.strip()"]
+            elif field.coerce is not None:
+                type_name = field.coerce.__name__
+                lines += [
+                    f"    if {value}.__class__ is not {type_name} and {value} is not None:",
+                    f"        {value} = _convert({value}, {type_name}, {field.name!r})",
+                ]
+            if field.lower:
+                lines += [f"    if {value}.__class__ is str:", f"        {value} = {value}.lower()"]
+            
+            if field.required:
+                lines += [f"    if {value} is None:", "        return None"]
+            checks = []
+            if field.pattern is not None:
+                checks.append(f"({value}.__class__ is not str or _pattern_{i}({value}) is None)")
+            if field.choices is not None:
+                checks.append(f"({value}.__class__ not in _choice_types_{i} or {value} not in _choices_{i})")
+            if field.minimum is not None:
+                checks.append(f"{value} < {field.minimum!r}")
+            if field.maximum is not None:
+                checks.append(f"{value} > {field.maximum!r}")
+            if checks:
+                condition = " or ".join(checks)
+                if not field.required:
+                    condition = f"{value} is not None and ({condition})"
+                lines += [f"    if {condition}:", "        return None"]
+        
+        items = [f"{field.name!r}: v{i}" for i, field in enumerate(self.fields)]
+        if self.raw_field:
+            items.append(f"{self.raw_field!r}: src")
+        lines.append("    return {" + ", ".join(items) + "}")
+        return "\n".join(lines) + "\n"
+    
+    def _compile(self) -> Dict[str, Any]:
+        namespace: Dict[str, Any] = {"_convert": safe_numeric_convert}
+        for i, field in enumerate(self.fields):
+            namespace[f"_default_{i}"] = field.default
+            namespace[f"_literals_{i}"] = field.literals
+            namespace[f"_choices_{i}"] = field.choices
+            namespace[f"_choice_types_{i}"] = frozenset(type(choice) for choice in field.choices or ())
+            if field.pattern is not None:
+                namespace[f"_pattern_{i}"] = re.compile(field.pattern).fullmatch
+        exec(compile(self.code, f"<record spec {', '.join(self.names[:3])}...>", "exec"), namespace)
+        return namespace
+    
+    def __repr__(self) -> str:
+        return f"RecordSpec({self.names})"
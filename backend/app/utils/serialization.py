@@ -0,0 +1,30 @@
+"""
+Fast JSON serialization for API responses
+"""
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes (UUIDs and datetimes are handled natively)"""
+    return orjson.dumps(content, default=_default)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    media_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Build a JSON response from already-shaped content, skipping model validation"""
+    return Response(content=dumps(content), status_code=status_code, media_type=media_type, headers=headers)
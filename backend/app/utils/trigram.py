@@ -0,0 +1,25 @@
+"""
+Trigram similarity matching PostgreSQL's pg_trgm ``similarity()``
+"""
+import re
+from typing import FrozenSet, Optional
+
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def trigrams(value: Optional[str]) -> FrozenSet[str]:
+    """Trigrams of a string as pg_trgm builds them (lowercased, words padded)"""
+    result = set()
+    for word in _WORD_PATTERN.findall((value or "").lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+def similarity(left: Optional[str], right: Optional[str]) -> float:
+    """Share of trigrams two strings have in common (0 to 1)"""
+    left_trigrams, right_trigrams = trigrams(left), trigrams(right)
+    union = len(left_trigrams | right_trigrams)
+    if not union:
+        return 0.0
+    return len(left_trigrams & right_trigrams) / union
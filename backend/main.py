@@ -11,6 +11,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.middleware import CompressionMiddleware
+from app.clients.http_client import http_clients
 from app.api.router import api_router
 
 
@@ -52,6 +54,9 @@ async def lifespan(app: FastAPI):
     # Stop the scheduler service
     await scheduler.stop()
     logger.info("Scheduler service stopped")
+    
+    # Close pooled upstream connections once no collector can use them
+    await http_clients.close()
     logger.info("Shutting down SkyTrace API")
 
 
@@ -94,6 +99,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gzip for dynamic responses; snapshot payloads arrive precompressed
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    compresslevel=settings.COMPRESSION_DYNAMIC_GZIP_LEVEL,
+)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -1,6 +1,7 @@
 -- Enable PostGIS extension
 CREATE EXTENSION IF NOT EXISTS postgis;
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Create enum types
 CREATE TYPE aircraft_type AS ENUM ('adsb_icao', 'mode_s', 'tisb', 'mlat');
@@ -99,6 +100,7 @@ CREATE TABLE IF NOT EXISTS aircraft (
     
     -- Raw data
     raw_data JSONB,
+    content_hash VARCHAR(32), -- Fingerprint of the aircraft's state, used for incremental refresh
     
     last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -106,9 +108,11 @@ CREATE TABLE IF NOT EXISTS aircraft (
     UNIQUE(tenant_id, hex)
 );
 
--- Create aircraft archive table (same structure but with additional fields)
+-- Create aircraft archive table (same structure but with additional fields).
+-- Range partitioned on archived_at; partitions are created ahead of time and
+-- expired by the archive partition maintenance job (ArchivePartitionService).
 CREATE TABLE IF NOT EXISTS aircraft_archive (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     original_aircraft_id UUID NOT NULL, -- Reference to original aircraft record
     tenant_id UUID REFERENCES tenants(id) ON DELETE CASCADE,
     hex VARCHAR(6) NOT NULL, -- ICAO 24-bit address
@@ -153,25 +157,93 @@ CREATE TABLE IF NOT EXISTS aircraft_archive (
     raw_data JSONB,
     
     -- Archive-specific fields
-    archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     original_created_at TIMESTAMP WITH TIME ZONE,
     original_last_updated TIMESTAMP WITH TIME ZONE,
-    archive_reason VARCHAR(50) DEFAULT 'scheduled_refresh' -- Why this was archived
-);
+    archive_reason VARCHAR(50) DEFAULT 'scheduled_refresh', -- Why this was archived
+    
+    PRIMARY KEY (id, archived_at)
+) PARTITION BY RANGE (archived_at);
+
+-- Catch-all partition so archiving never fails before maintenance has created
+-- the partition for the current period
+CREATE TABLE IF NOT EXISTS aircraft_archive_default PARTITION OF aircraft_archive DEFAULT;
 
 -- Create indexes
 CREATE INDEX idx_aircraft_position ON aircraft USING GIST (position);
 CREATE INDEX idx_aircraft_hex ON aircraft (hex);
 CREATE INDEX idx_aircraft_tenant ON aircraft (tenant_id);
 CREATE INDEX idx_aircraft_last_updated ON aircraft (last_updated);
+-- Keyset pagination of GET /aircraft on (last_updated, id) per tenant
+CREATE INDEX idx_aircraft_tenant_last_updated_id ON aircraft (tenant_id, last_updated DESC, id DESC);
 CREATE INDEX idx_aircraft_flight ON aircraft (flight) WHERE flight IS NOT NULL;
+-- Aircraft search: exact/prefix hex lookups and trigram substring matching
+CREATE INDEX idx_aircraft_hex_prefix ON aircraft (tenant_id, lower(hex) text_pattern_ops);
+CREATE INDEX idx_aircraft_hex_trgm ON aircraft USING GIN (hex gin_trgm_ops);
+CREATE INDEX idx_aircraft_flight_trgm ON aircraft USING GIN (flight gin_trgm_ops);
+CREATE INDEX idx_aircraft_registration_trgm ON aircraft USING GIN (registration gin_trgm_ops);
+CREATE INDEX idx_aircraft_type_code_trgm ON aircraft USING GIN (aircraft_type_code gin_trgm_ops);
 
--- Archive table indexes
+-- Archive table indexes (created on every partition)
 CREATE INDEX idx_aircraft_archive_original_id ON aircraft_archive (original_aircraft_id);
 CREATE INDEX idx_aircraft_archive_tenant ON aircraft_archive (tenant_id);
 CREATE INDEX idx_aircraft_archive_hex ON aircraft_archive (hex);
 CREATE INDEX idx_aircraft_archive_archived_at ON aircraft_archive (archived_at);
 CREATE INDEX idx_aircraft_archive_position ON aircraft_archive USING GIST (position);
+-- Covering index for track queries: index-only scans per (tenant, hex, time range)
+CREATE INDEX idx_aircraft_archive_track ON aircraft_archive (tenant_id, hex, archived_at)
+    INCLUDE (position, altitude_baro, ground_speed, track);
+
+-- Create airspace table: FAA special use airspace schedules, one row per
+-- activation (gid, valid_from). Replaced from the feed by the airspace refresh job.
+CREATE TABLE IF NOT EXISTS airspace (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    gid INTEGER NOT NULL, -- FAA schedule record id
+    airspace_name VARCHAR(255),
+    type VARCHAR(10), -- R, A, M, W, P, T
+    type_class VARCHAR(20),
+    center_id VARCHAR(10),
+    state VARCHAR(10),
+    valid_from TIMESTAMP WITH TIME ZONE, -- NULL bounds are open-ended
+    valid_to TIMESTAMP WITH TIME ZONE,
+    validity TSTZRANGE GENERATED ALWAYS AS (tstzrange(valid_from, valid_to, '[)')) STORED,
+    min_alt_ft INTEGER NOT NULL DEFAULT 0,
+    max_alt_ft INTEGER NOT NULL DEFAULT 0,
+    agl BOOLEAN NOT NULL DEFAULT FALSE, -- min_alt_ft is above ground level
+    geometry GEOMETRY(POLYGON, 4326) NOT NULL,
+    properties JSONB, -- GeoJSON feature properties as served to clients
+    fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_airspace_gid_valid_from UNIQUE NULLS NOT DISTINCT (gid, valid_from)
+);
+
+-- Airspace filters: bbox (GIST), active-at-time (range containment) and altitude band
+CREATE INDEX idx_airspace_geometry ON airspace USING GIST (geometry);
+CREATE INDEX idx_airspace_validity ON airspace USING GIST (validity);
+CREATE INDEX idx_airspace_altitude ON airspace (min_alt_ft, max_alt_ft);
+
+-- Create airspace incursions table: an aircraft's stay inside one active
+-- airspace, written by the intersection engine after each ingest. Open
+-- incursions have ended_at NULL and are unique per (tenant, hex, airspace).
+CREATE TABLE IF NOT EXISTS airspace_incursions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    aircraft_id UUID,
+    hex VARCHAR(6) NOT NULL,
+    flight VARCHAR(20),
+    airspace_gid INTEGER NOT NULL, -- FAA schedule record id
+    airspace_name VARCHAR(255),
+    airspace_type VARCHAR(10),
+    position GEOMETRY(POINT, 4326), -- latest position seen inside the airspace
+    altitude INTEGER,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_seen_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    ended_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE UNIQUE INDEX uq_airspace_incursions_open ON airspace_incursions (tenant_id, hex, airspace_gid) WHERE ended_at IS NULL;
+CREATE INDEX idx_airspace_incursions_tenant_started ON airspace_incursions (tenant_id, started_at DESC);
+CREATE INDEX idx_airspace_incursions_tenant_hex ON airspace_incursions (tenant_id, hex, started_at DESC);
+CREATE INDEX idx_airspace_incursions_position ON airspace_incursions USING GIST (position);
 
 -- Create layers table for map layers
 CREATE TABLE IF NOT EXISTS map_layers (
@@ -0,0 +1,593 @@
+"""
+Unit tests for the aircraft service
+"""
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.services.aircraft_service import (
+    AIRCRAFT_FEED_SPEC,
+    FINGERPRINT_COLUMNS,
+    STAGING_COLUMNS,
+    AircraftBatch,
+    AircraftService,
+    build_geojson_sql,
+    escape_like,
+    resolve_response_fields,
+    response_columns,
+)
+from app.utils.batching import chunked
+from app.utils.geometry import grid_cell_degrees, parse_bbox
+from app.utils.record_spec import FieldSpec, RecordSpec
+from app.utils.serialization import dumps
+
+
+@pytest.fixture
+def aircraft_service():
+    """Aircraft service with a mocked session"""
+    session = MagicMock()
+    session.commit = AsyncMock()
+    return AircraftService(session)
+
+
+class TestChunked:
+    """Test the chunking helper"""
+    
+    def test_chunked_splits_evenly(self):
+        """Test chunking a list into equal parts"""
+        assert list(chunked([1, 2, 3, 4], 2)) == [[1, 2], [3, 4]]
+    
+    def test_chunked_keeps_remainder(self):
+        """Test that the last partial chunk is returned"""
+        assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    
+    def test_chunked_rejects_invalid_size(self):
+        """Test that a non-positive chunk size raises"""
+        with pytest.raises(ValueError):
+            list(chunked([1], 0))
+
+
+class TestFeedSpec:
+    """Test the compiled feed record mapping"""
+    
+    def test_maps_coerces_and_validates(self, sample_aircraft_bulk_data):
+        """Test that feed keys become columns with numeric coercion"""
+        record = dict(sample_aircraft_bulk_data[0], flight=" TEST123 ", gs="250.5", alt_baro="ground", nic="8")
+        
+        mapped = AIRCRAFT_FEED_SPEC.apply(record)
+        
+        assert mapped["registration"] == "N123AB"
+        assert mapped["flight"] == "TEST123"
+        assert (mapped["ground_speed"], mapped["altitude_baro"], mapped["nic"]) == (250.5, 0, 8)
+        assert mapped["raw_data"] is record
+        assert list(mapped) == [field.name for field in AIRCRAFT_FEED_SPEC.fields] + ["raw_data"]
+    
+    @pytest.mark.parametrize("changes", [
+        {"hex": None},
+        {"hex": "ae14"},
+        {"hex": "zzzzzz"},
+        {"type": "adsr_icao"},
+        {"type": ["adsb_icao"]},
+        {"lat": 91.0},
+        {"alt_baro": 70000},
+    ])
+    def test_rejects_invalid_records(self, sample_aircraft_bulk_data, changes):
+        """Test that records failing a check map to None"""
+        assert AIRCRAFT_FEED_SPEC.apply(dict(sample_aircraft_bulk_data[0], **changes)) is None
+        assert AIRCRAFT_FEED_SPEC.apply("ae1460") is None
+    
+    def test_hex_is_lowercased(self, sample_aircraft_bulk_data):
+        """Test that hex is stored lowercase whatever case the feed sends"""
+        mapped = AIRCRAFT_FEED_SPEC.apply(dict(sample_aircraft_bulk_data[0], hex="AE146F"))
+        
+        assert mapped["hex"] == "ae146f"
+    
+    def test_last_position_fallback(self):
+        """Test that position, nic and seen_pos come from lastPosition together"""
+        mapped = AIRCRAFT_FEED_SPEC.apply({
+            "hex": "ae1460", "nic": 8, "seen_pos": 1.0,
+            "lastPosition": {"lat": 51.5, "lon": -0.12, "nic": 6, "seen_pos": 40.0}
+        })
+        
+        assert mapped["type"] == "adsb_icao"
+        assert (mapped["latitude"], mapped["longitude"], mapped["nic"], mapped["seen_pos"]) == (51.5, -0.12, 6, 40.0)
+    
+    def test_range_requires_numeric_coercion(self):
+        """Test that specs cannot compare uncoerced values"""
+        with pytest.raises(ValueError):
+            RecordSpec([FieldSpec("lat", minimum=-90)])
+    
+    @pytest.mark.asyncio
+    async def test_mapped_records_are_not_remapped(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that collector output is stored as mapped"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True, True])
+        mapped = [AIRCRAFT_FEED_SPEC.apply(data) for data in sample_aircraft_bulk_data]
+        
+        result = await aircraft_service.process_bulk_aircraft_data(uuid4(), mapped, mapped=True)
+        
+        rows = aircraft_service._upsert_chunk.await_args.args[0]
+        assert [row["registration"] for row in rows] == ["N123AB", "N456CD"]
+        assert all(row["position"] is not None for row in rows)
+        assert result["errors"] == 0
+
+
+class TestAircraftBatch:
+    """Test the columnar feed batch"""
+    
+    @pytest.fixture
+    def feed(self, sample_aircraft_bulk_data):
+        """Feed records covering coercion, literals, fallback and invalid records"""
+        first, second = sample_aircraft_bulk_data
+        return [
+            dict(first, flight=" TEST123 ", gs="250.5", nic=8, messages=12, alt_geom=10100.7),
+            dict(second, alt_baro="ground", dbFlags=True),
+            {"hex": "AE1462", "lastPosition": {"lat": 51.5, "lon": -0.12, "nic": 6, "seen_pos": 40.0}},
+            {"hex": "ae1463", "type": "adsb_icao", "gs": "fast", "r": 12345},
+            {"hex": "zzzzzz", "type": "adsb_icao"},
+            {"hex": "ae1464", "type": "adsb_icao", "lat": 91.0, "lon": 0.0},
+            {"hex": "ae1465", "type": "adsr_icao"},
+            {"type": "adsb_icao"},
+            "ae1466",
+        ]
+    
+    def test_matches_record_spec(self, feed):
+        """Test that the batch maps records exactly as the compiled spec does"""
+        batch = AircraftBatch.from_records(feed)
+        
+        assert batch.records() == [record for record in map(AIRCRAFT_FEED_SPEC.apply, feed) if record is not None]
+        assert (len(batch), batch.rejected) == (4, 5)
+        assert batch.values("hex")[2] == "ae1462"
+    
+    def test_fractional_int_fields_match_record_spec(self, sample_aircraft_bulk_data):
+        """Test that non-integral int fields convert as int() does in the compiled spec"""
+        feed = [
+            dict(record, alt_geom=alt_geom, nic=nic, messages=messages)
+            for record, (alt_geom, nic, messages) in zip(
+                sample_aircraft_bulk_data * 2,
+                [(10100.7, "7", -3.5), ("10100.7", 7.9, " 12 "), ("1e3", "8.0", 2 ** 53 + 1), (-10100.7, None, "")]
+            )
+        ]
+        
+        batch = AircraftBatch.from_records(feed)
+        
+        assert batch.records() == [AIRCRAFT_FEED_SPEC.apply(record) for record in feed]
+        assert batch.values("altitude_geom") == [10100, None, None, -10100]
+        assert batch.values("messages")[2] == 9007199254740993
+    
+    def test_column_types(self, feed):
+        """Test that numeric fields are arrays and converted back to Python numbers"""
+        batch = AircraftBatch.from_records(feed)
+        
+        assert batch.columns["ground_speed"].dtype == np.float64
+        assert batch.values("altitude_baro") == [10000, 0, None, None]
+        assert all(type(value) is int for value in batch.values("altitude_baro")[:2])
+        assert batch.values("ground_speed") == [250.5, 300.2, None, None]
+    
+    def test_fingerprints_match_rows(self, feed):
+        """Test that batch and per-record fingerprints agree"""
+        batch = AircraftBatch.from_records(feed)
+        
+        assert batch.fingerprints(FINGERPRINT_COLUMNS) == [
+            AircraftBatch.fingerprint(record, FINGERPRINT_COLUMNS) for record in batch.records()
+        ]
+    
+    def test_staging_records_match_dict_path(self, aircraft_service, feed):
+        """Test that COPY records from a batch equal those built record by record"""
+        by_batch, batch_errors = aircraft_service._prepare_staging_records(AircraftBatch.from_records(feed))
+        by_record, _ = aircraft_service._prepare_staging_records(feed)
+        
+        assert by_batch == by_record
+        assert batch_errors == 0
+    
+    def test_empty(self):
+        """Test a batch without records"""
+        batch = AircraftBatch.from_records([])
+        
+        assert len(batch) == 0
+        assert batch.records() == []
+        assert batch.fingerprints(FINGERPRINT_COLUMNS) == []
+    
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_from_batch(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that a batch feeds the set-based upsert"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True, True])
+        
+        result = await aircraft_service.process_bulk_aircraft_data(
+            uuid4(), AircraftBatch.from_records(sample_aircraft_bulk_data)
+        )
+        
+        rows = aircraft_service._upsert_chunk.await_args.args[0]
+        assert [row["hex"] for row in rows] == ["ae1460", "ae1461"]
+        assert result == {"created": 2, "updated": 0, "errors": 0}
+
+
+class TestBulkUpsert:
+    """Test the set-based bulk upsert path"""
+    
+    def test_prepare_row_maps_feed_fields(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that feed keys are mapped onto table columns"""
+        tenant_id = uuid4()
+        row = aircraft_service._prepare_aircraft_row(tenant_id, sample_aircraft_bulk_data[0])
+        
+        assert row["tenant_id"] == tenant_id
+        assert row["registration"] == "N123AB"
+        assert row["aircraft_type_code"] == "B738"
+        assert row["altitude_baro"] == 10000
+        assert row["position"] is not None
+    
+    def test_prepare_row_always_has_position_column(self, aircraft_service):
+        """Test that rows without coordinates still carry a position key"""
+        row = aircraft_service._prepare_aircraft_row(uuid4(), {"hex": "ae1460", "type": "adsb_icao"})
+        assert "position" in row
+        assert row["position"] is None
+    
+    def test_upsert_statement_uses_on_conflict(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that the upsert compiles to a single ON CONFLICT statement"""
+        tenant_id = uuid4()
+        rows = [aircraft_service._prepare_aircraft_row(tenant_id, data) for data in sample_aircraft_bulk_data]
+        sql = str(aircraft_service._build_upsert_statement(rows).compile(dialect=postgresql.dialect()))
+        
+        assert "ON CONFLICT (tenant_id, hex) DO UPDATE" in sql
+        assert "RETURNING (xmax = 0)" in sql
+        assert "hex = excluded.hex" not in sql
+    
+    def test_upsert_keeps_position_when_missing(self, aircraft_service):
+        """Test that a record without coordinates does not clear the stored position"""
+        rows = [aircraft_service._prepare_aircraft_row(uuid4(), {"hex": "ae1460", "type": "adsb_icao"})]
+        sql = str(aircraft_service._build_upsert_statement(rows).compile(dialect=postgresql.dialect()))
+        
+        assert "position = coalesce(excluded.position, aircraft.position)" in sql
+    
+    @pytest.mark.asyncio
+    async def test_bulk_dedupes_hexes_before_counting(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that a hex repeated in one batch is written once and not counted as updated"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True, True])
+        
+        result = await aircraft_service.process_bulk_aircraft_data(
+            uuid4(), sample_aircraft_bulk_data + [sample_aircraft_bulk_data[0]]
+        )
+        
+        assert len(aircraft_service._upsert_chunk.await_args.args[0]) == 2
+        assert result == {"created": 2, "updated": 0, "errors": 0}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_dedupes_hexes_across_case(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that the same address in upper and lower case is one aircraft"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True, True])
+        upper = dict(sample_aircraft_bulk_data[0], hex=sample_aircraft_bulk_data[0]["hex"].upper())
+        
+        await aircraft_service.process_bulk_aircraft_data(uuid4(), sample_aircraft_bulk_data + [upper])
+        
+        rows = aircraft_service._upsert_chunk.await_args.args[0]
+        assert sorted(row["hex"] for row in rows) == sorted(data["hex"] for data in sample_aircraft_bulk_data)
+    
+    @pytest.mark.asyncio
+    async def test_bulk_counts_created_and_updated(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that created/updated stats come from the upsert result"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True, False])
+        
+        result = await aircraft_service.process_bulk_aircraft_data(uuid4(), sample_aircraft_bulk_data)
+        
+        assert result == {"created": 1, "updated": 1, "errors": 0}
+        aircraft_service._upsert_chunk.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_bulk_respects_chunk_size(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that rows are written in chunks of the requested size"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[True])
+        
+        result = await aircraft_service.process_bulk_aircraft_data(
+            uuid4(), sample_aircraft_bulk_data, chunk_size=1
+        )
+        
+        assert aircraft_service._upsert_chunk.await_count == 2
+        assert result["created"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_bulk_isolates_failing_rows(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that a failing chunk is retried row by row"""
+        async def upsert_chunk(rows):
+            if any(row["hex"] == "ae1461" for row in rows):
+                raise ValueError("bad row")
+            return [True] * len(rows)
+        
+        aircraft_service._upsert_chunk = upsert_chunk
+        
+        result = await aircraft_service.process_bulk_aircraft_data(uuid4(), sample_aircraft_bulk_data)
+        
+        assert result == {"created": 1, "updated": 0, "errors": 1}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_skips_records_without_hex(self, aircraft_service):
+        """Test that records without a hex code are counted as errors"""
+        aircraft_service._upsert_chunk = AsyncMock(return_value=[])
+        
+        result = await aircraft_service.process_bulk_aircraft_data(uuid4(), [{"type": "adsb_icao"}])
+        
+        assert result == {"created": 0, "updated": 0, "errors": 1}
+        aircraft_service._upsert_chunk.assert_not_called()
+
+
+class TestArchiveAndRefresh:
+    """Test the COPY-based archive and refresh path"""
+    
+    def test_staging_record_matches_columns(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that staging records line up with the staging table columns"""
+        record = aircraft_service._prepare_staging_record(sample_aircraft_bulk_data[0])
+        values = dict(zip(STAGING_COLUMNS, record))
+        
+        assert len(record) == len(STAGING_COLUMNS)
+        assert values["hex"] == "ae1460"
+        assert values["latitude"] == 37.7749
+        assert values["longitude"] == -122.4194
+        assert json.loads(values["raw_data"])["hex"] == "ae1460"
+    
+    def test_staging_record_uses_last_position(self, aircraft_service):
+        """Test that lastPosition is used when there is no live position"""
+        record = aircraft_service._prepare_staging_record({
+            "hex": "ae1460",
+            "type": "adsb_icao",
+            "lastPosition": {"lat": 51.5, "lon": -0.12}
+        })
+        values = dict(zip(STAGING_COLUMNS, record))
+        
+        assert values["latitude"] == 51.5
+        assert values["longitude"] == -0.12
+    
+    @pytest.mark.asyncio
+    async def test_refresh_runs_server_side(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that the refresh is COPY + two set-based statements"""
+        archive_result = MagicMock(rowcount=3)
+        swap_result = MagicMock()
+        swap_result.one.return_value = (2, 1)
+        aircraft_service.session.execute = AsyncMock(side_effect=[MagicMock(), archive_result, swap_result])
+        aircraft_service._copy_to_staging = AsyncMock()
+        
+        result = await aircraft_service.archive_and_refresh_aircraft_data(
+            uuid4(), sample_aircraft_bulk_data + [{"type": "adsb_icao"}]
+        )
+        
+        assert result == {"archived": 3, "created": 2, "errors": 1}
+        assert aircraft_service.session.execute.await_count == 3
+        copied = list(aircraft_service._copy_to_staging.await_args.args[0])
+        assert [record[0] for record in copied] == ["ae1460", "ae1461"]
+        aircraft_service.session.commit.assert_awaited_once()
+
+
+class TestIncrementalRefresh:
+    """Test the fingerprint-based incremental refresh"""
+    
+    def test_fingerprint_ignores_signal_counters(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that message/seen/rssi updates do not change the fingerprint"""
+        record = dict(sample_aircraft_bulk_data[0], messages=100, seen=1.0, rssi=-20.0)
+        later = dict(record, messages=250, seen=4.5, rssi=-22.5)
+        
+        first = dict(zip(STAGING_COLUMNS, aircraft_service._prepare_staging_record(record)))
+        second = dict(zip(STAGING_COLUMNS, aircraft_service._prepare_staging_record(later)))
+        
+        assert first["content_hash"] == second["content_hash"]
+    
+    def test_fingerprint_changes_when_aircraft_moves(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that a position change changes the fingerprint"""
+        record = sample_aircraft_bulk_data[0]
+        moved = dict(record, lat=record["lat"] + 0.1)
+        
+        first = dict(zip(STAGING_COLUMNS, aircraft_service._prepare_staging_record(record)))
+        second = dict(zip(STAGING_COLUMNS, aircraft_service._prepare_staging_record(moved)))
+        
+        assert first["content_hash"] != second["content_hash"]
+    
+    def test_upsert_and_staging_fingerprints_agree(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that every storage mode writes the same fingerprint"""
+        record = sample_aircraft_bulk_data[0]
+        row = aircraft_service._prepare_aircraft_row(uuid4(), record)
+        staged = dict(zip(STAGING_COLUMNS, aircraft_service._prepare_staging_record(record)))
+        
+        assert row["content_hash"] == staged["content_hash"]
+    
+    @pytest.mark.asyncio
+    async def test_incremental_reports_diff_counts(self, aircraft_service, sample_aircraft_bulk_data):
+        """Test that inserted/changed/unchanged/departed counts are reported"""
+        archive_result = MagicMock(rowcount=1)
+        refresh_result = MagicMock()
+        refresh_result.one.return_value = (1, 0, 1, 2)
+        aircraft_service.session.execute = AsyncMock(side_effect=[MagicMock(), archive_result, refresh_result])
+        aircraft_service._copy_to_staging = AsyncMock()
+        
+        result = await aircraft_service.incremental_refresh_aircraft_data(uuid4(), sample_aircraft_bulk_data)
+        
+        assert result == {
+            "inserted": 1,
+            "changed": 0,
+            "unchanged": 1,
+            "departed": 1,
+            "archived": 1,
+            "errors": 0
+        }
+
+
+class TestGeoJSON:
+    """Test SQL-rendered GeoJSON output"""
+    
+    FEATURES = [
+        '{"type":"Feature","geometry":{"type":"Point","coordinates":[-0.4543,51.47]},"properties":{"hex":"abc123"}}',
+        '{"type":"Feature","geometry":{"type":"Point","coordinates":[2.55,49.0097]},"properties":{"hex":"def456"}}',
+        '{"type":"Feature","geometry":{"type":"Point","coordinates":[13.29,52.55]},"properties":{"hex":"789abc"}}',
+    ]
+    
+    @staticmethod
+    def stream_result(batches):
+        """Build a streamed result yielding the given row batches"""
+        async def partitions():
+            for batch in batches:
+                yield [(feature,) for feature in batch]
+        
+        result = MagicMock()
+        result.partitions = partitions
+        return result
+    
+    @pytest.mark.asyncio
+    async def test_stream_produces_valid_collection(self, aircraft_service):
+        """Test that streamed chunks join into one FeatureCollection"""
+        batches = [self.FEATURES[:2], self.FEATURES[2:]]
+        aircraft_service.session.stream = AsyncMock(return_value=self.stream_result(batches))
+        
+        chunks = [chunk async for chunk in aircraft_service.stream_aircraft_geojson(uuid4(), batch_size=2)]
+        collection = json.loads("".join(chunks))
+        
+        assert collection["type"] == "FeatureCollection"
+        assert [f["properties"]["hex"] for f in collection["features"]] == ["abc123", "def456", "789abc"]
+        assert collection["features"][0]["geometry"]["coordinates"] == [-0.4543, 51.47]
+        assert aircraft_service.session.stream.call_args.kwargs["execution_options"] == {"yield_per": 2}
+    
+    @pytest.mark.asyncio
+    async def test_stream_empty_fleet(self, aircraft_service):
+        """Test that an empty tenant streams an empty collection"""
+        aircraft_service.session.stream = AsyncMock(return_value=self.stream_result([]))
+        
+        chunks = [chunk async for chunk in aircraft_service.stream_aircraft_geojson(uuid4())]
+        
+        assert json.loads("".join(chunks)) == {"type": "FeatureCollection", "features": []}
+    
+    @pytest.mark.asyncio
+    async def test_get_aircraft_geojson(self, aircraft_service):
+        """Test the non-streaming variant parses SQL-rendered features"""
+        result = MagicMock()
+        result.fetchall.return_value = [(feature,) for feature in self.FEATURES]
+        aircraft_service.session.execute = AsyncMock(return_value=result)
+        
+        geojson = await aircraft_service.get_aircraft_geojson(uuid4())
+        
+        assert len(geojson["features"]) == 3
+        assert geojson["features"][1]["geometry"]["coordinates"] == [2.55, 49.0097]
+
+
+class TestViewport:
+    """Test bounding-box and zoom-aware GeoJSON queries"""
+    
+    def test_parse_bbox(self):
+        """Test parsing a valid viewport"""
+        assert parse_bbox("-5.5,49.9,2.1,55.8") == (-5.5, 49.9, 2.1, 55.8)
+    
+    @pytest.mark.parametrize("value", ["1,2,3", "a,b,c,d", "0,10,5,5", "0,0,0,10", "-200,0,10,10", "0,-91,10,10"])
+    def test_parse_bbox_rejects_invalid(self, value):
+        """Test that malformed or out-of-range boxes raise"""
+        with pytest.raises(ValueError):
+            parse_bbox(value)
+    
+    def test_grid_cell_degrees(self):
+        """Test that cells shrink by half per zoom level"""
+        assert grid_cell_degrees(0, 256) == 360.0
+        assert grid_cell_degrees(3, 32) == pytest.approx(grid_cell_degrees(2, 32) / 2)
+    
+    def test_bbox_query_uses_envelope(self):
+        """Test that a viewport adds an index-backed envelope filter"""
+        sql = build_geojson_sql((-5.5, 49.9, 2.1, 55.8))
+        
+        assert "position && ST_MakeEnvelope" in sql
+        assert "OR position" not in sql
+        assert "point_count" not in sql
+    
+    def test_antimeridian_bbox_is_split(self):
+        """Test that a box crossing 180 degrees uses two envelopes"""
+        sql = build_geojson_sql((170.0, -10.0, -170.0, 10.0))
+        
+        assert sql.count("ST_MakeEnvelope") == 2
+    
+    def test_low_zoom_clusters(self, aircraft_service):
+        """Test that low zooms thin to one aircraft per grid cell"""
+        sql, params = aircraft_service._geojson_query(uuid4(), None, 3)
+        
+        assert "DISTINCT ON (cell_x, cell_y)" in sql
+        assert "'point_count', point_count" in sql
+        assert "raw_data" not in sql
+        assert params["cell_degrees"] == grid_cell_degrees(3, 32)
+    
+    def test_high_zoom_returns_every_aircraft(self, aircraft_service):
+        """Test that zooms above the cluster threshold are not thinned"""
+        sql, params = aircraft_service._geojson_query(uuid4(), (0.0, 50.0, 1.0, 51.0), 12)
+        
+        assert "DISTINCT ON" not in sql
+        assert params["min_lon"] == 0.0 and params["max_lat"] == 51.0
+
+
+class TestResponseProjection:
+    """Test fields= projection and lean serialization"""
+    
+    def test_default_fields_exclude_raw_data(self):
+        """Test that raw_data is opt-in"""
+        fields = resolve_response_fields()
+        
+        assert "raw_data" not in fields
+        assert fields[:3] == ["id", "created_at", "updated_at"]
+        assert resolve_response_fields(include_raw=True)[-1] == "raw_data"
+    
+    def test_projection(self):
+        """Test an explicit projection keeps order and drops duplicates"""
+        assert resolve_response_fields("hex, latitude,longitude,hex") == ["hex", "latitude", "longitude"]
+    
+    def test_unknown_field(self):
+        """Test that unknown fields raise"""
+        with pytest.raises(ValueError, match="position"):
+            resolve_response_fields("hex,position")
+    
+    def test_numeric_columns_are_floats(self):
+        """Test that numeric columns are cast in SQL and coordinates fall back to raw_data"""
+        query = select(*response_columns(["ground_speed", "latitude"]))
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        
+        assert "CAST(aircraft.ground_speed AS FLOAT)" in sql
+        assert "ST_Y(aircraft.position)" in sql
+        assert "jsonb_typeof" in sql
+        assert "raw_data #>>" in sql
+    
+    def test_dumps_handles_database_types(self):
+        """Test serializing UUIDs, datetimes and decimals"""
+        aircraft_id = uuid4()
+        payload = dumps({
+            "id": aircraft_id,
+            "updated_at": datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc),
+            "ground_speed": Decimal("451.25")
+        })
+        
+        assert json.loads(payload) == {
+            "id": str(aircraft_id),
+            "updated_at": "2026-10-16T12:00:00+00:00",
+            "ground_speed": 451.25
+        }
+
+
+class TestSearch:
+    """Test ranked aircraft search"""
+    
+    def test_escape_like(self):
+        """Test that LIKE wildcards in user input are escaped"""
+        assert escape_like("ba_1%") == "ba\\_1\\%"
+    
+    @pytest.mark.asyncio
+    async def test_search_query(self, aircraft_service):
+        """Test that the search uses index-friendly predicates and ranks by score"""
+        result = MagicMock()
+        result.fetchall.return_value = [("abc123", 100)]
+        aircraft_service.session.execute = AsyncMock(return_value=result)
+        
+        rows = await aircraft_service.search_aircraft(uuid4(), "  ABC ", ["hex"], limit=5)
+        
+        statement = aircraft_service.session.execute.call_args[0][0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        params = statement.compile(dialect=postgresql.dialect()).params
+        
+        assert rows == [("abc123", 100)]
+        assert "lower(aircraft.hex) LIKE" in sql
+        assert "aircraft.registration ILIKE" in sql
+        assert "similarity(" in sql
+        assert "ORDER BY score DESC" in sql
+        assert "abc%" in params.values()
+        assert "%abc%" in params.values()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the aircraft push stream
+"""
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.services.aircraft_stream_service import RESYNC, AircraftStreamBroker, StreamSubscriber
+
+
+def make_feature(hex_code, longitude, latitude, altitude=35000):
+    """Create an aircraft GeoJSON feature"""
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+        "properties": {"hex": hex_code, "altitude": altitude}
+    }
+
+
+def make_fleet(*features):
+    """Key features by hex"""
+    return {feature["properties"]["hex"]: feature for feature in features}
+
+
+def fleet_loader(fleet):
+    """Mock fleet loader returning the given fleet"""
+    return AsyncMock(return_value=fleet)
+
+
+class TestStreamSubscriber:
+    """Test per-subscriber delta filtering"""
+    
+    def test_delta_without_bbox(self):
+        """Test added, moved and removed aircraft"""
+        previous = make_fleet(make_feature("aaa", 0, 50), make_feature("bbb", 1, 50))
+        current = make_fleet(make_feature("aaa", 0.1, 50), make_feature("ccc", 2, 50))
+        
+        delta = StreamSubscriber("t").delta(previous, current, {"aaa", "bbb", "ccc"})
+        
+        assert [f["properties"]["hex"] for f in delta["added"]] == ["ccc"]
+        assert [f["properties"]["hex"] for f in delta["moved"]] == ["aaa"]
+        assert delta["removed"] == ["bbb"]
+    
+    def test_delta_crossing_bbox(self):
+        """Test that aircraft entering or leaving the viewport are added or removed"""
+        subscriber = StreamSubscriber("t", bbox=(0, 45, 10, 55))
+        previous = make_fleet(make_feature("in", 5, 50), make_feature("out", 20, 50))
+        current = make_fleet(make_feature("in", 15, 50), make_feature("out", 5, 50))
+        
+        delta = subscriber.delta(previous, current, {"in", "out"})
+        
+        assert delta["removed"] == ["in"]
+        assert [f["properties"]["hex"] for f in delta["added"]] == ["out"]
+        assert delta["moved"] == []
+    
+    def test_antimeridian_bbox(self):
+        """Test visibility for a viewport crossing 180 degrees"""
+        subscriber = StreamSubscriber("t", bbox=(170, -10, -170, 10))
+        
+        assert subscriber.visible(make_feature("a", 179, 0))
+        assert subscriber.visible(make_feature("b", -175, 0))
+        assert not subscriber.visible(make_feature("c", 0, 0))
+    
+    def test_overflow_queues_resync(self):
+        """Test that a slow client is resynchronised instead of growing without bound"""
+        subscriber = StreamSubscriber("t", max_pending=2)
+        for generation in range(3):
+            subscriber.push({"type": "delta", "generation": generation})
+        
+        assert subscriber.queue.qsize() == 1
+        assert subscriber.queue.get_nowait() is RESYNC
+
+
+class TestAircraftStreamBroker:
+    """Test fleet diffing and fan-out"""
+    
+    @pytest.mark.asyncio
+    async def test_publish_without_subscribers_skips_database(self):
+        """Test that publishing with no clients does no work"""
+        broker = AircraftStreamBroker()
+        with patch.object(broker, "_load_fleet", fleet_loader({})) as load:
+            assert await broker.publish(None, uuid4()) == 0
+            load.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_then_delta(self):
+        """Test that subscribers get a snapshot and then only changes"""
+        broker = AircraftStreamBroker()
+        tenant_id = uuid4()
+        subscriber = broker.subscribe(tenant_id)
+        
+        initial = make_fleet(make_feature("aaa", 0, 50), make_feature("bbb", 1, 50))
+        with patch.object(broker, "_load_fleet", fleet_loader(initial)):
+            snapshot = await broker.snapshot(None, subscriber)
+        assert len(snapshot["features"]) == 2
+        
+        updated = make_fleet(make_feature("aaa", 0, 50), make_feature("bbb", 1, 50, altitude=36000))
+        with patch.object(broker, "_load_fleet", fleet_loader(updated)):
+            assert await broker.publish(None, tenant_id) == 1
+        
+        message = subscriber.queue.get_nowait()
+        assert message["type"] == "delta"
+        assert [f["properties"]["hex"] for f in message["moved"]] == ["bbb"]
+        assert message["added"] == [] and message["removed"] == []
+        
+        broker.unsubscribe(subscriber)
+        assert broker.subscriber_count(tenant_id) == 0
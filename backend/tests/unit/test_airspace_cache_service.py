@@ -0,0 +1,221 @@
+"""
+Unit tests for the airspace cache
+"""
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.airspace_cache_service import AirspaceCache
+from app.services.airspace_service import AirspaceService
+from app.utils.geometry import mbr_rings, parse_mbr_array, web_mercator_to_lonlat
+
+FAA_FIXTURE = Path(__file__).resolve().parent.parent / "fixtures" / "faa_sua_schedule.json"
+
+
+@pytest.fixture
+def recorded_faa():
+    """Serve the recorded FAA schedule instead of the live API"""
+    with patch.object(settings, "AIRSPACE_FIXTURE_PATH", str(FAA_FIXTURE)):
+        yield
+
+
+@pytest.fixture
+def service(recorded_faa):
+    """Airspace service downloading from the recorded schedule, with call tracking"""
+    service = AirspaceService()
+    service.download_schedule = AsyncMock(wraps=service.download_schedule)
+    return service
+
+
+class TestRecordedSchedule:
+    """Test the recorded FAA stand-in"""
+    
+    @pytest.mark.asyncio
+    async def test_download_from_fixture(self, recorded_faa):
+        """Test that the fixture replaces the FAA API"""
+        records = await AirspaceService().download_schedule(limit=3000)
+        
+        assert len(records) == 6
+        assert records[0]["airspace_name"] == "R-2508 COMPLEX"
+    
+    @pytest.mark.asyncio
+    async def test_limit_applies_to_fixture(self, recorded_faa):
+        """Test that the record limit is honoured locally"""
+        assert len(await AirspaceService().download_schedule(limit=2)) == 2
+    
+    @pytest.mark.asyncio
+    async def test_build_collection_skips_records_without_mbr(self, recorded_faa):
+        """Test that records without a bounding box are dropped"""
+        service = AirspaceService()
+        collection = service.build_collection(await service.download_schedule())
+        
+        assert collection["type"] == "FeatureCollection"
+        assert collection["total"] == 5
+        assert "retrieved_at" in collection
+
+
+class TestMercatorConversion:
+    """Test converting FAA Web Mercator MBRs to WGS84"""
+    
+    def test_inverse_mercator(self):
+        """Test known EPSG:3857 points, including high latitude"""
+        longitude, latitude = web_mercator_to_lonlat(
+            np.array([0.0, -13135699.91, 20037508.34]),
+            np.array([0.0, 4163881.14, 15538711.10])
+        )
+        
+        assert longitude == pytest.approx([0.0, -118.0, 180.0], abs=1e-6)
+        assert latitude == pytest.approx([0.0, 35.0, 80.0], abs=1e-6)
+    
+    def test_malformed_mbrs_are_nan(self):
+        """Test that bad strings do not spoil the rest of the batch"""
+        boxes = parse_mbr_array(["1,2,3,4", "", None, "1,2,3", "1,2,x,4", "5,6,7,8"])
+        
+        assert boxes[0].tolist() == [1, 2, 3, 4]
+        assert boxes[5].tolist() == [5, 6, 7, 8]
+        assert np.isnan(boxes[1:5]).all()
+    
+    def test_rings(self):
+        """Test that rectangles are closed and start bottom-left"""
+        ring, missing = mbr_rings(["-13135699.91,4163881.14,-13002116.52,4369640.51", ""])
+        
+        assert ring == [[-118.0, 35.0], [-116.8, 35.0], [-116.8, 36.5], [-118.0, 36.5], [-118.0, 35.0]]
+        assert missing is None
+    
+    def test_single_record_matches_batch(self):
+        """Test that parse_mbr_to_bbox agrees with the batch path"""
+        bbox = AirspaceService().parse_mbr_to_bbox("-13135699.91,4163881.14,-13002116.52,4369640.51")
+        
+        assert bbox == pytest.approx({"min_lng": -118.0, "min_lat": 35.0, "max_lng": -116.8, "max_lat": 36.5}, abs=1e-6)
+        assert AirspaceService().parse_mbr_to_bbox("not,an,mbr") is None
+
+
+class TestAirspaceCache:
+    """Test stale-while-revalidate airspace caching"""
+    
+    @pytest.mark.asyncio
+    async def test_first_use_fetches_then_serves_from_memory(self, service):
+        """Test that only the first request for a limit downloads"""
+        cache = AirspaceCache(service)
+        
+        first = await cache.get_or_fetch(3000)
+        second = await cache.get_or_fetch(3000)
+        
+        assert first is second
+        assert len(first.data["features"]) == 5
+        assert service.download_schedule.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_limits_are_cached_separately(self, service):
+        """Test that each limit has its own entry"""
+        cache = AirspaceCache(service)
+        
+        small = await cache.get_or_fetch(2)
+        full = await cache.get_or_fetch(3000)
+        
+        assert len(small.data["features"]) == 2
+        assert len(full.data["features"]) == 5
+    
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refreshing(self, service):
+        """Test that a stale entry is returned at once and refreshed in the background"""
+        cache = AirspaceCache(service)
+        entry = await cache.get_or_fetch(3000)
+        entry.fetched_at -= timedelta(seconds=settings.AIRSPACE_CACHE_TTL_SECONDS + 1)
+        
+        served = await cache.get_or_fetch(3000)
+        await asyncio.gather(*cache._refreshing.values())
+        
+        assert served is entry
+        assert service.download_schedule.await_count == 2
+        assert cache.get(3000) is not entry
+        assert not cache.get(3000).is_stale()
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_features_keep_validators(self, service):
+        """Test that an identical schedule keeps the body and Last-Modified"""
+        cache = AirspaceCache(service)
+        entry = await cache.get_or_fetch(3000)
+        
+        refreshed = await cache.refresh(3000)
+        
+        assert refreshed is not entry
+        assert refreshed.features_etag == entry.features_etag
+        assert refreshed.payload is entry.payload
+        assert refreshed.modified_at == entry.modified_at
+        assert refreshed.fetched_at >= entry.fetched_at
+    
+    @pytest.mark.asyncio
+    async def test_failure_keeps_last_good_copy(self, service):
+        """Test fallback to the previous entry when the upstream fails"""
+        cache = AirspaceCache(service)
+        entry = await cache.get_or_fetch(3000)
+        service.download_schedule.side_effect = Exception("FAA API returned status 503")
+        
+        assert await cache.refresh(3000) is entry
+        assert cache.get(3000) is entry
+    
+    @pytest.mark.asyncio
+    async def test_failed_first_fetch_is_not_retried_immediately(self, service):
+        """Test that a failing upstream is not hit by every request"""
+        cache = AirspaceCache(service)
+        service.download_schedule.side_effect = Exception("timeout")
+        
+        assert await cache.get_or_fetch(3000) is None
+        assert await cache.get_or_fetch(3000) is None
+        assert service.download_schedule.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_refresh_all_uses_default_limit_before_requests(self, service):
+        """Test that the scheduler warms the default limit"""
+        cache = AirspaceCache(service)
+        
+        with patch.object(cache, "persist", AsyncMock(return_value=True)):
+            result = await cache.refresh_all()
+        
+        assert result == {"refreshed": 1, "failed": 0, "persisted": True}
+        assert cache.get(settings.AIRSPACE_DEFAULT_LIMIT) is not None
+    
+    @pytest.mark.asyncio
+    async def test_refresh_all_applies_job_config(self, service):
+        """Test that the job's default limit and TTL override the settings"""
+        cache = AirspaceCache(service)
+        
+        with patch.object(cache, "persist", AsyncMock(return_value=True)):
+            await cache.refresh_all({"default_limit": 500, "ttl_seconds": 30})
+        
+        entry = cache.get(500)
+        assert list(cache._entries) == [500]
+        entry.fetched_at -= timedelta(seconds=31)
+        await cache.get_or_fetch(500)
+        assert 500 in cache._refreshing
+        await asyncio.gather(*cache._refreshing.values())
+    
+    @pytest.mark.asyncio
+    async def test_refresh_all_fails_when_every_limit_fails(self, service):
+        """Test that a total upstream failure is reported to the scheduler"""
+        cache = AirspaceCache(service)
+        service.download_schedule.side_effect = Exception("timeout")
+        
+        with pytest.raises(Exception):
+            await cache.refresh_all()
+    
+    @pytest.mark.asyncio
+    async def test_least_recently_used_limit_evicted(self, service):
+        """Test that the number of cached limits is bounded"""
+        cache = AirspaceCache(service)
+        
+        with patch.object(settings, "AIRSPACE_CACHE_MAX_LIMITS", 2):
+            await cache.get_or_fetch(1)
+            await cache.get_or_fetch(2)
+            await cache.get_or_fetch(1)
+            await cache.get_or_fetch(3)
+        
+        assert cache.get(1) is not None
+        assert cache.get(2) is None
+        assert cache.get(3) is not None
@@ -0,0 +1,183 @@
+"""
+Unit tests for the persisted airspace store
+"""
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import airspace_cache_service
+from app.services.airspace_cache_service import AirspaceCache
+from app.services.airspace_store_service import (
+    AirspaceStore,
+    UPSERT_AIRSPACE_SQL,
+    airspace_row,
+    build_airspace_query_sql,
+    parse_schedule_time,
+)
+
+FETCHED_AT = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def _feature(**properties):
+    base = {
+        "gid": 10231,
+        "airspace_name": "R-2508 COMPLEX",
+        "type": "R",
+        "type_class": "R",
+        "start_time": "2026-10-16T14:00:00",
+        "end_time": "2026-10-17T02:00:00",
+        "center_id": "ZLA",
+        "state": "CA",
+        "min_alt": 0,
+        "max_alt": 60000,
+        "agl": 0,
+    }
+    base.update(properties)
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [[[-118, 35], [-116.8, 35], [-116.8, 36.5], [-118, 35]]]},
+        "properties": base
+    }
+
+
+class TestAirspaceRow:
+    """Test mapping features to airspace rows"""
+    
+    def test_maps_validity_and_altitude_band(self):
+        """Test that schedule times and altitudes become typed columns"""
+        row = airspace_row(_feature(), FETCHED_AT)
+        
+        assert row["gid"] == 10231
+        assert row["valid_from"] == datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)
+        assert row["valid_to"] == datetime(2026, 10, 17, 2, 0, tzinfo=timezone.utc)
+        assert (row["min_alt_ft"], row["max_alt_ft"], row["agl"]) == (0, 60000, False)
+        assert json.loads(row["geometry"])["type"] == "Polygon"
+        assert json.loads(row["properties"])["airspace_name"] == "R-2508 COMPLEX"
+        assert row["fetched_at"] == FETCHED_AT
+    
+    def test_missing_values(self):
+        """Test open-ended validity and defaulted altitudes"""
+        row = airspace_row(_feature(start_time="", end_time="soon", max_alt=None, agl=1), FETCHED_AT)
+        
+        assert row["valid_from"] is None
+        assert row["valid_to"] is None
+        assert row["max_alt_ft"] == 0
+        assert row["agl"] is True
+    
+    def test_feature_without_gid_is_skipped(self):
+        """Test that rows need the FAA record id"""
+        assert airspace_row(_feature(gid=None), FETCHED_AT) is None
+    
+    @pytest.mark.parametrize("value,expected", [
+        ("2026-10-16T14:00:00Z", datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)),
+        ("2026-10-16 16:00:00+02:00", datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)),
+        (None, None),
+    ])
+    def test_parse_schedule_time(self, value, expected):
+        """Test that schedule times are normalised to UTC"""
+        assert parse_schedule_time(value) == expected
+
+
+class TestAirspaceQuerySQL:
+    """Test filtered airspace queries"""
+    
+    def test_unfiltered(self):
+        """Test that no filters leaves only the limit"""
+        sql = build_airspace_query_sql()
+        
+        assert "&&" not in sql
+        assert "validity" not in sql
+        assert "LIMIT :limit" in sql
+    
+    def test_all_filters(self):
+        """Test bbox, time and altitude clauses"""
+        sql = build_airspace_query_sql((-120, 30, -110, 40), active_at=True, min_alt=True, max_alt=True)
+        
+        assert sql.count("ST_MakeEnvelope") == 1
+        assert "validity @> CAST(:active_at AS TIMESTAMPTZ)" in sql
+        assert "max_alt_ft >= CAST(:min_alt AS INTEGER)" in sql
+        assert "min_alt_ft <= CAST(:max_alt AS INTEGER)" in sql
+    
+    def test_antimeridian_bbox_is_split(self):
+        """Test that a box crossing 180 degrees tests two envelopes"""
+        assert build_airspace_query_sql((170, -10, -170, 10)).count("ST_MakeEnvelope") == 2
+
+
+class TestAirspaceStore:
+    """Test persisting and querying airspace"""
+    
+    @pytest.fixture
+    def session(self):
+        session = MagicMock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+        return session
+    
+    @pytest.mark.asyncio
+    async def test_replace_features_upserts_and_removes_unseen(self, session):
+        """Test that the feed is upserted and older activations deleted"""
+        session.execute.side_effect = [MagicMock(), MagicMock(rowcount=2)]
+        
+        result = await AirspaceStore(session).replace_features(
+            [_feature(), _feature(gid=None), _feature(gid=10877)], FETCHED_AT
+        )
+        
+        upsert_call, delete_call = session.execute.await_args_list
+        assert str(upsert_call.args[0]) == UPSERT_AIRSPACE_SQL
+        assert [row["gid"] for row in upsert_call.args[1]] == [10231, 10877]
+        assert delete_call.args[1] == {"fetched_at": FETCHED_AT}
+        session.commit.assert_awaited_once()
+        assert result == {"upserted": 2, "removed": 2}
+    
+    @pytest.mark.asyncio
+    async def test_empty_feed_leaves_table(self, session):
+        """Test that an empty collection does not wipe the table"""
+        result = await AirspaceStore(session).replace_features([], FETCHED_AT)
+        
+        session.execute.assert_not_awaited()
+        assert result == {"upserted": 0, "removed": 0}
+    
+    @pytest.mark.asyncio
+    async def test_query_geojson_binds_filters(self, session):
+        """Test that only supplied filters are bound"""
+        result = MagicMock()
+        result.scalar_one.return_value = '{"type": "FeatureCollection", "features": [], "total": 0}'
+        session.execute.return_value = result
+        active_at = datetime(2026, 10, 16, 15, 0, tzinfo=timezone.utc)
+        
+        body = await AirspaceStore(session).query_geojson(100, (-120, 30, -110, 40), active_at, min_alt=5000)
+        
+        params = session.execute.await_args.args[1]
+        assert params == {
+            "limit": 100, "min_lon": -120, "min_lat": 30, "max_lon": -110, "max_lat": 40,
+            "active_at": active_at, "min_alt": 5000
+        }
+        assert json.loads(body)["features"] == []
+
+
+class TestAirspacePersistence:
+    """Test that the refresh job persists changed collections"""
+    
+    @pytest.mark.asyncio
+    async def test_persist_only_when_features_change(self):
+        """Test that an unchanged collection is not rewritten"""
+        service = MagicMock()
+        service.download_schedule = AsyncMock(return_value=[])
+        service.build_collection = MagicMock(return_value={"type": "FeatureCollection", "features": [_feature()]})
+        cache = AirspaceCache(service)
+        
+        session = MagicMock()
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        
+        with patch.object(airspace_cache_service, "AsyncSessionLocal", session_factory), \
+             patch.object(AirspaceStore, "replace_features", AsyncMock()) as replace_features:
+            first = await cache.refresh_all()
+            second = await cache.refresh_all()
+        
+        assert first["persisted"] is True
+        assert second["persisted"] is False
+        replace_features.assert_awaited_once()
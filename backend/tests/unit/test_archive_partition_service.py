@@ -0,0 +1,143 @@
+"""
+Unit tests for archive partition management
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import archive_partition_service
+from app.services.archive_partition_service import ArchivePartitionService, parse_partition_bound
+
+
+def make_service(**kwargs):
+    """Create a partition service with a mocked session"""
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.begin_nested = MagicMock(return_value=AsyncMock())
+    return ArchivePartitionService(session, **kwargs)
+
+
+NOW = datetime(2026, 10, 16, 13, 45, tzinfo=timezone.utc)
+
+
+class TestPartitionNaming:
+    """Test partition ranges and names"""
+    
+    def test_daily_bounds(self):
+        """Test that daily partitions cover a UTC day"""
+        service = make_service(interval="daily")
+        start, end = service.partition_bounds(NOW)
+        
+        assert start == datetime(2026, 10, 16, tzinfo=timezone.utc)
+        assert end == datetime(2026, 10, 17, tzinfo=timezone.utc)
+        assert service.partition_name(start) == "aircraft_archive_p20261016"
+    
+    def test_hourly_bounds(self):
+        """Test that hourly partitions cover a UTC hour"""
+        service = make_service(interval="hourly")
+        start, end = service.partition_bounds(NOW)
+        
+        assert start == datetime(2026, 10, 16, 13, tzinfo=timezone.utc)
+        assert end == datetime(2026, 10, 16, 14, tzinfo=timezone.utc)
+        assert service.partition_name(start) == "aircraft_archive_p2026101613"
+    
+    def test_invalid_interval(self):
+        """Test that an unknown interval is rejected"""
+        with pytest.raises(ValueError):
+            make_service(interval="weekly")
+    
+    def test_parse_partition_bound(self):
+        """Test parsing PostgreSQL range bound expressions"""
+        bound = "FOR VALUES FROM ('2026-10-16 00:00:00+00') TO ('2026-10-17 00:00:00+00')"
+        start, end = parse_partition_bound(bound)
+        
+        assert start == datetime(2026, 10, 16, tzinfo=timezone.utc)
+        assert end == datetime(2026, 10, 17, tzinfo=timezone.utc)
+    
+    def test_parse_default_partition(self):
+        """Test that the default partition has no range"""
+        assert parse_partition_bound("DEFAULT") is None
+
+
+class TestPartitionMaintenance:
+    """Test partition creation and expiry"""
+    
+    @pytest.mark.asyncio
+    async def test_ensure_creates_current_and_future(self):
+        """Test that the current and upcoming partitions are created"""
+        service = make_service(interval="daily", partitions_ahead=2)
+        service.list_partitions = AsyncMock(return_value=[])
+        
+        created = await service.ensure_partitions(NOW)
+        
+        assert created == [
+            "aircraft_archive_p20261016",
+            "aircraft_archive_p20261017",
+            "aircraft_archive_p20261018",
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_ensure_skips_covered_ranges(self):
+        """Test that ranges covered by existing partitions are skipped"""
+        service = make_service(interval="hourly", partitions_ahead=1)
+        service.list_partitions = AsyncMock(return_value=[
+            ("aircraft_archive_p20261016",
+             datetime(2026, 10, 16, tzinfo=timezone.utc),
+             datetime(2026, 10, 17, tzinfo=timezone.utc)),
+        ])
+        
+        created = await service.ensure_partitions(NOW)
+        
+        assert created == []
+    
+    @pytest.mark.asyncio
+    async def test_expire_old_partitions(self):
+        """Test that partitions past retention are removed"""
+        service = make_service(interval="daily", retention_days=7, retention_action="detach")
+        service.list_partitions = AsyncMock(return_value=[
+            ("aircraft_archive_p20261001",
+             datetime(2026, 10, 1, tzinfo=timezone.utc),
+             datetime(2026, 10, 2, tzinfo=timezone.utc)),
+            ("aircraft_archive_p20261015",
+             datetime(2026, 10, 15, tzinfo=timezone.utc),
+             datetime(2026, 10, 16, tzinfo=timezone.utc)),
+        ])
+        
+        expired = await service.expire_partitions(NOW)
+        
+        assert expired == ["aircraft_archive_p20261001"]
+        statement = str(service.session.execute.await_args.args[0])
+        assert "DETACH PARTITION" in statement
+    
+    @pytest.mark.asyncio
+    async def test_expire_default_partition_rows(self):
+        """Test that old rows in the default partition are deleted by archived_at"""
+        service = make_service(retention_days=7)
+        service.session.execute.return_value = MagicMock(rowcount=4)
+        
+        deleted = await service.expire_default_rows(NOW)
+        
+        assert deleted == 4
+        statement, params = service.session.execute.await_args.args
+        assert 'DELETE FROM "aircraft_archive_default" WHERE archived_at < :cutoff' in str(statement)
+        assert params == {"cutoff": datetime(2026, 10, 9, 13, 45, tzinfo=timezone.utc)}
+    
+    @pytest.mark.asyncio
+    async def test_maintenance_uses_job_config(self):
+        """Test that the scheduled task applies the job's config over the settings"""
+        session = MagicMock()
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        
+        with patch.object(archive_partition_service, "AsyncSessionLocal", session_factory), \
+                patch.object(ArchivePartitionService, "run_maintenance", autospec=True) as run:
+            run.return_value = {"created": 0, "expired": 0, "expired_default_rows": 0}
+            await archive_partition_service.run_archive_partition_maintenance(
+                {"interval": "hourly", "retention_days": 2, "tenant": "ignored"}
+            )
+        
+        service = run.call_args.args[0]
+        assert (service.session, service.interval, service.retention_days) == (session, "hourly", 2)
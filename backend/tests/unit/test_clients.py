@@ -1,9 +1,31 @@
 """
 Unit tests for data clients
 """
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import httpx
 import pytest
 from app.clients.mock_aircraft_client import MockAircraftClient
-from app.clients.base_client import BaseDataClient
+from app.clients import base_client
+from app.clients.base_client import STORAGE_MODE_INCREMENTAL, BaseDataClient
+from app.clients.data_collectors.adsbexchange_client import ADSBExchangeClient
+from app.clients.data_collectors.composite_client import CompositeADSBExchangeClient, merge_aircraft
+from app.clients.http_client import http_clients
+from app.services.aircraft_service import AircraftBatch
+from app.utils.json_stream import iter_json_array
+
+
+async def _chunks(body: bytes, size: int):
+    """Yield a body in fixed-size pieces, as a network read would"""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def _collect(body: bytes, key: str = "ac", size: int = 7):
+    return [item async for item in iter_json_array(_chunks(body, size), key)]
 
 
 class TestMockAircraftClient:
@@ -183,4 +205,367 @@ class TestBaseDataClient:
         
         # Should only return valid data
         assert len(processed) == 2
-        assert all(item["valid"] for item in processed)
\ No newline at end of file
+        assert all(item["valid"] for item in processed)
+
+class TestStorageModes:
+    """Test storage mode dispatch in fetch_and_store_data"""
+    
+    class StoringClient(BaseDataClient):
+        async def fetch_data(self):
+            return [{"hex": "ae1460"}]
+        
+        def validate_data(self, data):
+            return True
+        
+        def transform_data(self, raw_data):
+            return raw_data
+        
+        async def store_data(self, session, tenant_id, data):
+            return {"created": len(data), "updated": 0, "errors": 0}
+        
+        async def incremental_refresh_data(self, session, tenant_id, data):
+            return {"inserted": 0, "changed": 1, "unchanged": 0, "departed": 0, "archived": 0, "errors": 0}
+    
+    @pytest.mark.asyncio
+    async def test_default_mode_is_upsert(self):
+        """Test that the default storage mode stores data"""
+        result = await self.StoringClient().fetch_and_store_data(None, None)
+        assert result["success"] is True
+        assert result["created"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_incremental_mode(self):
+        """Test that the incremental mode is dispatched"""
+        result = await self.StoringClient().fetch_and_store_data(None, None, storage_mode=STORAGE_MODE_INCREMENTAL)
+        assert result["success"] is True
+        assert result["changed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_unknown_mode_fails(self):
+        """Test that an unknown storage mode is reported as a failure"""
+        result = await self.StoringClient().fetch_and_store_data(None, None, storage_mode="bogus")
+        assert result["success"] is False
+    
+    @pytest.mark.asyncio
+    async def test_upsert_is_written_in_batches(self):
+        """Test that streamed upserts are stored batch by batch"""
+        batches = []
+        
+        class BatchingClient(self.StoringClient):
+            async def fetch_data(self):
+                return [{"hex": f"ae14{i:02x}"} for i in range(5)]
+            
+            async def store_data(self, session, tenant_id, data):
+                batches.append(len(data))
+                return {"created": len(data), "updated": 0, "errors": 0}
+        
+        result = await BatchingClient({"stream_batch_size": 2}).fetch_and_store_data(None, None)
+        
+        assert batches == [2, 2, 1]
+        assert result == {"success": True, "collected": 5, "created": 5, "updated": 0, "errors": 0}
+
+
+class TestJsonStream:
+    """Test incremental decoding of a feed's aircraft array"""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 3, 64, 4096])
+    async def test_items_split_across_chunks(self, size):
+        """Test that items and multi-byte characters may straddle chunks"""
+        aircraft = [{"hex": "ae1460", "flight": "RCH\u00e9 ", "alt_baro": 31000}, {"hex": "ae1461", "lat": -33.5}]
+        body = json.dumps({"ac": aircraft, "total": 2}, ensure_ascii=False).encode()
+        
+        assert await _collect(body, size=size) == aircraft
+    
+    @pytest.mark.asyncio
+    async def test_empty_and_missing_array(self):
+        """Test that an empty or absent array yields nothing"""
+        assert await _collect(b'{"ac": [], "now": 1}') == []
+        assert await _collect(b'{"msg": "No error", "ac": null}') == []
+    
+    @pytest.mark.asyncio
+    async def test_truncated_body_raises(self):
+        """Test that a body cut off mid-array is an error"""
+        with pytest.raises(json.JSONDecodeError):
+            await _collect(b'{"ac": [{"hex": "ae1460"}, {"hex": "ae14')
+    
+    @pytest.mark.asyncio
+    async def test_malformed_body_raises(self):
+        """Test that invalid JSON without the array is an error"""
+        with pytest.raises(json.JSONDecodeError):
+            await _collect(b'<html>Bad gateway</html>')
+
+
+class TestADSBExchangeStreaming:
+    """Test the ADSBExchange client reading its feed as a stream"""
+    
+    @staticmethod
+    def _client(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return patch.object(http_clients, "get", return_value=client)
+    
+    @pytest.mark.asyncio
+    async def test_streams_aircraft(self):
+        """Test that processed aircraft come straight from the response body"""
+        feed = {"ac": [
+            {"hex": "ae1460", "type": "adsb_icao", "lat": 37.7, "lon": -122.4, "alt_baro": 31000},
+            {"hex": "nothex", "type": "adsb_icao"},
+        ], "ctime": 1}
+        
+        with self._client(lambda request: httpx.Response(200, json=feed)):
+            processed = await ADSBExchangeClient({"rapidapi_key": "key"}).process_data()
+        
+        assert [aircraft["hex"] for aircraft in processed] == ["ae1460"]
+        assert processed[0]["latitude"] == 37.7
+    
+    @pytest.mark.asyncio
+    async def test_mapped_records_are_stored_without_remapping(self):
+        """Test that the service receives the spec-mapped records, flagged as mapped"""
+        feed = {"ac": [{"hex": "ae1460", "type": "adsb_icao", "r": "05-5144", "t": "C17", "gs": "450.5"}]}
+        
+        with self._client(lambda request: httpx.Response(200, json=feed)), \
+                patch("app.clients.data_collectors.adsbexchange_client.AircraftService") as service:
+            stored, flags = [], []
+            
+            async def process_bulk_aircraft_data(tenant_id, data, chunk_size=None, mapped=False):
+                stored.extend(data.records())
+                flags.append(mapped)
+                return {"created": len(data)}
+            
+            service.return_value.process_bulk_aircraft_data = process_bulk_aircraft_data
+            await ADSBExchangeClient({"rapidapi_key": "key"}).fetch_and_store_data(None, None)
+        
+        assert flags == [True]
+        stored = stored[0]
+        assert (stored["registration"], stored["aircraft_type_code"], stored["ground_speed"]) == ("05-5144", "C17", 450.5)
+    
+    @pytest.mark.asyncio
+    async def test_incremental_refresh_gets_columnar_batch(self):
+        """Test that whole-feed refreshes hand the service one AircraftBatch"""
+        feed = {"ac": [
+            {"hex": "ae1460", "type": "adsb_icao", "lat": 37.7, "lon": -122.4},
+            {"hex": "ae1461", "type": "adsb_icao", "alt_baro": 90000},
+        ]}
+        
+        with self._client(lambda request: httpx.Response(200, json=feed)), \
+                patch("app.clients.data_collectors.adsbexchange_client.AircraftService") as service:
+            refresh = service.return_value.incremental_refresh_aircraft_data = AsyncMock(return_value={"inserted": 1})
+            result = await ADSBExchangeClient({"rapidapi_key": "key"}).fetch_and_store_data(
+                None, None, storage_mode=STORAGE_MODE_INCREMENTAL
+            )
+        
+        batch = refresh.await_args.args[1]
+        assert isinstance(batch, AircraftBatch)
+        assert batch.values("hex") == ["ae1460"]
+        assert result["collected"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_http_error_raises(self):
+        """Test that error responses are raised with their body available"""
+        with self._client(lambda request: httpx.Response(429, text="Too many requests")):
+            with pytest.raises(httpx.HTTPStatusError):
+                await ADSBExchangeClient({"rapidapi_key": "key"}).fetch_data()
+
+
+class TestConditionalFetch:
+    """Test skipping unchanged feeds"""
+    
+    FEED = {"ac": [{"hex": "ae1460", "type": "adsb_icao", "lat": 37.7, "lon": -122.4}]}
+    
+    @pytest.fixture(autouse=True)
+    def fresh_state(self):
+        with patch.dict(base_client.fetch_states, clear=True):
+            yield
+    
+    @staticmethod
+    def _upstream(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return patch.object(http_clients, "get", return_value=client)
+    
+    @staticmethod
+    async def _run(store=None, tenant_id=None, **config):
+        client = ADSBExchangeClient({"rapidapi_key": "key", **config})
+        client.store_data = store or AsyncMock(return_value={"created": 1, "updated": 0, "errors": 0})
+        return await client.fetch_and_store_data(None, tenant_id), client.store_data
+    
+    @pytest.mark.asyncio
+    async def test_state_is_scoped_to_tenant_and_job(self):
+        """Test that tenants and jobs polling one URL each store the feed"""
+        seen = []
+        
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=self.FEED, headers={"ETag": '"v1"'})
+        
+        tenant_a, tenant_b = uuid.uuid4(), uuid.uuid4()
+        with self._upstream(handler):
+            first_a, _ = await self._run(tenant_id=tenant_a)
+            first_b, store_b = await self._run(tenant_id=tenant_b)
+            other_job, store_job = await self._run(tenant_id=tenant_a, job_id="adsbexchange-regional")
+            again_a, _ = await self._run(tenant_id=tenant_a)
+        
+        assert seen == [None, None, None, '"v1"']
+        assert first_a["collected"] == first_b["collected"] == other_job["collected"] == 1
+        store_b.assert_awaited_once()
+        store_job.assert_awaited_once()
+        assert again_a["unchanged"] is True
+    
+    @pytest.mark.asyncio
+    async def test_identical_body_is_skipped(self):
+        """Test that a byte-identical feed stores nothing the second time"""
+        with self._upstream(lambda request: httpx.Response(200, json=self.FEED)):
+            first, _ = await self._run()
+            second, store = await self._run()
+        
+        assert first["collected"] == 1
+        assert second == {"success": True, "unchanged": True, "collected": 0, "created": 0, "updated": 0, "errors": 0}
+        store.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_validators_are_sent(self):
+        """Test that ETag and Last-Modified make the request conditional"""
+        seen = []
+        
+        def handler(request):
+            seen.append((request.headers.get("if-none-match"), request.headers.get("if-modified-since")))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=self.FEED,
+                                  headers={"ETag": '"v1"', "Last-Modified": "Fri, 16 Oct 2026 12:00:00 GMT"})
+        
+        with self._upstream(handler):
+            await self._run()
+            result, store = await self._run()
+        
+        assert seen == [(None, None), ('"v1"', "Fri, 16 Oct 2026 12:00:00 GMT")]
+        assert result["unchanged"] is True
+        store.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_failed_store_is_retried(self):
+        """Test that a body is only remembered once it has been stored"""
+        with self._upstream(lambda request: httpx.Response(200, json=self.FEED)):
+            failed, _ = await self._run(AsyncMock(side_effect=Exception("database unavailable")))
+            retried, store = await self._run()
+        
+        assert failed["success"] is False
+        assert "unchanged" not in retried
+        store.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_changed_body_is_processed(self):
+        """Test that any change in the body runs the pipeline"""
+        feeds = iter([self.FEED, {"ac": self.FEED["ac"] * 2}])
+        
+        with self._upstream(lambda request: httpx.Response(200, json=next(feeds))):
+            await self._run()
+            result, store = await self._run()
+        
+        assert "unchanged" not in result
+        store.assert_awaited_once()
+
+
+class TestCompositeClient:
+    """Test concurrent multi-endpoint collection"""
+    
+    ENDPOINTS = ["/v2/mil/", "/v2/lat/51.5/lon/-0.1/dist/250/", "/v2/lat/38.9/lon/-77.0/dist/250/"]
+    
+    @pytest.fixture(autouse=True)
+    def fresh_state(self):
+        with patch.dict(base_client.fetch_states, clear=True):
+            yield
+    
+    @staticmethod
+    def _upstream(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return patch.object(http_clients, "get", return_value=client)
+    
+    def _client(self, **config):
+        return CompositeADSBExchangeClient({"rapidapi_key": "key", "endpoints": self.ENDPOINTS, **config})
+    
+    def test_merge_keeps_freshest_position(self):
+        """Test that the most recent position wins and gaps are filled from the others"""
+        merged = merge_aircraft([
+            [{"hex": "AE1460", "lat": 37.0, "lon": -122.0, "seen_pos": 9.0, "nic": 8, "r": "05-5144"}],
+            [{"hex": "ae1460", "lat": 37.1, "lon": -122.1, "seen_pos": 1.5, "nic": 6, "r": None}],
+        ])
+        
+        assert merged == {"ae1460": {"hex": "ae1460", "lat": 37.1, "lon": -122.1, "seen_pos": 1.5, "nic": 6, "r": "05-5144"}}
+    
+    def test_merge_keeps_position_metadata_with_position(self):
+        """Test that the winner's position is never paired with the loser's integrity or age"""
+        merged = merge_aircraft([
+            [{"hex": "ae1460", "lat": 37.1, "lon": -122.1, "r": None}],
+            [{"hex": "ae1460", "lastPosition": {"lat": 36.0, "lon": -121.0, "seen_pos": 30.0},
+              "seen_pos": 30.0, "nic": 8, "nac_p": 9, "r": "05-5144"}],
+        ])
+        
+        assert merged["ae1460"] == {"hex": "ae1460", "lat": 37.1, "lon": -122.1, "r": "05-5144"}
+    
+    def test_merge_breaks_ties_by_nic(self):
+        """Test that equally fresh positions prefer the higher integrity"""
+        merged = merge_aircraft([
+            [{"hex": "ae1460", "lat": 37.0, "lon": -122.0, "seen_pos": 2.0, "nic": 6}],
+            [{"hex": "ae1460", "lat": 37.1, "lon": -122.1, "seen_pos": 2.0, "nic": 8}],
+            [{"hex": "ae1460", "lastPosition": {"lat": 36.0, "lon": -121.0, "seen_pos": 1.0}, "nic": 9}],
+            [{"hex": "ae1460", "nic": 10}],
+        ])
+        
+        assert (merged["ae1460"]["lat"], merged["ae1460"]["nic"]) == (37.1, 8)
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that endpoints overlap but never exceed the limit"""
+        active = peak = 0
+        
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200, json={"ac": [{"hex": f"ae146{self.ENDPOINTS.index(request.url.path)}", "type": "adsb_icao"}]})
+        
+        with self._upstream(handler):
+            aircraft = await self._client(max_concurrency=2).fetch_data()
+        
+        assert peak == 2
+        assert len(aircraft) == 3
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_endpoints_are_skipped(self):
+        """Test that a run is skipped only when every endpoint is unchanged"""
+        feeds = {endpoint: {"ac": [{"hex": f"ae146{i}", "type": "adsb_icao"}]} for i, endpoint in enumerate(self.ENDPOINTS)}
+        
+        async def run():
+            client = self._client()
+            client.store_data = AsyncMock(return_value={"created": 1, "updated": 0, "errors": 0})
+            return await client.fetch_and_store_data(None, None)
+        
+        with self._upstream(lambda request: httpx.Response(200, json=feeds[request.url.path])):
+            first = await run()
+            second = await run()
+            feeds[self.ENDPOINTS[1]] = {"ac": []}
+            third = await run()
+        
+        assert first["collected"] == 3
+        assert second["unchanged"] is True
+        assert third["collected"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_endpoint_fails_run(self):
+        """Test that partial coverage is never stored"""
+        def handler(request):
+            if request.url.path == self.ENDPOINTS[1]:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"ac": [{"hex": "ae1460"}]})
+        
+        client = self._client()
+        client.store_data = AsyncMock()
+        with self._upstream(handler):
+            result = await client.fetch_and_store_data(None, None)
+        
+        assert result["success"] is False
+        client.store_data.assert_not_awaited()
@@ -0,0 +1,134 @@
+"""
+Unit tests for response compression
+"""
+import gzip
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.middleware import CompressionMiddleware
+from app.utils import compression
+from app.utils.compression import CompressedPayload, negotiate_encoding
+
+
+@pytest.fixture
+def all_codecs():
+    """Pretend every optional codec is installed"""
+    with patch.object(compression, "available_encodings", return_value=["zstd", "br", "gzip"]):
+        yield
+
+
+class TestNegotiateEncoding:
+    """Test Accept-Encoding negotiation"""
+    
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip, br;q=0.5", "br"),
+        ("zstd;q=0, br;q=0, gzip", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "br"),
+        ("gzip;q=0", None),
+        ("gzip;q=nonsense", None),
+    ])
+    def test_server_preference_among_accepted(self, all_codecs, header, expected):
+        """Test that the most preferred accepted coding wins"""
+        assert negotiate_encoding(header) == expected
+    
+    def test_gzip_always_available(self):
+        """Test that gzip is offered without the optional codecs"""
+        assert "gzip" in compression.available_encodings()
+
+
+class TestCompressedPayload:
+    """Test payloads compressed once and shared"""
+    
+    @pytest.mark.asyncio
+    async def test_compresses_each_encoding_once(self):
+        """Test that repeated requests reuse the compressed bytes"""
+        content = b'{"type":"FeatureCollection","features":[]}' * 100
+        payload = CompressedPayload(content)
+        
+        with patch.object(compression, "compress", wraps=compression.compress) as compress:
+            first = await payload.encoded("gzip")
+            second = await payload.encoded("gzip")
+        
+        assert first is second
+        assert compress.call_count == 1
+        assert gzip.decompress(first) == content
+        assert len(first) < len(content) / 10
+    
+    @pytest.mark.asyncio
+    async def test_identity(self):
+        """Test that no coding returns the original bytes"""
+        payload = CompressedPayload(b"{}")
+        
+        assert await payload.encoded(None) == b"{}"
+    
+    @pytest.mark.asyncio
+    async def test_response_headers(self):
+        """Test that compressed responses declare their coding and vary"""
+        payload = CompressedPayload(b"[]" * 1000)
+        
+        response = await payload.response("gzip", "application/geo+json", {"ETag": '"abc"'})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == '"abc"'
+        assert gzip.decompress(response.body) == b"[]" * 1000
+    
+    def test_unsupported_encoding(self):
+        """Test that unknown codings are rejected"""
+        with pytest.raises(ValueError):
+            compression.compress(b"{}", "deflate")
+
+
+class TestCompressionMiddleware:
+    """Test gzip of dynamic responses"""
+    
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+        
+        @app.get("/dynamic")
+        async def dynamic():
+            return Response(b"x" * 1000, media_type="application/json")
+        
+        @app.get("/precompressed")
+        async def precompressed():
+            return Response(gzip.compress(b"y" * 1000), headers={"Content-Encoding": "gzip"})
+        
+        @app.get("/events")
+        async def events():
+            async def body():
+                yield b"data: " + b"z" * 1000 + b"\n\n"
+            return StreamingResponse(body(), media_type="text/event-stream")
+        
+        return TestClient(app)
+    
+    def test_dynamic_responses_are_gzipped(self, client):
+        """Test that large dynamic bodies are compressed"""
+        response = client.get("/dynamic", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"x" * 1000
+    
+    def test_precompressed_passes_through(self, client):
+        """Test that encoded bodies are not compressed twice"""
+        response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"y" * 1000
+    
+    def test_event_streams_are_not_buffered(self, client):
+        """Test that SSE requests bypass gzip"""
+        response = client.get("/events", headers={"Accept-Encoding": "gzip", "Accept": "text/event-stream"})
+        
+        assert "content-encoding" not in response.headers
@@ -0,0 +1,184 @@
+"""
+Unit tests for the live fleet cache
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.services.aircraft_service import DEFAULT_RESPONSE_FIELDS
+from app.services.data_generation import data_generations
+from app.services.fleet_cache_service import FleetCache, FleetSnapshot, aircraft_matcher
+from app.utils.serialization import dumps
+from app.utils.trigram import similarity
+
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def make_row(hex_code, minutes_ago, flight=None, registration=None, type_code=None):
+    """Create a snapshot row with every default response field"""
+    row = {field: None for field in DEFAULT_RESPONSE_FIELDS}
+    row.update({
+        "id": UUID(int=int(hex_code, 16)),
+        "updated_at": NOW - timedelta(minutes=minutes_ago),
+        "hex": hex_code,
+        "type": "adsb_icao",
+        "flight": flight,
+        "registration": registration,
+        "aircraft_type_code": type_code,
+    })
+    return row
+
+
+def make_snapshot(entries, generation=1):
+    """Build a snapshot from (row, position) pairs, newest first"""
+    entries = sorted(entries, key=lambda entry: (entry[0]["updated_at"], entry[0]["id"]), reverse=True)
+    return FleetSnapshot("tenant", generation, [row for row, _ in entries], [position for _, position in entries])
+
+
+class TestTrigram:
+    """Test the pg_trgm-compatible similarity"""
+    
+    def test_matches_postgres(self):
+        """Test against the documented pg_trgm example"""
+        assert similarity("word", "two words") == pytest.approx(0.363636, abs=1e-5)
+    
+    def test_empty(self):
+        """Test that empty values have no similarity"""
+        assert similarity(None, "abc") == 0.0
+
+
+class TestFleetSnapshot:
+    """Test snapshot reads"""
+    
+    @pytest.fixture
+    def snapshot(self):
+        return make_snapshot([
+            (make_row("aaa001", 1, flight="BAW123 ", registration="G-EUPT", type_code="A319"), (-0.45, 51.47)),
+            (make_row("bbb002", 2, flight="DLH4AB", registration="D-AIBA", type_code="A320"), (8.57, 50.03)),
+            (make_row("ccc003", 3, flight="BAW9"), None),
+        ])
+    
+    def test_snapshot_is_immutable(self, snapshot):
+        """Test that rows cannot be modified by readers"""
+        with pytest.raises(TypeError):
+            snapshot.aircraft[0]["hex"] = "zzz"
+    
+    def test_keyset_position(self, snapshot):
+        """Test that a cursor resumes after the last row of the previous page"""
+        second = snapshot.aircraft[1]
+        index = snapshot.index_after((second["updated_at"], second["id"]))
+        
+        assert snapshot.aircraft[index]["hex"] == "ccc003"
+        assert snapshot.index_after((NOW - timedelta(days=1), uuid4())) == len(snapshot)
+    
+    def test_matcher(self, snapshot):
+        """Test in-memory hex, flight and bbox filters"""
+        assert [r["hex"] for r in snapshot.iter_matching(aircraft_matcher(flight_filter="baw"))] == ["aaa001", "ccc003"]
+        assert [r["hex"] for r in snapshot.iter_matching(aircraft_matcher(bbox=(0, 45, 10, 55)))] == ["bbb002"]
+        assert aircraft_matcher() is None
+    
+    def test_geojson_only_positioned_aircraft(self, snapshot):
+        """Test that the pre-serialized GeoJSON skips aircraft without a position"""
+        assert snapshot.geojson.content == dumps({
+            "type": "FeatureCollection",
+            "features": [feature for _, feature in snapshot.features]
+        })
+        assert [f["properties"]["hex"] for _, f in snapshot.features] == ["aaa001", "bbb002"]
+        assert snapshot.features[0][1]["properties"]["aircraft_type"] == "A319"
+        assert [f["properties"]["hex"] for f in snapshot.features_in((0, 45, 10, 55))] == ["bbb002"]
+    
+    def test_search_ranking(self, snapshot):
+        """Test that exact beats prefix beats substring"""
+        results = snapshot.search("baw9", 10)
+        assert [(row["hex"], score) for row, score in results] == [("ccc003", 95)]
+        
+        # Equal prefix scores fall back to trigram similarity
+        results = snapshot.search("BAW", 10)
+        assert [row["hex"] for row, _ in results] == ["ccc003", "aaa001"]
+        assert {score for _, score in results} == {75}
+        
+        results = snapshot.search("a32", 10)
+        assert [(row["hex"], score) for row, score in results] == [("bbb002", 50)]
+
+
+class TestFleetCache:
+    """Test snapshot building and swapping"""
+    
+    @staticmethod
+    def make_session(rows):
+        session = MagicMock()
+        result = MagicMock()
+        result.fetchall.return_value = rows
+        session.execute = AsyncMock(return_value=result)
+        return session
+    
+    @staticmethod
+    def db_row(row, position):
+        longitude, latitude = position if position else (None, None)
+        return tuple(row[field] for field in DEFAULT_RESPONSE_FIELDS) + (longitude, latitude)
+    
+    @pytest.mark.asyncio
+    async def test_build_once_then_serve_from_memory(self):
+        """Test that the first read builds the snapshot and later reads reuse it"""
+        tenant_id = uuid4()
+        session = self.make_session([self.db_row(make_row("aaa001", 1), (1.0, 2.0))])
+        cache = FleetCache()
+        
+        first = await cache.get_or_build(session, tenant_id)
+        second = await cache.get_or_build(session, tenant_id)
+        
+        assert first is second
+        assert session.execute.await_count == 1
+        assert first.positions == ((1.0, 2.0),)
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_swaps_snapshot(self):
+        """Test that a rebuild replaces the snapshot and stamps the new generation"""
+        tenant_id = uuid4()
+        cache = FleetCache()
+        old = await cache.rebuild(self.make_session([]), tenant_id)
+        
+        data_generations.bump(tenant_id)
+        new = await cache.rebuild(self.make_session([self.db_row(make_row("bbb002", 1), None)]), tenant_id)
+        
+        assert cache.get(tenant_id) is new
+        assert new.generation == old.generation + 1
+        assert len(old) == 0 and len(new) == 1
+        
+        cache.invalidate(tenant_id)
+        assert cache.get(tenant_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_slow_build_never_replaces_newer_snapshot(self):
+        """Test that a first build finishing late cannot overwrite the post-ingest rebuild"""
+        tenant_id = uuid4()
+        cache = FleetCache()
+        release = asyncio.Event()
+        
+        slow_session = self.make_session([self.db_row(make_row("aaa001", 1), None)])
+        slow_result = slow_session.execute.return_value
+        
+        async def slow_execute(*args, **kwargs):
+            await release.wait()
+            return slow_result
+        
+        slow_session.execute = slow_execute
+        first_build = asyncio.create_task(cache.get_or_build(slow_session, tenant_id))
+        await asyncio.sleep(0)
+        
+        data_generations.bump(tenant_id)
+        rebuild = asyncio.create_task(cache.rebuild(self.make_session([self.db_row(make_row("bbb002", 1), None)]), tenant_id))
+        await asyncio.sleep(0)
+        release.set()
+        stale, fresh = await asyncio.gather(first_build, rebuild)
+        
+        assert cache.get(tenant_id) is fresh
+        assert fresh.generation == stale.generation + 1
+        
+        # A snapshot of an older generation is discarded even outside the lock order
+        assert cache._store(stale) is fresh
+        assert cache.get(tenant_id) is fresh
@@ -0,0 +1,127 @@
+"""
+Unit tests for HTTP conditional request helpers
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.data_generation import DataGenerationTracker
+from app.services.scheduler_service import SchedulerService
+from app.utils.http_cache import (
+    cache_headers, content_etag, etag_matches, http_date, make_etag, not_modified, seconds_until
+)
+
+
+class TestETag:
+    """Test ETag construction and If-None-Match matching"""
+    
+    def test_make_etag_is_strong_and_stable(self):
+        """Test that equal parts give the same quoted strong ETag"""
+        etag = make_etag("aircraft-geojson", "epoch", 3, None)
+        
+        assert etag == make_etag("aircraft-geojson", "epoch", 3, None)
+        assert etag != make_etag("aircraft-geojson", "epoch", 4, None)
+        assert etag.startswith('"') and etag.endswith('"')
+    
+    def test_make_weak_etag(self):
+        """Test that weak ETags are prefixed and still revalidate"""
+        etag = make_etag("aircraft-geojson", "epoch", 3, None, weak=True)
+        
+        assert etag == "W/" + make_etag("aircraft-geojson", "epoch", 3, None)
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag[2:], etag)
+    
+    def test_content_etag(self):
+        """Test that content ETags follow the bytes"""
+        assert content_etag(b"[1]") == content_etag(b"[1]")
+        assert content_etag(b"[1]") != content_etag(b"[2]")
+    
+    @pytest.mark.parametrize("header", [
+        '"abc"',
+        'W/"abc"',
+        '"other", "abc"',
+        '*',
+    ])
+    def test_matches(self, header):
+        """Test exact, weak, list and wildcard matches"""
+        assert etag_matches(header, '"abc"')
+    
+    @pytest.mark.parametrize("header", [None, "", '"abcd"', 'abc', '"other"'])
+    def test_does_not_match(self, header):
+        """Test that missing or different validators do not match"""
+        assert not etag_matches(header, '"abc"')
+
+
+class TestCacheHeaders:
+    """Test freshness and validator headers"""
+    
+    def test_max_age(self):
+        """Test that a positive max-age is advertised with must-revalidate"""
+        headers = cache_headers('"abc"', datetime(2026, 10, 16, 12, 0, 30, 500), 90)
+        
+        assert headers == {
+            "ETag": '"abc"',
+            "Last-Modified": "Fri, 16 Oct 2026 12:00:30 GMT",
+            "Cache-Control": "max-age=90, must-revalidate"
+        }
+    
+    @pytest.mark.parametrize("max_age", [None, 0])
+    def test_no_max_age_requires_revalidation(self, max_age):
+        """Test that without freshness clients revalidate every time"""
+        headers = cache_headers('"abc"', max_age=max_age)
+        
+        assert headers["Cache-Control"] == "no-cache"
+        assert "Last-Modified" not in headers
+    
+    def test_http_date_converts_to_utc(self):
+        """Test that aware datetimes are rendered in GMT"""
+        moment = datetime(2026, 10, 16, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+        
+        assert http_date(moment) == "Fri, 16 Oct 2026 12:00:00 GMT"
+    
+    def test_seconds_until(self):
+        """Test countdown to a naive UTC moment, clamped at zero"""
+        now = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+        
+        assert seconds_until(datetime(2026, 10, 16, 12, 1, 30), now) == 90
+        assert seconds_until(datetime(2026, 10, 16, 11, 0), now) == 0
+        assert seconds_until(None, now) is None
+    
+    def test_not_modified(self):
+        """Test that 304 responses are empty and keep the validators"""
+        response = not_modified({"ETag": '"abc"', "Cache-Control": "no-cache"})
+        
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == '"abc"'
+
+
+class TestGenerationValidators:
+    """Test the state ETags and freshness are derived from"""
+    
+    def test_bump_records_change_time(self):
+        """Test that a bump records when the tenant's data changed"""
+        tracker = DataGenerationTracker()
+        
+        assert tracker.changed_at("tenant") is None
+        tracker.bump("tenant")
+        
+        assert tracker.changed_at("tenant") is not None
+        assert tracker.changed_at("tenant").tzinfo is not None
+    
+    def test_epoch_differs_per_tracker(self):
+        """Test that a restarted process cannot reuse an earlier generation's ETag"""
+        assert DataGenerationTracker().epoch != DataGenerationTracker().epoch
+    
+    def test_next_ingest_run_ignores_maintenance_and_disabled_jobs(self):
+        """Test that only enabled data collection jobs set the next ingest"""
+        scheduler = SchedulerService()
+        ingest = scheduler.jobs["adsbexchange-military"]
+        maintenance = scheduler.jobs["archive-partition-maintenance"]
+        ingest.next_run = datetime(2026, 10, 16, 12, 30)
+        maintenance.next_run = datetime(2026, 10, 16, 12, 0)
+        
+        assert scheduler.next_ingest_run() == datetime(2026, 10, 16, 12, 30)
+        
+        ingest.enabled = False
+        assert scheduler.next_ingest_run() is None
@@ -0,0 +1,143 @@
+"""
+Unit tests for the shared collector HTTP clients
+"""
+import asyncio
+import socket
+from unittest.mock import AsyncMock, patch
+
+import httpcore
+import httpx
+import pytest
+
+from app.clients.http_client import CachingDNSBackend, HttpClientRegistry
+
+
+class TestHttpClientRegistry:
+    """Test one pooled client per upstream origin"""
+    
+    @pytest.mark.asyncio
+    async def test_client_shared_per_origin(self):
+        """Test that URLs on one origin share a client"""
+        registry = HttpClientRegistry()
+        
+        first = registry.get("https://adsbexchange-com1.p.rapidapi.com/v2/mil/")
+        second = registry.get("https://adsbexchange-com1.p.rapidapi.com/v2/lat/1/lon/2/dist/3/")
+        
+        assert first is second
+        assert registry.get("https://sua.faa.gov/sua/schedule.json") is not first
+        assert registry.get("https://adsbexchange-com1.p.rapidapi.com/", verify=False) is not first
+        await registry.close()
+    
+    @pytest.mark.asyncio
+    async def test_close(self):
+        """Test that closing releases every client and later use gets a fresh one"""
+        registry = HttpClientRegistry()
+        client = registry.get("https://sua.faa.gov/")
+        
+        await registry.close()
+        
+        assert client.is_closed
+        assert registry.get("https://sua.faa.gov/") is not client
+        await registry.close()
+    
+    def test_relative_url_rejected(self):
+        """Test that clients are keyed by absolute URLs"""
+        with pytest.raises(ValueError):
+            HttpClientRegistry().get("/v2/mil/")
+    
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self):
+        """Test that consecutive fetches share one keep-alive connection"""
+        connections = 0
+        
+        async def serve(reader, writer):
+            nonlocal connections
+            connections += 1
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: application/json\r\n\r\n{}")
+                await writer.drain()
+        
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        registry = HttpClientRegistry()
+        try:
+            client = registry.get(f"http://localhost:{port}/")
+            for _ in range(3):
+                response = await client.get(f"http://localhost:{port}/v2/mil/")
+                assert response.json() == {}
+        finally:
+            await registry.close()
+            server.close()
+        
+        assert connections == 1
+    
+    @pytest.mark.asyncio
+    async def test_requests_connect_through_dns_cache(self):
+        """Test that pooled clients open connections via the shared DNS backend"""
+        registry = HttpClientRegistry()
+        inner = httpcore.AsyncMockBackend([b"HTTP/1.1 200 OK\r\n", b"Content-Length: 2\r\n\r\n", b"{}"])
+        registry.dns._backend = inner
+        registry.dns._cache[("sua.faa.gov", 80)] = (float("inf"), ["203.0.113.7"])
+        
+        with patch.object(registry.dns, "connect_tcp", wraps=registry.dns.connect_tcp) as connect_tcp, \
+                patch.object(inner, "connect_tcp", wraps=inner.connect_tcp) as connect_address:
+            response = await registry.get("http://sua.faa.gov/").get("/sua/schedule.json")
+        
+        assert response.json() == {}
+        assert (connect_tcp.call_args.kwargs["host"], connect_tcp.call_args.kwargs["port"]) == ("sua.faa.gov", 80)
+        assert connect_address.call_args.args[:2] == ("203.0.113.7", 80)
+        await registry.close()
+    
+    @pytest.mark.asyncio
+    async def test_connect_errors_are_httpx_errors(self):
+        """Test that pool failures reach collectors as httpx exceptions"""
+        registry = HttpClientRegistry()
+        
+        with patch.object(registry.dns, "connect_tcp", AsyncMock(side_effect=httpcore.ConnectError("refused"))):
+            with pytest.raises(httpx.ConnectError):
+                await registry.get("http://sua.faa.gov/").get("/sua/schedule.json")
+        await registry.close()
+
+
+class TestCachingDNSBackend:
+    """Test cached host name resolution"""
+    
+    @pytest.mark.asyncio
+    async def test_resolution_is_cached(self):
+        """Test that a host is resolved once per TTL"""
+        backend = CachingDNSBackend(ttl=60)
+        infos = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("203.0.113.7", 443))] * 2
+        
+        with patch.object(asyncio.get_running_loop(), "getaddrinfo", AsyncMock(return_value=infos)) as getaddrinfo:
+            assert await backend.resolve("sua.faa.gov", 443) == ["203.0.113.7"]
+            assert await backend.resolve("sua.faa.gov", 443) == ["203.0.113.7"]
+        
+        getaddrinfo.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_ip_literals_are_not_resolved(self):
+        """Test that addresses skip the resolver"""
+        assert await CachingDNSBackend(ttl=60).resolve("::1", 80) == ["::1"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_resolution_is_a_connect_error(self):
+        """Test that resolver failures surface as connection errors"""
+        backend = CachingDNSBackend(ttl=60)
+        
+        with patch.object(asyncio.get_running_loop(), "getaddrinfo", AsyncMock(side_effect=socket.gaierror("no such host"))):
+            with pytest.raises(httpcore.ConnectError):
+                await backend.resolve("nowhere.invalid", 443)
+    
+    @pytest.mark.asyncio
+    async def test_unreachable_addresses_are_forgotten(self):
+        """Test that the cache entry is dropped when every address fails"""
+        inner = AsyncMock()
+        inner.connect_tcp.side_effect = httpcore.ConnectError("refused")
+        backend = CachingDNSBackend(ttl=60, backend=inner)
+        backend._cache[("sua.faa.gov", 443)] = (float("inf"), ["203.0.113.7", "203.0.113.8"])
+        
+        with pytest.raises(httpcore.ConnectError):
+            await backend.connect_tcp("sua.faa.gov", 443)
+        
+        assert [call.args[0] for call in inner.connect_tcp.await_args_list] == ["203.0.113.7", "203.0.113.8"]
+        assert ("sua.faa.gov", 443) not in backend._cache
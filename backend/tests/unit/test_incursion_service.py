@@ -0,0 +1,215 @@
+"""
+Unit tests for airspace incursion detection
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from app.services.incursion_service import (
+    CLOSE_INCURSIONS_SQL,
+    UPSERT_INCURSION_SQL,
+    AirspaceIndex,
+    IncursionEngine,
+    IncursionService,
+)
+
+NOW = datetime(2026, 10, 16, 15, 0, tzinfo=timezone.utc)
+
+
+def _airspace(gid, box, start_time="2026-10-16T14:00:00", end_time="2026-10-17T02:00:00",
+              min_alt=0, max_alt=60000, airspace_type="R"):
+    """Airspace feature over a (min_lon, min_lat, max_lon, max_lat) box"""
+    min_lon, min_lat, max_lon, max_lat = box
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [[
+            [min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat], [min_lon, min_lat]
+        ]]},
+        "properties": {
+            "gid": gid,
+            "airspace_name": f"R-{gid}",
+            "type": airspace_type,
+            "start_time": start_time,
+            "end_time": end_time,
+            "min_alt": min_alt,
+            "max_alt": max_alt,
+        }
+    }
+
+
+class TestAirspaceIndex:
+    """Test the in-memory polygon, altitude and time checks"""
+    
+    @pytest.fixture
+    def index(self):
+        return AirspaceIndex([
+            _airspace(1, (-118, 35, -117, 36)),
+            _airspace(2, (-118, 35, -117, 36), min_alt=10000, max_alt=20000),
+            _airspace(3, (-100, 30, -99, 31), start_time="2026-10-16T16:00:00"),
+            _airspace(4, (-100, 30, -99, 31), start_time="", end_time=""),
+            _airspace(None, (-118, 35, -117, 36)),
+        ])
+    
+    def test_polygon_and_altitude_band(self, index):
+        """Test that only airspace whose band contains the altitude matches"""
+        pairs = index.evaluate([(-117.5, 35.5), (-117.5, 35.5), (-110, 35.5)], [5000, 15000, 5000], NOW)
+        
+        assert sorted((aircraft, index.gids[airspace]) for aircraft, airspace in pairs) == [(0, 1), (1, 1), (1, 2)]
+    
+    def test_time_window(self, index):
+        """Test that scheduled but inactive airspace is ignored and open windows always apply"""
+        pairs = index.evaluate([(-99.5, 30.5)], [5000], NOW)
+        
+        assert [index.gids[airspace] for _, airspace in pairs] == [4]
+    
+    def test_unknown_altitude_is_not_reported(self, index):
+        """Test that aircraft without altitude are skipped"""
+        assert index.evaluate([(-117.5, 35.5)], [None], NOW) == []
+    
+    def test_airspace_without_gid_is_skipped(self, index):
+        """Test that features that cannot key an incursion are not indexed"""
+        assert len(index) == 4
+    
+    def test_empty(self):
+        """Test evaluation without airspace or aircraft"""
+        assert AirspaceIndex([]).evaluate([(-117.5, 35.5)], [5000], NOW) == []
+        assert AirspaceIndex([_airspace(1, (-118, 35, -117, 36))]).evaluate([], [], NOW) == []
+    
+    def test_matches_brute_force(self):
+        """Test the tree query against testing every pair"""
+        rng = np.random.default_rng(7)
+        corners = rng.uniform([-120, 30], [-80, 45], size=(200, 2))
+        boxes = [(lon, lat, lon + 1.5, lat + 1.0) for lon, lat in corners]
+        index = AirspaceIndex([_airspace(gid, box) for gid, box in enumerate(boxes)])
+        positions = rng.uniform([-121, 29], [-78, 47], size=(2000, 2))
+        
+        pairs = index.evaluate(positions.tolist(), [5000] * len(positions), NOW)
+        
+        expected = {
+            (aircraft, gid)
+            for aircraft, (lon, lat) in enumerate(positions)
+            for gid, (min_lon, min_lat, max_lon, max_lat) in enumerate(boxes)
+            if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+        }
+        assert {(aircraft, index.gids[airspace]) for aircraft, airspace in pairs} == expected
+
+
+class TestIncursionService:
+    """Test recording and listing incursions"""
+    
+    @pytest.fixture
+    def session(self):
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock(rowcount=3))
+        session.commit = AsyncMock()
+        return session
+    
+    @pytest.mark.asyncio
+    async def test_record_upserts_and_ends_unseen(self, session):
+        """Test that current incursions are upserted and others ended"""
+        tenant_id = uuid4()
+        
+        result = await IncursionService(session).record(tenant_id, [{"hex": "a1b2c3", "airspace_gid": 1}], NOW)
+        
+        upsert_call, close_call = session.execute.await_args_list
+        assert str(upsert_call.args[0]) == UPSERT_INCURSION_SQL
+        assert upsert_call.args[1] == [{"hex": "a1b2c3", "airspace_gid": 1, "tenant_id": tenant_id, "evaluated_at": NOW}]
+        assert str(close_call.args[0]) == CLOSE_INCURSIONS_SQL
+        assert close_call.args[1] == {"tenant_id": tenant_id, "evaluated_at": NOW}
+        assert result == {"open": 1, "ended": 3}
+    
+    @pytest.mark.asyncio
+    async def test_no_incursions_ends_all_open(self, session):
+        """Test that an empty evaluation still ends open incursions"""
+        await IncursionService(session).record(uuid4(), [], NOW)
+        
+        assert str(session.execute.await_args.args[0]) == CLOSE_INCURSIONS_SQL
+    
+    @pytest.mark.asyncio
+    async def test_list_filters(self, session):
+        """Test active and hex filters"""
+        session.execute.return_value.mappings.return_value.all.return_value = []
+        
+        await IncursionService(session).list_incursions(uuid4(), active=True, hex_code="A1B2C3", limit=10)
+        
+        sql, params = session.execute.await_args.args
+        assert "ended_at IS NULL" in str(sql)
+        assert params["hex"] == "a1b2c3"
+        assert params["limit"] == 10
+
+
+class TestIncursionEngine:
+    """Test evaluation of the live fleet after an ingest"""
+    
+    @staticmethod
+    def _engine(features, snapshot=None):
+        entry = MagicMock(features_etag='"abc"', data={"features": features})
+        airspace = MagicMock()
+        airspace.largest.return_value = entry
+        fleet = MagicMock()
+        fleet.get.return_value = snapshot
+        return IncursionEngine(airspace, fleet)
+    
+    def test_index_reused_until_airspace_changes(self):
+        """Test that the tree is only rebuilt for a new collection"""
+        engine = self._engine([_airspace(1, (-118, 35, -117, 36))])
+        first = engine.current_index()
+        
+        assert engine.current_index() is first
+        engine.airspace.largest.return_value.features_etag = '"def"'
+        assert engine.current_index() is not first
+    
+    @pytest.mark.asyncio
+    async def test_evaluates_snapshot_aircraft(self):
+        """Test that snapshot aircraft inside airspace are recorded"""
+        aircraft_id = UUID(int=1)
+        snapshot = MagicMock(
+            aircraft=(
+                {"id": aircraft_id, "hex": "a1b2c3", "flight": "RCH123", "altitude_baro": None, "altitude_geom": 12000},
+                {"id": UUID(int=2), "hex": "d4e5f6", "flight": None, "altitude_baro": 3000, "altitude_geom": None},
+                {"id": UUID(int=3), "hex": "aaaaaa", "flight": None, "altitude_baro": 3000, "altitude_geom": None},
+            ),
+            positions=((-117.5, 35.5), (-110.0, 35.5), None)
+        )
+        engine = self._engine([_airspace(1, (-118, 35, -117, 36))], snapshot)
+        session = MagicMock()
+        
+        with patch.object(IncursionService, "record", AsyncMock(return_value={"open": 1, "ended": 0})) as record:
+            result = await engine.evaluate(session, uuid4(), NOW)
+        
+        rows = record.await_args.args[1]
+        assert [(row["hex"], row["airspace_gid"], row["altitude"]) for row in rows] == [("a1b2c3", 1, 12000)]
+        assert rows[0]["aircraft_id"] == aircraft_id
+        assert result == {"aircraft": 2, "open": 1, "ended": 0}
+    
+    @pytest.mark.asyncio
+    async def test_non_restricted_airspace_is_not_recorded(self):
+        """Test that an aircraft only inside a MOA records no incursion"""
+        snapshot = MagicMock(
+            aircraft=({"id": UUID(int=1), "hex": "a1b2c3", "flight": None, "altitude_baro": 12000, "altitude_geom": None},),
+            positions=((-117.5, 35.5),)
+        )
+        engine = self._engine([
+            _airspace(1, (-118, 35, -117, 36), airspace_type="M"),
+            _airspace(2, (-100, 30, -99, 31)),
+        ], snapshot)
+        
+        with patch.object(IncursionService, "record", AsyncMock(return_value={"open": 0, "ended": 0})) as record:
+            await engine.evaluate(MagicMock(), uuid4(), NOW)
+        
+        assert record.await_args.args[1] == []
+        assert engine.current_index().gids == [2]
+    
+    @pytest.mark.asyncio
+    async def test_skipped_without_airspace(self):
+        """Test that nothing is recorded before airspace has been fetched"""
+        engine = self._engine([])
+        engine.airspace.largest.return_value = None
+        session = MagicMock()
+        session.execute = AsyncMock()
+        
+        assert await engine.evaluate(session, uuid4(), NOW) == {"aircraft": 0, "open": 0, "ended": 0}
+        session.execute.assert_not_awaited()
@@ -0,0 +1,49 @@
+"""
+Unit tests for keyset pagination cursors
+"""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.aircraft import AircraftResponse
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Test opaque cursor encoding"""
+    
+    def test_round_trip(self):
+        """Test that a cursor decodes to the encoded sort key"""
+        last_updated = datetime(2026, 10, 16, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        aircraft_id = uuid4()
+        
+        cursor = encode_cursor(last_updated, aircraft_id)
+        
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (last_updated, aircraft_id)
+    
+    def test_naive_datetime_is_utc(self):
+        """Test that naive timestamps are treated as UTC"""
+        aircraft_id = uuid4()
+        decoded, _ = decode_cursor(encode_cursor(datetime(2026, 10, 16, 12, 0), aircraft_id))
+        
+        assert decoded == datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+    
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WyJ4Il0", "WyJ4IiwgInkiXQ"])
+    def test_invalid_cursor(self, cursor):
+        """Test that malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestAircraftResponse:
+    """Test the paginated list response"""
+    
+    def test_total_is_optional(self):
+        """Test that a page without a count is valid"""
+        response = AircraftResponse(aircraft=[], page=1, size=0)
+        
+        assert response.total is None
+        assert response.total_estimated is False
+        assert response.next_cursor is None
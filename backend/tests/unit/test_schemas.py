@@ -3,7 +3,7 @@ Unit tests for Pydantic schemas
 """
 import pytest
 from pydantic import ValidationError
-from app.schemas.aircraft import AircraftCreate, AircraftUpdate
+from app.schemas.aircraft import Aircraft, AircraftCreate, AircraftProjection, AircraftUpdate
 from app.schemas.tenant import TenantCreate
 from app.schemas.feature_flag import FeatureFlagCreate
 
@@ -80,6 +80,13 @@ class TestAircraftSchemas:
         assert aircraft_update.flight == "UPDATED123"
         assert aircraft_update.altitude_baro == 15000
         assert aircraft_update.hex is None  # Not provided, should be None
+    
+    def test_aircraft_projection_allows_any_subset(self):
+        """Test that projected responses validate with only the requested fields"""
+        projection = AircraftProjection(hex="ae1460", latitude=37.7749)
+        
+        assert set(AircraftProjection.model_fields) == set(Aircraft.model_fields)
+        assert projection.model_dump(exclude_unset=True) == {"hex": "ae1460", "latitude": 37.7749}
 
 
 class TestTenantSchemas:
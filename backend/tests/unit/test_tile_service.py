@@ -0,0 +1,97 @@
+"""
+Unit tests for aircraft vector tiles and data generations
+"""
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.data_generation import DataGenerationTracker, data_generations
+from app.services.tile_service import AIRCRAFT_TILE_SQL, TileCache, TileService, validate_tile
+
+
+class TestDataGenerations:
+    """Test per-tenant generation counters"""
+    
+    def test_bump_is_per_tenant(self):
+        """Test that bumping one tenant leaves others untouched"""
+        tracker = DataGenerationTracker()
+        tenant_a, tenant_b = uuid4(), uuid4()
+        
+        assert tracker.get(tenant_a) == 0
+        assert tracker.bump(tenant_a) == 1
+        assert tracker.get(str(tenant_a)) == 1
+        assert tracker.get(tenant_b) == 0
+
+
+class TestTileCache:
+    """Test tile caching and invalidation"""
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used tile is evicted"""
+        cache = TileCache(max_entries=2)
+        cache.put(("t", 0, 0, 0, 1), b"a")
+        cache.put(("t", 1, 0, 0, 1), b"b")
+        cache.get(("t", 0, 0, 0, 1))
+        cache.put(("t", 1, 1, 0, 1), b"c")
+        
+        assert cache.get(("t", 1, 0, 0, 1)) is None
+        assert cache.get(("t", 0, 0, 0, 1)) == b"a"
+    
+    def test_new_generation_drops_stale_tiles(self):
+        """Test that storing a newer generation invalidates older tiles of that tenant"""
+        cache = TileCache(max_entries=10)
+        cache.put(("t", 0, 0, 0, 1), b"old")
+        cache.put(("other", 0, 0, 0, 1), b"keep")
+        cache.put(("t", 1, 0, 0, 2), b"new")
+        
+        assert cache.get(("t", 0, 0, 0, 1)) is None
+        assert cache.get(("other", 0, 0, 0, 1)) == b"keep"
+        assert len(cache) == 2
+
+
+class TestTileService:
+    """Test tile rendering"""
+    
+    @pytest.mark.parametrize("z, x, y", [(-1, 0, 0), (23, 0, 0), (2, 4, 0), (2, 0, -1)])
+    def test_validate_tile_rejects_out_of_range(self, z, x, y):
+        """Test that invalid tile addresses raise"""
+        with pytest.raises(ValueError):
+            validate_tile(z, x, y)
+    
+    @pytest.mark.asyncio
+    async def test_tile_cached_until_generation_changes(self):
+        """Test that tiles are rendered once per generation"""
+        session = MagicMock()
+        result = MagicMock()
+        result.scalar.return_value = b"\x1a\x05mvt"
+        session.execute = AsyncMock(return_value=result)
+        service = TileService(session, cache=TileCache(max_entries=10))
+        tenant_id = uuid4()
+        
+        tile, generation = await service.get_aircraft_tile(tenant_id, 3, 4, 2)
+        await service.get_aircraft_tile(tenant_id, 3, 4, 2)
+        assert tile == b"\x1a\x05mvt"
+        assert session.execute.await_count == 1
+        
+        data_generations.bump(tenant_id)
+        _, new_generation = await service.get_aircraft_tile(tenant_id, 3, 4, 2)
+        assert new_generation == generation + 1
+        assert session.execute.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_empty_tile(self):
+        """Test that a tile without aircraft renders as empty bytes"""
+        session = MagicMock()
+        result = MagicMock()
+        result.scalar.return_value = None
+        session.execute = AsyncMock(return_value=result)
+        
+        tile, _ = await TileService(session, cache=TileCache(max_entries=10)).get_aircraft_tile(uuid4(), 0, 0, 0)
+        
+        assert tile == b""
+    
+    def test_rows_selected_within_buffer(self):
+        """Test that rows are filtered by the envelope grown by the tile buffer"""
+        assert "margin => CAST(:buffer AS DOUBLE PRECISION) / CAST(:extent AS DOUBLE PRECISION)" in AIRCRAFT_TILE_SQL
+        assert "a.position && ST_Transform(bounds.buffered, 4326)" in AIRCRAFT_TILE_SQL
@@ -0,0 +1,114 @@
+"""
+Unit tests for historical track queries and simplification
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services.track_service import TrackService
+from app.utils.geometry import douglas_peucker_mask, project_local_metres
+
+
+START = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def make_point(offset_seconds, longitude, latitude):
+    """Create a track point dictionary"""
+    return {
+        "time": START + timedelta(seconds=offset_seconds),
+        "longitude": longitude,
+        "latitude": latitude,
+        "altitude": 35000,
+        "speed": 450.0,
+        "track": 90.0
+    }
+
+
+class TestDouglasPeucker:
+    """Test line simplification"""
+    
+    def test_straight_line_keeps_endpoints(self):
+        """Test that collinear points are removed"""
+        points = np.array([[0, 0], [1, 0], [2, 0], [3, 0]], dtype=float)
+        keep = douglas_peucker_mask(points, tolerance=0.1)
+        
+        assert keep.tolist() == [True, False, False, True]
+    
+    def test_corner_is_kept(self):
+        """Test that a point beyond the tolerance is kept"""
+        points = np.array([[0, 0], [1, 0], [2, 5], [3, 0], [4, 0]], dtype=float)
+        keep = douglas_peucker_mask(points, tolerance=0.5)
+        
+        assert keep[2]
+        assert keep[0] and keep[-1]
+    
+    def test_short_inputs(self):
+        """Test empty and two-point inputs"""
+        assert douglas_peucker_mask(np.empty((0, 2)), 1.0).tolist() == []
+        assert douglas_peucker_mask(np.array([[0, 0], [1, 1]], dtype=float), 1.0).tolist() == [True, True]
+    
+    def test_projection_scales_to_metres(self):
+        """Test that one degree of latitude projects to roughly 110 km"""
+        projected = project_local_metres([(0.0, 0.0), (0.0, 1.0)])
+        
+        assert projected[1, 1] - projected[0, 1] == pytest.approx(110540.0)
+
+
+class TestTrackService:
+    """Test track bucketing and formatting"""
+    
+    def test_bucket_seconds(self):
+        """Test that buckets bound the number of points per aircraft"""
+        end = START + timedelta(hours=24)
+        
+        assert TrackService.bucket_seconds(START, end, 2000) == 44
+        assert TrackService.bucket_seconds(START, START + timedelta(seconds=10), 2000) == 1
+    
+    def test_simplify_drops_collinear_points(self):
+        """Test that simplification keeps attributes of retained points"""
+        points = [make_point(i * 10, 10.0 + i * 0.01, 50.0) for i in range(10)]
+        simplified = TrackService.simplify(points, tolerance_m=10.0)
+        
+        assert simplified == [points[0], points[-1]]
+    
+    def test_format_linestring(self):
+        """Test GeoJSON LineString output"""
+        points = [make_point(0, 10.0, 50.0), make_point(60, 10.1, 50.1)]
+        feature = TrackService.format_track("abc123", points)
+        
+        assert feature["type"] == "Feature"
+        assert feature["geometry"] == {"type": "LineString", "coordinates": [[10.0, 50.0], [10.1, 50.1]]}
+        assert feature["properties"]["points"] == 2
+        assert feature["properties"]["times"][1] - feature["properties"]["times"][0] == 60
+    
+    def test_format_coordinates(self):
+        """Test compact array output"""
+        points = [make_point(0, 10.0, 50.0), make_point(60, 10.1, 50.1)]
+        track = TrackService.format_track("abc123", points, "coordinates")
+        
+        assert track["hex"] == "abc123"
+        assert track["coords"] == [[10.0, 50.0], [10.1, 50.1]]
+        assert track["alt"] == [35000, 35000]
+        assert len(track["t"]) == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_tracks_groups_by_hex(self):
+        """Test that rows are grouped per aircraft and hex codes are lowercased"""
+        session = MagicMock()
+        result = MagicMock()
+        result.fetchall.return_value = [
+            ("abc123", START, 10.0, 50.0, 35000, 450, 90),
+            ("abc123", START + timedelta(seconds=30), 10.1, 50.0, 35000, 450, 90),
+            ("def456", START, 11.0, 51.0, None, None, None),
+        ]
+        session.execute = AsyncMock(return_value=result)
+        
+        tracks = await TrackService(session).get_tracks(uuid4(), ["ABC123", "def456"], START, START + timedelta(hours=1))
+        
+        params = session.execute.call_args[0][1]
+        assert params["hex_codes"] == ["abc123", "def456"]
+        assert len(tracks["abc123"]) == 2
+        assert tracks["def456"][0]["speed"] is None
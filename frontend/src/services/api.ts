@@ -13,8 +13,11 @@ const api = axios.create({
 
 // Airspace API
 export const airspaceApi = {
-  getAirspaceGeoJSON: async (limit?: number): Promise<any> => {
-    const params = limit ? { limit } : {};
+  getAirspaceGeoJSON: async (
+    limit?: number,
+    filters?: { bbox?: string; active_at?: string; min_alt?: number; max_alt?: number }
+  ): Promise<any> => {
+    const params = { ...(limit ? { limit } : {}), ...filters };
     const response = await api.get('/airspace/geojson', { params });
     return response.data;
   },
@@ -27,7 +30,7 @@ export const airspaceApi = {
 
 // Aircraft API
 export const aircraftApi = {
-  getAircraft: async (params?: { skip?: number; limit?: number; hex?: string; flight?: string }): Promise<AircraftResponse> => {
+  getAircraft: async (params?: { skip?: number; limit?: number; cursor?: string; include_total?: boolean; hex?: string; flight?: string }): Promise<AircraftResponse> => {
     const response = await api.get('/aircraft/', { params });
     return response.data;
   },
@@ -40,9 +40,11 @@ export interface Aircraft {
 
 export interface AircraftResponse {
   aircraft: Aircraft[];
-  total: number;
+  total: number | null;
+  total_estimated: boolean;
   page: number;
   size: number;
+  next_cursor: string | null;
 }
 
 export interface MapLayer {